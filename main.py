@@ -1,11 +1,161 @@
+import asyncio
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Optional
 
 from dotenv import load_dotenv
 
-from utils.uniswap import UniswapClient, RpcUnavailable
+from utils.uniswap import POOL_WETH_USDC_005, UniswapClient, RpcUnavailable
 from utils.hyperliquid import HyperliquidAPI
-from utils.logic import BotLogic
+from utils.logic import BotLogic, IncrementalBotLogic, parse_portfolio
+from utils.metrics import CYCLE_SECONDS, LAST_CYCLE, health, serve, set_degraded
+from utils.engine import check_and_alert_async, run_fixed_rate
+from utils.prices import get_eth_usdc_price
+from utils.telegram import AlertDispatcher
+
+DEGRADED_MSG = "[WARN] All RPC endpoints unavailable; running in degraded mode (no chain reads)"
+
+
+def connect_uniswap(rpc_url: str | None, fallbacks: str, pools: Iterable[str]) -> Optional[UniswapClient]:
+    """Connect to the RPC pool and prepare the reads of ``pools``; ``None`` if unreachable."""
+
+    try:
+        client = UniswapClient(rpc_url=rpc_url, fallbacks=fallbacks)
+    except RpcUnavailable:
+        set_degraded(True)
+        print(DEGRADED_MSG)
+        return None
+    client.prepare(pools)
+    return client
+
+
+def ensure_uniswap(bot: BotLogic, rpc_url: str | None, fallbacks: str) -> None:
+    """Reconnect the Uniswap client if the bot is in degraded mode."""
+
+    if bot.uniswap is None:
+        bot.uniswap = connect_uniswap(rpc_url, fallbacks, bot.pools)
+
+
+def start_bot(
+    wallet: str | None, rpc_url: str | None, fallbacks: str, bot_cls: type = BotLogic, **options: Any
+) -> BotLogic:
+    """Build the bot, connecting to the RPC pool while Hyperliquid starts up.
+
+    On a cold start both the endpoint probes (which also import web3) and
+    the Hyperliquid ``Info`` client (SDK import plus metadata requests) are
+    slow and independent of each other, so they run concurrently.
+    """
+
+    portfolio = options.get("portfolio")
+    pools = list(dict.fromkeys(e.pool for e in portfolio)) if portfolio else [POOL_WETH_USDC_005]
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup") as startup:
+        connecting = startup.submit(connect_uniswap, rpc_url, fallbacks, pools)
+        hyper = HyperliquidAPI(wallet)
+        uniswap = connecting.result()
+    return bot_cls(uniswap, hyper, **options)
+
+
+def finish_cycle(bot: BotLogic, degraded: bool) -> None:
+    """Record the outcome of a cycle for ``/metrics`` and ``/healthz``."""
+
+    if degraded:
+        print(DEGRADED_MSG)
+    set_degraded(degraded or bot.uniswap is None)
+    LAST_CYCLE.set(time.time())
+
+
+def run_cycle(bot: BotLogic, streamed: bool = False) -> None:
+    """Run one cycle; the RPC pool keeps recovering endpoints in the background.
+
+    With ``streamed`` the pool states pushed by the WebSocket stream are used
+    instead of polling them.
+    """
+
+    degraded = False
+    try:
+        with CYCLE_SECONDS.time():
+            if streamed:
+                bot.check_streamed()
+            else:
+                bot.check_and_alert()
+    except RpcUnavailable:
+        degraded = True
+    finish_cycle(bot, degraded)
+
+
+def run_sync(bot: BotLogic, rpc_url: str | None, fallbacks: str, period: float) -> None:
+    while True:
+        ensure_uniswap(bot, rpc_url, fallbacks)
+        run_cycle(bot)
+        time.sleep(period)
+
+
+def run_stream(bot: BotLogic, rpc_url: str | None, fallbacks: str, ws_url: str, period: float) -> None:
+    """Follow Swap logs over WebSocket, polling pools only while the socket is down.
+
+    Hedge positions are still read every ``period`` and evaluated against the
+    latest pushed pool states.
+    """
+
+    from utils.stream import PoolStream  # websocket-client is only needed here
+
+    stream = PoolStream(
+        ws_url,
+        bot.on_pool_update,
+        pool_address=bot.pools,
+        on_head=bot.on_new_head,
+        on_connect=bot.on_stream_connected,
+    )
+    stream.start()
+    while True:
+        ensure_uniswap(bot, rpc_url, fallbacks)
+        run_cycle(bot, streamed=stream.connected)
+        time.sleep(period)
+
+
+async def run_async(bot: BotLogic, rpc_url: str | None, fallbacks: str, period: float) -> None:
+    async def cycle() -> None:
+        await asyncio.to_thread(ensure_uniswap, bot, rpc_url, fallbacks)
+        degraded = False
+        try:
+            with CYCLE_SECONDS.time():
+                await check_and_alert_async(bot)
+        except RpcUnavailable:
+            degraded = True
+        finish_cycle(bot, degraded)
+
+    await run_fixed_rate(cycle, period)
+
+
+def run_supervised(accounts_file: str, rpc_url: str | None, fallbacks: str, period: float, incremental: bool) -> None:
+    """Monitor every wallet of ``accounts_file`` across worker processes."""
+
+    from utils.supervisor import RateLimiter, Supervisor, WorkerConfig, parse_accounts
+
+    with open(accounts_file) as fh:
+        accounts = parse_accounts(fh.read())
+    limiter = RateLimiter.for_endpoints(
+        rpc_url,
+        fallbacks,
+        float(os.getenv("RPC_RATE", "10")),
+        float(os.getenv("HYPERLIQUID_RATE", "5")),
+    )
+    telegram = os.getenv("TELEGRAM_TOKEN") and os.getenv("TELEGRAM_CHAT_ID")
+    dispatcher = AlertDispatcher.from_env() if telegram else None
+    supervisor = Supervisor(
+        accounts,
+        int(os.getenv("WORKERS") or os.cpu_count() or 1),
+        WorkerConfig(rpc_url, fallbacks, incremental),
+        limiter,
+        dispatcher=dispatcher,
+        hang_timeout=float(os.getenv("WORKER_TIMEOUT", str(10 * period))),
+    )
+    try:
+        supervisor.run(period)
+    finally:
+        if dispatcher is not None:
+            dispatcher.flush(timeout=5)
 
 
 def main() -> None:
@@ -15,24 +165,57 @@ def main() -> None:
     wallet = os.getenv("HYPERLIQUID_WALLET_ADDRESS")
     token_id_env = os.getenv("UNISWAP_POSITION_TOKEN_ID")
     token_id = int(token_id_env) if token_id_env else None
+    period = float(os.getenv("CYCLE_SECONDS", "30"))
+    async_mode = os.getenv("ASYNC_MODE") == "1"
+    ws_url = os.getenv("WS_URL_ARBITRUM")
+    portfolio_env = os.getenv("PORTFOLIO")
+    incremental = os.getenv("INCREMENTAL") == "1"
+    recorder_dir = os.getenv("RECORDER_DIR")
+    port = os.getenv("PORT")
+    telegram = os.getenv("TELEGRAM_TOKEN") and os.getenv("TELEGRAM_CHAT_ID")
+    accounts_file = os.getenv("ACCOUNTS_FILE")
+
+    if accounts_file:
+        if port:
+            serve(int(port), lambda: health(3 * period + 60))
+        try:
+            run_supervised(accounts_file, rpc_url, fallbacks, period, incremental)
+        except KeyboardInterrupt:
+            print("Exiting...")
+        return
 
-    hyper = HyperliquidAPI(wallet)
-    bot = BotLogic(None, hyper, lp_token_id=token_id)
+    recorder = None
+    if recorder_dir:
+        from utils.recorder import SampleRecorder
+
+        recorder = SampleRecorder(recorder_dir)
+    bot = start_bot(
+        wallet,
+        rpc_url,
+        fallbacks,
+        IncrementalBotLogic if incremental else BotLogic,
+        lp_token_id=token_id,
+        price_source=get_eth_usdc_price if async_mode else None,
+        portfolio=parse_portfolio(portfolio_env) if portfolio_env else None,
+        recorder=recorder,
+        dispatcher=AlertDispatcher.from_env() if telegram else None,
+    )
+    if port:
+        serve(int(port), lambda: health(3 * period + 60))
     try:
-        while True:
-            if bot.uniswap is None:
-                try:
-                    bot.uniswap = UniswapClient(rpc_url=rpc_url, fallbacks=fallbacks)
-                except RpcUnavailable:
-                    print("[WARN] All RPC endpoints unavailable; running in degraded mode (no chain reads)")
-            try:
-                bot.check_and_alert()
-            except RpcUnavailable:
-                print("[WARN] All RPC endpoints unavailable; running in degraded mode (no chain reads)")
-                bot.uniswap = None
-            time.sleep(30)
+        if ws_url:
+            run_stream(bot, rpc_url, fallbacks, ws_url, period)
+        elif async_mode:
+            asyncio.run(run_async(bot, rpc_url, fallbacks, period))
+        else:
+            run_sync(bot, rpc_url, fallbacks, period)
     except KeyboardInterrupt:
         print("Exiting...")
+    finally:
+        if bot.dispatcher is not None:
+            bot.dispatcher.flush(timeout=5)
+        if bot.recorder is not None:
+            bot.recorder.close()
 
 
 if __name__ == "__main__":
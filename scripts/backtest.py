@@ -0,0 +1,63 @@
+"""Sweep BotLogic parameters over recorded or indexed history.
+
+Usage:
+    python scripts/backtest.py TICK_LOWER TICK_UPPER LIQUIDITY \
+        [--samples DIR | --events DB] [--alert-ticks 50,100,200] [--hedge -0.5,-1] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexer import EventIndexer  # noqa: E402
+from utils.recorder import SampleReader  # noqa: E402
+from utils.replay import ReplayConfig, grid, history_from_swaps, sweep  # noqa: E402
+
+
+def _numbers(text: str, kind=float):
+    return [kind(x) for x in text.split(",") if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tick_lower", type=int)
+    parser.add_argument("tick_upper", type=int)
+    parser.add_argument("liquidity", type=int)
+    parser.add_argument("--samples", default=os.getenv("RECORDER_DIR"))
+    parser.add_argument("--events", default=None)
+    parser.add_argument("--alert-ticks", default="50,100,200")
+    parser.add_argument("--hedge", default="")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.events:
+        history = history_from_swaps(EventIndexer(None, args.events).swaps())
+    elif args.samples:
+        history = SampleReader(args.samples).all()
+    else:
+        parser.error("pass --samples DIR or --events DB")
+
+    params = {"alert_ticks": _numbers(args.alert_ticks, int)}
+    if args.hedge:
+        params["hedge_size"] = _numbers(args.hedge)
+    configs = grid(ReplayConfig(args.tick_lower, args.tick_upper, args.liquidity), **params)
+    start = time.perf_counter()
+    results = sweep(history, configs, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(history)} samples x {len(configs)} configs in {elapsed:.1f}s")
+    print(f"{'alert_ticks':>11} {'hedge':>8} {'alerts':>8} {'out_of_range':>12} {'drift_mean':>10} {'drift_max':>10}")
+    for config, m in results:
+        print(
+            f"{config.alert_ticks:>11} {str(config.hedge_size):>8} {m['alerts']:>8.0f} "
+            f"{m['out_of_range_ratio']:>12.2%} {m['drift_mean_abs']:>10.4f} {m['drift_max_abs']:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Offline benchmarks of the bot's upstream reads and of a full cycle.
+
+Usage: python scripts/bench_cycle.py [--iterations N] [--update-baseline] [--tolerance 0.5]
+
+Every benchmark runs against local fakes: JSON-RPC and subgraph requests go
+to :class:`FakeRpcServer` instances over real HTTP, and Hyperliquid ``Info``
+is replaced by :class:`FakeInfo`. Each scenario configures the primary RPC
+endpoint differently (clean, slow, flaky, rate limited) with a clean
+fallback behind it.
+
+For each benchmark the script reports p50/p99 latency, upstream calls per
+iteration (HTTP requests plus Hyperliquid ``Info`` calls), peak bytes allocated per iteration (tracemalloc), throughput and
+the share of iterations that raised.
+
+Results are compared with ``scripts/bench_baseline.json``. In the
+fault-free scenarios a benchmark fails when it makes more calls than its
+baseline or when its p50 exceeds the baseline by more than ``--tolerance``
+(relative, plus 1 ms of slack). Under injected faults latency, call
+counts and the failure share depend on timing, so those scenarios are only
+gated on what the fallback endpoint guarantees: a benchmark that never
+failed in the baseline must not fail in more than 10% of iterations.
+
+The price benchmark closes every source's circuit breaker before each
+iteration, so each one queries the same sources instead of depending on
+whether earlier failures tripped a breaker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import utils.hyperliquid as hl  # noqa: E402
+import utils.prices as prices  # noqa: E402
+from fake_chain import FakeChain  # noqa: E402
+from fake_rpc_server import FakeRpcServer  # noqa: E402
+from utils.logic import BotLogic  # noqa: E402
+from utils.uniswap import (  # noqa: E402
+    ERC20_ABI,
+    NONFUNGIBLE_POSITION_MANAGER,
+    POOL_WETH_USDC_005,
+    POSITION_MANAGER_ABI,
+    UNISWAP_V3_POOL_ABI,
+    USDC,
+    WETH,
+    PoolMetadataRegistry,
+    UniswapClient,
+)
+
+BASELINE = os.path.join(ROOT, "scripts", "bench_baseline.json")
+TOKEN_ID = 1
+SCENARIOS = {
+    "clean": {},
+    "slow": {"latency": 0.005},
+    "flaky": {"error_rate": 0.2},
+    "throttled": {"rate_limit": 50},
+}
+# Call counts and latency under injected faults depend on timing; only these are gated on them.
+FAULT_FREE = {"clean", "slow"}
+FAILED_SLACK = 0.1
+
+
+class FakeInfo:
+    """Stand-in for ``hyperliquid.info.Info`` with a fixed account state.
+
+    ``calls`` counts requests across every instance.
+    """
+
+    latency = 0.001
+    calls = 0
+
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    def user_state(self, address: str):
+        FakeInfo.calls += 1
+        time.sleep(self.latency)
+        return {
+            "assetPositions": [{"position": {"coin": "ETH", "szi": "-1.5", "positionValue": "4500"}}],
+            "marginSummary": {"accountValue": "10000", "totalMarginUsed": "1500"},
+            "withdrawable": "8500",
+        }
+
+    def all_mids(self):
+        FakeInfo.calls += 1
+        time.sleep(self.latency)
+        return {"ETH": "3000.0"}
+
+
+def build_chain() -> FakeChain:
+    chain = FakeChain()
+    chain.register(
+        POOL_WETH_USDC_005,
+        UNISWAP_V3_POOL_ABI,
+        slot0=lambda: (4339505179874779489431521786, -196256, 1, 1, 1, 0, True),
+        liquidity=lambda: 10**18,
+        fee=lambda: 500,
+        token0=lambda: WETH,
+        token1=lambda: USDC,
+    )
+    chain.register(WETH, ERC20_ABI, decimals=lambda: 18)
+    chain.register(USDC, ERC20_ABI, decimals=lambda: 6)
+    chain.register(
+        NONFUNGIBLE_POSITION_MANAGER,
+        POSITION_MANAGER_ABI,
+        positions=lambda t: (0, WETH, WETH, USDC, 500, -197000, -195500, 10**15, 0, 0, 0, 0),
+    )
+    return chain
+
+
+def _attempt(fn: Callable[[], object]) -> bool:
+    try:
+        fn()
+        return True
+    except Exception:
+        return False
+
+
+def measure(fn: Callable[[], object], servers: List[FakeRpcServer], iterations: int) -> Dict[str, float]:
+    _attempt(fn)  # warm caches and connections
+    latencies = []
+    failures = 0
+    calls_before = sum(s.stats["http"] for s in servers) + FakeInfo.calls
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        failures += not _attempt(fn)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    calls = (sum(s.stats["http"] for s in servers) + FakeInfo.calls - calls_before) / iterations
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(max(1, iterations // 10)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        _attempt(fn)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "calls": calls,
+        "alloc_kb": statistics.median(peaks) / 1024,
+        "per_s": iterations / elapsed,
+        "failed": failures / iterations,
+    }
+
+
+def run_scenario(name: str, options: Dict[str, float], iterations: int) -> Dict[str, Dict[str, float]]:
+    primary, fallback = FakeRpcServer(build_chain(), **options), FakeRpcServer(build_chain())
+    servers = [primary, fallback]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = UniswapClient(rpc_url=primary.start(), fallbacks=fallback.start(), metadata=PoolMetadataRegistry(""))
+            os.environ["UNISWAP_SUBGRAPH"] = primary.url
+            aggregator = prices.PriceAggregator(
+                sources={"Uniswap bundle": prices.subgraph_bundle_price, "Uniswap pool": prices.subgraph_pool_price},
+                ttl=0,
+            )
+            prices._aggregator = aggregator
+
+            def price() -> object:
+                aggregator.breakers = {name: prices.CircuitBreaker() for name in aggregator.sources}
+                return prices.get_eth_usdc_price()
+
+            hyper = hl.HyperliquidAPI("0xbench", snapshot_ttl=0)
+            bot = BotLogic(client, hyper, lp_token_id=TOKEN_ID, price_source=price)
+            benches: List[Tuple[str, Callable[[], object]]] = [
+                ("pool_state", lambda: client.get_pool_states([POOL_WETH_USDC_005])),
+                ("positions", lambda: client.get_positions([TOKEN_ID])),
+                ("hyperliquid", lambda: hyper.get_positions(["ETH"])),
+                ("price", price),
+                ("cycle", bot.check_and_alert),
+            ]
+            return {f"{name}/{bench}": measure(fn, servers, iterations) for bench, fn in benches}
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    failures = []
+    for key, got in results.items():
+        ref = baseline.get(key)
+        if ref is None:
+            continue
+        if key.split("/")[0] not in FAULT_FREE:
+            if ref["failed"] == 0 and got["failed"] > FAILED_SLACK:
+                failures.append(f"{key}: {got['failed']:.0%} failed (baseline never failed)")
+            continue
+        if got["calls"] > ref["calls"] + 0.05:
+            failures.append(f"{key}: {got['calls']:.2f} calls/iter (baseline {ref['calls']:.2f})")
+        if got["p50_ms"] > ref["p50_ms"] * (1 + tolerance) + 1.0:
+            failures.append(f"{key}: p50 {got['p50_ms']:.2f}ms (baseline {ref['p50_ms']:.2f}ms)")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline cycle benchmarks")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    args = parser.parse_args()
+
+    hl.Info = FakeInfo
+    results: Dict[str, Dict[str, float]] = {}
+    for name in args.scenario or SCENARIOS:
+        results.update(run_scenario(name, SCENARIOS[name], args.iterations))
+
+    print(f"{'benchmark':<24} {'p50 ms':>8} {'p99 ms':>8} {'calls':>6} {'alloc KB':>9} {'ops/s':>8} {'failed':>7}")
+    for key, r in results.items():
+        print(
+            f"{key:<24} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['calls']:>6.2f} "
+            f"{r['alloc_kb']:>9.1f} {r['per_s']:>8.0f} {r['failed']:>7.1%}"
+        )
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as fh:
+                baseline = json.load(fh)
+        baseline.update({k: {m: round(v, 3) for m, v in r.items()} for k, r in results.items()})
+        with open(BASELINE, "w") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Baseline written to {BASELINE}")
+        return
+    if not os.path.exists(BASELINE):
+        print("No baseline yet; run with --update-baseline")
+        return
+    with open(BASELINE) as fh:
+        failures = compare(results, json.load(fh), args.tolerance)
+    for failure in failures:
+        print(f"[REGRESSION] {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
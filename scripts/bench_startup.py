@@ -0,0 +1,179 @@
+"""Cold-start benchmark: import time of ``main`` and time to the first cycle.
+
+Usage: python scripts/bench_startup.py [--runs N] [--update-baseline] [--tolerance 0.5]
+
+Every run uses a fresh interpreter. ``import_ms`` is the cumulative time
+``python -X importtime -c "import main"`` reports for ``main``. The
+``first_cycle_ms`` figures are the wall time from spawning this script with
+``--child`` until its first cycle finished, against a local
+:class:`FakeRpcServer` (``--rpc-latency`` per request, empty pool metadata
+cache) and a Hyperliquid ``Info`` stand-in whose constructor sleeps
+``--info-latency`` like the SDK's metadata requests. The ``fast`` child goes
+through :func:`main.start_bot`; the ``serial`` child imports web3 and the
+SDK up front and connects one client after the other, as the bot used to.
+
+Medians are checked against the ``startup`` budget in
+``scripts/bench_baseline.json`` (``--tolerance`` relative, plus 20 ms).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "scripts", "bench_baseline.json")
+DONE = "FIRST_CYCLE_DONE"
+DEFERRED = ("web3", "hyperliquid", "eth_account", "eth_abi", "websocket", "utils.supervisor", "utils.recorder")
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class ColdInfo:
+    """``hyperliquid.info.Info`` stand-in with a slow constructor."""
+
+    latency = 0.5
+
+    def __init__(self, *args, **kwargs) -> None:
+        time.sleep(self.latency)
+
+    def user_state(self, address: str):
+        return {"assetPositions": [{"position": {"coin": "ETH", "szi": "-1.5", "positionValue": "4500"}}]}
+
+    def all_mids(self):
+        return {"ETH": "3000.0"}
+
+
+def child(mode: str, url: str, info_latency: float) -> None:
+    os.environ["POOL_METADATA_CACHE"] = ""
+    import main
+    import utils.hyperliquid as hl
+
+    ColdInfo.latency = info_latency
+    hl.Info = ColdInfo
+    if mode == "serial":
+        import hyperliquid.info  # noqa: F401
+        import web3  # noqa: F401
+
+        hyper = hl.HyperliquidAPI("0xbench")
+        bot = main.BotLogic(main.connect_uniswap(url, "", [main.POOL_WETH_USDC_005]), hyper, lp_token_id=1)
+    else:
+        bot = main.start_bot("0xbench", url, "", lp_token_id=1)
+    main.run_cycle(bot)
+    print(DONE, flush=True)
+
+
+# ---------------------------------------------------------------------------
+def import_profile() -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """Cumulative ms for ``main``, the slowest top-level imports and any deferred module loaded."""
+
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    total, top, loaded = 0.0, [], []
+    for self_us, cumulative_us, indent, name in _IMPORTTIME.findall(out):
+        if name == "main":
+            total = int(cumulative_us) / 1000
+        elif len(indent) == 3:
+            top.append((int(cumulative_us) / 1000, name))
+        if name in DEFERRED:
+            loaded.append(name)
+    return total, sorted(top, reverse=True)[:5], loaded
+
+
+def first_cycle(mode: str, url: str, info_latency: float) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, url, "--info-latency", str(info_latency)],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    for line in proc.stdout:
+        if line.strip() == DONE:
+            elapsed = time.perf_counter() - start
+            break
+    else:
+        raise RuntimeError(f"{mode} child failed: {proc.stderr.read()}")
+    proc.wait()
+    return elapsed * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rpc-latency", type=float, default=0.05)
+    parser.add_argument("--info-latency", type=float, default=0.5)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.info_latency)
+        return
+
+    sys.path.insert(0, os.path.join(ROOT, "tests"))
+    from bench_cycle import build_chain
+    from fake_rpc_server import FakeRpcServer
+
+    server = FakeRpcServer(build_chain(), latency=args.rpc_latency)
+    url = server.start()
+    try:
+        profiles = [import_profile() for _ in range(args.runs)]
+        fast = [first_cycle("fast", url, args.info_latency) for _ in range(args.runs)]
+        serial = [first_cycle("serial", url, args.info_latency) for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    results: Dict[str, float] = {
+        "import_ms": statistics.median(p[0] for p in profiles),
+        "first_cycle_ms": statistics.median(fast),
+        "serial_first_cycle_ms": statistics.median(serial),
+    }
+    _, top, loaded = profiles[-1]
+    print(f"import main:        {results['import_ms']:8.1f} ms")
+    for ms, name in top:
+        print(f"  {name:<16} {ms:8.1f} ms")
+    print(f"deferred modules:   {'LOADED ' + ', '.join(loaded) if loaded else 'not imported by main'}")
+    print(f"first cycle (fast): {results['first_cycle_ms']:8.1f} ms")
+    print(f"first cycle (serial): {results['serial_first_cycle_ms']:6.1f} ms")
+    print(f"speed-up:           {results['serial_first_cycle_ms'] / results['first_cycle_ms']:8.2f}x")
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as fh:
+            baseline = json.load(fh)
+    if args.update_baseline:
+        baseline["startup"] = {k: round(v, 1) for k, v in results.items() if k != "serial_first_cycle_ms"}
+        with open(BASELINE, "w") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Budget written to {BASELINE}")
+        return
+    budget = baseline.get("startup")
+    if budget is None:
+        print("No startup budget yet; run with --update-baseline")
+        return
+    failures = [
+        f"{key}: {results[key]:.1f}ms (budget {limit:.1f}ms)"
+        for key, limit in budget.items()
+        if results[key] > limit * (1 + args.tolerance) + 20
+    ]
+    if loaded:
+        failures.append(f"main imports {', '.join(loaded)} eagerly")
+    for failure in failures:
+        print(f"[REGRESSION] {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark exact TickMath against the previous float conversion.
+
+Usage: python scripts/bench_tickmath.py [N]
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tickmath import (  # noqa: E402
+    MAX_TICK,
+    MIN_TICK,
+    get_sqrt_ratio_at_tick,
+    get_sqrt_ratio_at_tick_batch,
+    get_tick_at_sqrt_ratio,
+    get_tick_at_sqrt_ratio_batch,
+)
+
+
+def float_tick(sqrt_price_x96: int) -> int:
+    """The conversion UniswapClient used before the exact port."""
+
+    price = (sqrt_price_x96 / (1 << 96)) ** 2
+    return int(math.log(price, 1.0001))
+
+
+def _timed(label: str, n: int, fn) -> object:
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1e3:9.1f} ms  {n / elapsed:12,.0f} /s")
+    return out
+
+
+def main(n: int = 100_000) -> None:
+    rng = np.random.default_rng(0)
+    ticks = rng.integers(MIN_TICK + 1, MAX_TICK - 1, n)
+    sqrt_ratios = get_sqrt_ratio_at_tick_batch(ticks)
+    # Probe each exact boundary and the value just below it
+    probes = np.concatenate([sqrt_ratios, sqrt_ratios - 1])
+    as_ints = [int(p) for p in probes]
+
+    _timed("float tick (old)", len(as_ints), lambda: [float_tick(p) for p in as_ints])
+    exact = _timed("exact tick (scalar)", len(as_ints), lambda: [get_tick_at_sqrt_ratio(p) for p in as_ints])
+    batch = _timed("exact tick (batch)", len(as_ints), lambda: get_tick_at_sqrt_ratio_batch(probes))
+    _timed("exact sqrt ratio (scalar)", n, lambda: [get_sqrt_ratio_at_tick(int(t)) for t in ticks])
+    _timed("exact sqrt ratio (batch)", n, lambda: get_sqrt_ratio_at_tick_batch(ticks))
+
+    assert batch.tolist() == exact
+    wrong = sum(1 for p, t in zip(as_ints, exact) if float_tick(p) != t)
+    print(f"float conversion disagrees on {wrong}/{len(as_ints)} boundary probes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,44 @@
+"""Index pool and position-manager events into a local SQLite database.
+
+Usage: python scripts/index_events.py START_BLOCK
+
+``START_BLOCK`` is required on the first run; later runs resume from the
+stored checkpoint. The database path comes from ``INDEXER_DB`` (default
+``.cache/events.sqlite``). Pools and position-manager token ids come from
+``PORTFOLIO`` (or ``UNISWAP_POSITION_TOKEN_ID``), so only the tracked
+positions are indexed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexer import EventIndexer  # noqa: E402
+from utils.logic import parse_portfolio  # noqa: E402
+from utils.uniswap import get_web3_client  # noqa: E402
+
+
+def main() -> None:
+    load_dotenv()
+    start = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    portfolio = parse_portfolio(os.getenv("PORTFOLIO", ""))
+    kwargs = {"pools": list(dict.fromkeys(e.pool for e in portfolio))} if portfolio else {}
+    token_ids = [e.token_id for e in portfolio if e.token_id is not None]
+    if not portfolio and os.getenv("UNISWAP_POSITION_TOKEN_ID"):
+        token_ids = [int(os.getenv("UNISWAP_POSITION_TOKEN_ID"))]
+    w3 = get_web3_client(os.getenv("RPC_URL_ARBITRUM"), os.getenv("RPC_FALLBACKS", ""))
+    path = os.getenv("INDEXER_DB", ".cache/events.sqlite")
+    indexer = EventIndexer(w3, path, start_block=start, token_ids=token_ids or None, **kwargs)
+    if start is None and indexer.checkpoint() is None:
+        sys.exit(f"No checkpoint in {path}: pass START_BLOCK for the first run")
+    indexer.sync()
+    print(f"[INDEX] Checkpoint at block {indexer.checkpoint()}")
+
+
+if __name__ == "__main__":
+    main()
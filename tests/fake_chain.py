@@ -0,0 +1,128 @@
+"""In-process JSON-RPC stand-in for exercising the Uniswap client offline."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector
+from web3.providers.base import BaseProvider
+
+from utils.uniswap import MULTICALL3_ADDRESS
+
+_GET_BLOCK_NUMBER = bytes.fromhex("42cbb15c")
+
+
+class Revert(Exception):
+    """Raise from a handler to make the fake contract revert with a reason."""
+
+
+def _types(params: List[Dict[str, Any]]) -> List[str]:
+    out = []
+    for p in params:
+        if p["type"].startswith("tuple"):
+            inner = ",".join(_types(p["components"]))
+            out.append(f"({inner}){p['type'][5:]}")
+        else:
+            out.append(p["type"])
+    return out
+
+
+class FakeChain(BaseProvider):
+    """Minimal provider answering ``eth_call`` from Python handlers.
+
+    Contracts are registered with :meth:`register` using the same ABIs as
+    the client. Calls to the Multicall3 address are decoded and dispatched to
+    the registered handlers, so batched and unbatched reads behave alike.
+    ``requests`` counts JSON-RPC round trips per method and ``logs`` holds
+    raw log dicts served by ``eth_getLogs``; with ``log_limit`` set, queries
+    matching more logs fail the way capped providers do. Block hashes can be
+    overridden through ``block_hashes`` to simulate a reorg.
+    """
+
+    def __init__(self, chain_id: int = 42161, block_number: int = 1) -> None:
+        self.chain_id = chain_id
+        self.block_number = block_number
+        self.requests: Counter = Counter()
+        self.logs: List[Dict[str, Any]] = []
+        self.log_limit: Optional[int] = None
+        self.block_hashes: Dict[int, str] = {}
+        self._handlers: Dict[Tuple[str, bytes], Tuple[Dict[str, Any], Callable]] = {}
+
+    # ------------------------------------------------------------------
+    def register(self, address: str, abi: List[Dict[str, Any]], **handlers: Callable) -> None:
+        for fn_abi in abi:
+            if fn_abi.get("type") == "function" and fn_abi["name"] in handlers:
+                selector = function_abi_to_4byte_selector(fn_abi)
+                self._handlers[(address.lower(), selector)] = (fn_abi, handlers[fn_abi["name"]])
+
+    # ------------------------------------------------------------------
+    def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        self.requests[method] += 1
+        if method == "eth_chainId":
+            return self._ok(hex(self.chain_id))
+        if method == "eth_blockNumber":
+            return self._ok(hex(self.block_number))
+        if method == "eth_call":
+            tx = params[0]
+            try:
+                data = self._call(tx["to"], bytes.fromhex(tx["data"][2:]))
+            except Revert as exc:
+                return {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": f"execution reverted: {exc}"}}
+            return self._ok("0x" + data.hex())
+        if method == "eth_getLogs":
+            logs = [log for log in self.logs if self._matches(log, params[0])]
+            if self.log_limit is not None and len(logs) > self.log_limit:
+                message = f"query returned more than {self.log_limit} results"
+                return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": message}}
+            return self._ok(logs)
+        if method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            default = "0x" + number.to_bytes(32, "big").hex()
+            return self._ok({"number": params[0], "hash": self.block_hashes.get(number, default)})
+        return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": f"{method} not supported"}}
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    # ------------------------------------------------------------------
+    def _matches(self, log: Dict[str, Any], flt: Dict[str, Any]) -> bool:
+        block = int(log["blockNumber"], 16)
+        if not int(flt["fromBlock"], 16) <= block <= int(flt["toBlock"], 16):
+            return False
+        addresses = flt.get("address") or []
+        addresses = [a.lower() for a in (addresses if isinstance(addresses, list) else [addresses])]
+        if addresses and log["address"].lower() not in addresses:
+            return False
+        for wanted, topic in zip(flt.get("topics") or [], log["topics"]):
+            if wanted is not None and topic not in (wanted if isinstance(wanted, list) else [wanted]):
+                return False
+        return True
+
+    def _call(self, to: str, data: bytes) -> bytes:
+        if to.lower() == MULTICALL3_ADDRESS.lower() and data[:4] == _GET_BLOCK_NUMBER:
+            return encode(["uint256"], [self.block_number])
+        if to.lower() == MULTICALL3_ADDRESS.lower():
+            (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+            results = []
+            for target, _, call_data in calls:
+                try:
+                    results.append((True, self._call(target, call_data)))
+                except Revert as exc:
+                    reason = bytes.fromhex("08c379a0") + encode(["string"], [str(exc)])
+                    results.append((False, reason))
+            return encode(["(bool,bytes)[]"], [results])
+        entry = self._handlers.get((to.lower(), data[:4]))
+        if entry is None:
+            raise Revert("unknown selector")
+        fn_abi, handler = entry
+        args = decode(_types(fn_abi["inputs"]), data[4:])
+        out = handler(*args)
+        out_types = _types(fn_abi["outputs"])
+        if len(out_types) == 1:
+            out = (out,)
+        return encode(out_types, list(out))
+
+    def _ok(self, result: Any) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
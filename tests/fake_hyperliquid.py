@@ -0,0 +1,31 @@
+"""Light ``hyperliquid.info.Info`` stand-in for worker processes.
+
+Importing it pulls in neither the SDK nor web3, so spawned children start
+quickly.
+"""
+
+import time
+from typing import Any, Dict
+
+
+class FakeInfo:
+    """Every wallet holds a short ETH hedge; counts the requests it serves."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.requests = 0
+
+    def user_state(self, address: str) -> Dict[str, Any]:
+        self.requests += 1
+        return {"assetPositions": [{"position": {"coin": "ETH", "szi": "-1.5", "positionValue": "4500"}}]}
+
+    def all_mids(self) -> Dict[str, str]:
+        self.requests += 1
+        return {"ETH": "3000.0"}
+
+
+class HangingInfo(FakeInfo):
+    """``Info`` whose account reads never come back in time."""
+
+    def user_state(self, address: str) -> Dict[str, Any]:
+        time.sleep(60)
+        return super().user_state(address)
@@ -0,0 +1,129 @@
+"""Local HTTP server answering JSON-RPC from a :class:`FakeChain`.
+
+Used by the offline benchmarks and by tests that need real HTTP behaviour:
+per-request latency, random 5xx errors and 429 rate limiting can be
+injected. GraphQL bodies (``{"query": ...}``) get subgraph-shaped ETH price
+answers so the price sources can be pointed at the same server.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from fake_chain import FakeChain
+
+
+class FakeRpcServer:
+    """Serve ``chain`` on ``127.0.0.1`` with optional fault injection.
+
+    ``rate_limit`` is a token bucket in requests per second (burst of one
+    second); throttled requests get ``429`` with ``Retry-After``. ``stats``
+    counts HTTP requests, JSON-RPC calls per method, errors and throttles.
+    """
+
+    def __init__(
+        self,
+        chain: FakeChain,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        eth_price: float = 3000.0,
+        seed: int = 0,
+    ) -> None:
+        self.chain = chain
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.eth_price = eth_price
+        self.stats: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload, headers = server.handle(json.loads(body or b"null"))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in {**headers, "Content-Type": "application/json"}.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-rpc", daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # ------------------------------------------------------------------
+    def handle(self, body: Any) -> "tuple[int, Any, Dict[str, str]]":
+        with self._lock:
+            self.stats["http"] += 1
+            if self.rate_limit is not None and not self._take_token():
+                self.stats["throttled"] += 1
+                return 429, {"error": "rate limited"}, {"Retry-After": "1"}
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503, {"error": "unavailable"}, {}
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(body, dict) and "query" in body:
+            self.stats["graphql"] += 1
+            return 200, self._graphql(body["query"]), {}
+        calls = body if isinstance(body, list) else [body]
+        replies = []
+        for call in calls:
+            with self._lock:
+                self.stats[call["method"]] += 1
+                reply = self.chain.make_request(call["method"], call.get("params", []))
+            replies.append({**reply, "id": call.get("id")})
+        return 200, replies if isinstance(body, list) else replies[0], {}
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _graphql(self, query: str) -> Dict[str, Any]:
+        if "bundle" in query:
+            return {"data": {"bundle": {"ethPriceUSD": str(self.eth_price)}}}
+        return {
+            "data": {
+                "pool": {
+                    "token0": {"symbol": "WETH"},
+                    "token1": {"symbol": "USDC"},
+                    "token0Price": str(self.eth_price),
+                    "token1Price": str(1 / self.eth_price),
+                }
+            }
+        }
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from web3 import Web3
+
+from fake_chain import FakeChain
+from utils.engine import check_and_alert_async, run_fixed_rate
+from utils.logic import BotLogic, IncrementalBotLogic, PortfolioEntry
+from utils.uniswap import (
+    INCREASE_LIQUIDITY_TOPIC,
+    NONFUNGIBLE_POSITION_MANAGER,
+    POOL_WETH_USDC_005,
+    POSITION_MANAGER_ABI,
+    UNISWAP_V3_POOL_ABI,
+    CallResult,
+    PoolMetadataRegistry,
+    UniswapClient,
+)
+
+TOKEN0, TOKEN1 = "0x" + "11" * 20, "0x" + "22" * 20
+
+
+class SlowUniswap:
+    def get_pool_states(self, pools):
+        time.sleep(0.2)
+        return {p: CallResult(True, {"sqrtPriceX96": 1 << 96, "tick": 0}) for p in pools}
+
+    def get_positions(self, token_ids):
+        time.sleep(0.2)
+        return {t: CallResult(True, [0, None, None, None, 500, -50, 500, 1]) for t in token_ids}
+
+
+class SlowHyperliquid:
+    def get_positions(self, symbols):
+        time.sleep(0.2)
+        return {s: {"coin": s, "szi": "-1.0"} for s in symbols}
+
+
+def test_cycle_latency_is_max_of_sources(capsys):
+    def price():
+        time.sleep(0.2)
+        return 3000.0
+
+    bot = BotLogic(SlowUniswap(), SlowHyperliquid(), lp_token_id=1, price_source=price)
+    start = time.perf_counter()
+    asyncio.run(check_and_alert_async(bot))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.6
+    out = capsys.readouterr().out
+    assert "tick=0" in out
+    assert "Reference ETH/USDC price: 3000.0" in out
+    assert "[ALERT] Price near lower bound" in out
+
+
+def test_incremental_async_cycle_sees_liquidity_changes_at_the_polled_block():
+    chain = FakeChain()
+    liquidity = {"value": 1}
+    chain.register(POOL_WETH_USDC_005, UNISWAP_V3_POOL_ABI, slot0=lambda: (1 << 96, 0, 0, 1, 1, 0, True), liquidity=lambda: 10**18)
+    chain.register(
+        NONFUNGIBLE_POSITION_MANAGER,
+        POSITION_MANAGER_ABI,
+        positions=lambda t: (0, TOKEN0, TOKEN0, TOKEN1, 500, -50, 500, liquidity["value"], 0, 0, 0, 0),
+    )
+    registry = PoolMetadataRegistry("")
+    registry.put(42161, POOL_WETH_USDC_005, {"fee": 500, "token0": TOKEN0, "token1": TOKEN1, "decimals0": 18, "decimals1": 6})
+    client = UniswapClient(w3=Web3(chain), metadata=registry, chain_id=42161)
+    bot = IncrementalBotLogic(client, SlowHyperliquid(), portfolio=[PortfolioEntry(POOL_WETH_USDC_005, 1, "ETH")])
+    asyncio.run(check_and_alert_async(bot))
+
+    chain.block_number, liquidity["value"] = 5, 2
+    chain.logs.append(
+        {
+            "address": NONFUNGIBLE_POSITION_MANAGER,
+            "topics": [INCREASE_LIQUIDITY_TOPIC, "0x" + (1).to_bytes(32, "big").hex()],
+            "data": "0x",
+            "blockNumber": hex(5),
+            "blockHash": "0x" + "00" * 32,
+            "transactionHash": "0x" + "00" * 32,
+            "transactionIndex": "0x0",
+            "logIndex": "0x0",
+            "removed": False,
+        }
+    )
+    asyncio.run(check_and_alert_async(bot))
+    # The event is found in the cycle that polled block 5, not one cycle later.
+    assert bot.stats["bounds_miss"] == 2
+    assert bot.position_liquidity[1] == 2
+
+
+def test_run_fixed_rate_keeps_cadence():
+    starts = []
+
+    async def cycle():
+        starts.append(time.perf_counter())
+        await asyncio.sleep(0.03)
+
+    async def runner():
+        await asyncio.wait_for(run_fixed_rate(cycle, 0.1), timeout=0.45)
+
+    try:
+        asyncio.run(runner())
+    except asyncio.TimeoutError:
+        pass
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(gaps) >= 3
+    assert all(abs(g - 0.1) < 0.03 for g in gaps)
@@ -0,0 +1,105 @@
+import utils.hyperliquid as hl
+from utils.hyperliquid import HyperliquidAPI
+
+USER_STATE = {
+    "assetPositions": [
+        {"position": {"coin": "ETH", "szi": "-2.5", "entryPx": "3000.0"}, "type": "oneWay"},
+        {"position": {"coin": "BTC", "szi": "0.1", "entryPx": "60000.0"}, "type": "oneWay"},
+    ],
+    "marginSummary": {"accountValue": "10000.0", "totalMarginUsed": "1500.0"},
+    "withdrawable": "8500.0",
+}
+
+
+class FakeInfo:
+    def __init__(self):
+        self.calls = 0
+
+    def user_state(self, address):
+        self.calls += 1
+        return USER_STATE
+
+
+def _api(monkeypatch, **kwargs):
+    monkeypatch.setattr(hl, "Info", FakeInfo)
+    return HyperliquidAPI("0xabc", **kwargs)
+
+
+def test_snapshot_serves_many_reads_from_one_call(monkeypatch):
+    api = _api(monkeypatch, snapshot_ttl=60)
+    assert api.get_position("eth")["szi"] == "-2.5"
+    assert api.get_positions(["ETH", "BTC", "SOL"]) == {
+        "ETH": USER_STATE["assetPositions"][0]["position"],
+        "BTC": USER_STATE["assetPositions"][1]["position"],
+        "SOL": None,
+    }
+    assert api.get_margin()["withdrawable"] == "8500.0"
+    assert api.info.calls == 1
+
+
+def test_snapshot_refetches_after_ttl(monkeypatch):
+    api = _api(monkeypatch, snapshot_ttl=0)
+    api.get_position("ETH")
+    api.get_position("ETH")
+    assert api.info.calls == 2
+
+
+class FakeStreamingInfo(FakeInfo):
+    def __init__(self):
+        super().__init__()
+        self.mids_calls = 0
+        self.callback = None
+
+    def subscribe(self, subscription, callback):
+        assert subscription == {"type": "allMids"}
+        self.callback = callback
+
+    def all_mids(self):
+        self.mids_calls += 1
+        return {"ETH": "3000.5", "BTC": "60000"}
+
+
+def test_mark_price_served_from_stream_without_io(monkeypatch):
+    monkeypatch.setattr(hl, "Info", FakeStreamingInfo)
+    api = HyperliquidAPI("0xabc")
+    assert api.get_mark_price("eth") == 3000.5
+    assert api.info.mids_calls == 1
+    api.info.callback({"channel": "allMids", "data": {"mids": {"ETH": "3010.0"}}})
+    assert api.get_mark_price("ETH") == 3010.0
+    assert api.get_mark_price("BTC") == 60000.0
+    assert api.info.mids_calls == 1
+
+
+def test_mark_price_polls_when_stream_is_quiet(monkeypatch):
+    monkeypatch.setattr(hl, "Info", FakeStreamingInfo)
+    api = HyperliquidAPI("0xabc")
+    api.prices.max_age = 0
+    api.get_mark_price("ETH")
+    api.get_mark_price("ETH")
+    assert api.info.mids_calls == 2
+
+
+class BrokenMidsInfo(FakeStreamingInfo):
+    def all_mids(self):
+        raise ConnectionError("all_mids down")
+
+    def l2_snapshot(self, coin):
+        return {"mid": "2999.0"}
+
+
+def test_mark_price_falls_back_to_order_book_when_all_mids_fails(monkeypatch):
+    monkeypatch.setattr(hl, "Info", BrokenMidsInfo)
+    api = HyperliquidAPI("0xabc")
+    assert api.get_mark_price("ETH") == 2999.0
+
+
+def test_quiet_stream_is_no_longer_reported_as_streaming(monkeypatch):
+    monkeypatch.setattr(hl, "Info", FakeStreamingInfo)
+    api = HyperliquidAPI("0xabc")
+    api.get_mark_price("ETH")
+    assert api.prices.streaming
+    api.prices.max_age = 0
+    api.get_mark_price("ETH")
+    assert not api.prices.streaming
+    api.info.callback({"channel": "allMids", "data": {"mids": {"ETH": "3010.0"}}})
+    assert api.prices.streaming
@@ -0,0 +1,103 @@
+import pytest
+from web3 import Web3
+
+from fake_chain import FakeChain
+from utils.indexer import MINT_TOPIC, TRANSFER_TOPIC, EventIndexer
+from utils.stream import SWAP_TOPIC
+from utils.uniswap import INCREASE_LIQUIDITY_TOPIC, NONFUNGIBLE_POSITION_MANAGER, POOL_WETH_USDC_005
+
+
+def _word(value: int) -> str:
+    return (value % (1 << 256)).to_bytes(32, "big").hex()
+
+
+def _log(address, topics, words, block, index=0):
+    return {
+        "address": address,
+        "topics": topics,
+        "data": "0x" + "".join(_word(w) for w in words),
+        "blockNumber": hex(block),
+        "blockHash": "0x" + block.to_bytes(32, "big").hex(),
+        "transactionHash": "0x" + "ab" * 32,
+        "transactionIndex": "0x0",
+        "logIndex": hex(index),
+        "removed": False,
+    }
+
+
+def _chain():
+    chain = FakeChain(block_number=100)
+    for block in range(10, 100, 3):
+        chain.logs.append(_log(POOL_WETH_USDC_005, [SWAP_TOPIC], [-5, 7, 1 << 96, 10**18, -200], block))
+    chain.logs.append(
+        _log(
+            POOL_WETH_USDC_005,
+            [MINT_TOPIC, "0x" + _word(0x1234), "0x" + _word(-600), "0x" + _word(600)],
+            [0x99, 10**12, 3, 4],
+            50,
+            1,
+        )
+    )
+    chain.logs.append(
+        _log(NONFUNGIBLE_POSITION_MANAGER, [INCREASE_LIQUIDITY_TOPIC, "0x" + _word(7)], [10**12, 3, 4], 50, 2)
+    )
+    return chain
+
+
+def test_indexer_adapts_chunks_and_resumes(tmp_path):
+    chain = _chain()
+    chain.log_limit = 5
+    path = str(tmp_path / "events.sqlite")
+    indexer = EventIndexer(Web3(chain), path, start_block=0, chunk=100)
+    assert indexer.sync() == 32
+    assert indexer.checkpoint() == 100
+    assert indexer.chunk < 100
+
+    swaps = list(indexer.swaps(40, 60))
+    assert [s["blockNumber"] for s in swaps] == [40, 43, 46, 49, 52, 55, 58]
+    assert swaps[0]["tick"] == -200 and swaps[0]["amount0"] == -5 and swaps[0]["sqrtPriceX96"] == 1 << 96
+    assert indexer.position_history(7) == [
+        {"blockNumber": 50, "logIndex": 2, "kind": "increase", "account": None,
+         "liquidity": 10**12, "amount0": 3, "amount1": 4}
+    ]
+    row = indexer.db.execute("SELECT tick_lower, tick_upper, amount FROM pool_liquidity").fetchone()
+    assert row == (-600, 600, str(10**12))
+
+    chain.block_number = 120
+    chain.logs.append(_log(POOL_WETH_USDC_005, [SWAP_TOPIC], [1, -1, 1 << 96, 1, 5], 110))
+    resumed = EventIndexer(Web3(chain), path, start_block=0)
+    assert resumed.sync() == 1
+    assert resumed.checkpoint() == 120
+
+
+def test_indexer_rolls_back_on_reorg(tmp_path):
+    chain = _chain()
+    indexer = EventIndexer(Web3(chain), str(tmp_path / "events.sqlite"), start_block=0, reorg_depth=20)
+    indexer.sync()
+    chain.logs = [log for log in chain.logs if int(log["blockNumber"], 16) < 90]
+    chain.block_hashes[100] = "0x" + "ff" * 32
+    indexer.sync()
+    assert [s["blockNumber"] for s in indexer.swaps(80)] == [82, 85, 88]
+    assert indexer.checkpoint() == 100
+
+
+def test_indexer_filters_tracked_positions_and_pools(tmp_path):
+    chain = _chain()
+    other_pool = "0x" + "11" * 20
+    chain.logs.append(_log(other_pool, [SWAP_TOPIC], [1, -1, 1 << 96, 1, 5], 60))
+    chain.logs.append(
+        _log(NONFUNGIBLE_POSITION_MANAGER, [INCREASE_LIQUIDITY_TOPIC, "0x" + _word(8)], [10**12, 3, 4], 60, 1)
+    )
+    chain.logs.append(
+        _log(NONFUNGIBLE_POSITION_MANAGER, [TRANSFER_TOPIC, "0x" + _word(0), "0x" + _word(0xBEEF), "0x" + _word(7)], [], 61)
+    )
+    path = str(tmp_path / "events.sqlite")
+    with pytest.raises(ValueError):
+        EventIndexer(Web3(chain), path).sync()
+
+    indexer = EventIndexer(Web3(chain), path, pools=[POOL_WETH_USDC_005, other_pool], start_block=0, token_ids=[7])
+    indexer.sync()
+    assert [e["kind"] for e in indexer.position_history(7)] == ["increase", "transfer"]
+    assert indexer.position_history(8) == []
+    assert [s["blockNumber"] for s in indexer.swaps(55, 65, pool=other_pool)] == [60]
+    assert [s["blockNumber"] for s in indexer.swaps(55, 65, pool=POOL_WETH_USDC_005)] == [55, 58, 61, 64]
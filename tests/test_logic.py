@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from web3 import Web3
+
+from fake_chain import FakeChain
+from utils.logic import BotLogic, IncrementalBotLogic, PortfolioEntry, parse_portfolio
+from utils.recorder import SampleReader, SampleRecorder
+from utils.uniswap import (
+    INCREASE_LIQUIDITY_TOPIC,
+    NONFUNGIBLE_POSITION_MANAGER,
+    POOL_WETH_USDC_005,
+    POSITION_MANAGER_ABI,
+    UNISWAP_V3_POOL_ABI,
+    USDC,
+    WETH,
+    PoolMetadataRegistry,
+    UniswapClient,
+)
+from utils.valuation import Q96, position_amounts, sqrt_price_at_ticks
+
+OTHER_POOL = "0xC6962004f452bE9203591991D15f6b388e09E8D0"
+META = {"fee": 500, "token0": "0x" + "11" * 20, "token1": "0x" + "22" * 20, "decimals0": 18, "decimals1": 6}
+BOUNDS = {1: (-500, 150), 2: (0, 900), 3: (0, 1000)}
+
+
+class FakeHyperliquid:
+    def __init__(self):
+        self.calls = 0
+
+    def get_positions(self, symbols):
+        self.calls += 1
+        return {s: {"coin": s, "szi": "-1.0"} for s in symbols}
+
+
+def _client():
+    chain = FakeChain()
+    for pool, tick in ((POOL_WETH_USDC_005, 100), (OTHER_POOL, 950)):
+        chain.register(
+            pool,
+            UNISWAP_V3_POOL_ABI,
+            slot0=lambda tick=tick: (1 << 96, tick, 0, 1, 1, 0, True),
+            liquidity=lambda: 10**18,
+        )
+    chain.register(
+        NONFUNGIBLE_POSITION_MANAGER,
+        POSITION_MANAGER_ABI,
+        positions=lambda t: (0, META["token0"], META["token0"], META["token1"], 500, *BOUNDS[t], 1, 0, 0, 0, 0),
+    )
+    registry = PoolMetadataRegistry("")
+    for pool in (POOL_WETH_USDC_005, OTHER_POOL):
+        registry.put(42161, pool, META)
+    return chain, UniswapClient(w3=Web3(chain), metadata=registry, chain_id=42161)
+
+
+def test_portfolio_cycle_cost_scales_with_pools(capsys):
+    chain, client = _client()
+    hyper = FakeHyperliquid()
+    portfolio = [
+        PortfolioEntry(POOL_WETH_USDC_005, 1, "ETH"),
+        PortfolioEntry(POOL_WETH_USDC_005, 2, "ETH"),
+        PortfolioEntry(OTHER_POOL, 3, "BTC"),
+    ]
+    bot = BotLogic(client, hyper, portfolio=portfolio)
+    bot.check_and_alert()
+
+    assert chain.requests["eth_call"] == 2
+    assert hyper.calls == 1
+    out = capsys.readouterr().out
+    assert "[ALERT] Price near upper bound (token 1)" in out
+    assert "[ALERT] Price near lower bound (token 2)" in out
+    assert "[ALERT] Price near upper bound (token 3)" in out
+    assert "[HEDGE] ETH LP delta=" in out and "hedge=-1.0" in out
+
+
+def test_parse_portfolio():
+    entries = parse_portfolio(f"{POOL_WETH_USDC_005.lower()}:42:eth, {OTHER_POOL}:7:btc,{OTHER_POOL}")
+    assert entries == [
+        PortfolioEntry(POOL_WETH_USDC_005, 42, "ETH"),
+        PortfolioEntry(OTHER_POOL, 7, "BTC"),
+        PortfolioEntry(OTHER_POOL, None, "ETH"),
+    ]
+
+
+def test_incremental_skips_unchanged_cycles(capsys):
+    chain, client = _client()
+    bot = IncrementalBotLogic(client, FakeHyperliquid(), portfolio=[PortfolioEntry(POOL_WETH_USDC_005, 1, "ETH")])
+    bot.check_and_alert()
+    assert "[ALERT] Price near upper bound" in capsys.readouterr().out
+    calls = chain.requests["eth_call"]
+
+    bot.check_and_alert()
+    out = capsys.readouterr().out
+    assert "[ALERT]" not in out and "No change at block 1" in out
+    assert chain.requests["eth_call"] == calls + 1  # pool state only, bounds cached
+    assert bot.stats["cycle_hit"] == 1 and bot.stats["bounds_hit"] == 1
+
+    chain.block_number = 5
+    bot.check_and_alert()
+    assert chain.requests["eth_getLogs"] == 1
+    assert bot.stats["bounds_hit"] == 2
+
+    chain.logs.append(
+        {
+            "address": NONFUNGIBLE_POSITION_MANAGER,
+            "topics": [INCREASE_LIQUIDITY_TOPIC, "0x" + (1).to_bytes(32, "big").hex()],
+            "data": "0x",
+            "blockNumber": hex(6),
+            "blockHash": "0x" + "00" * 32,
+            "transactionHash": "0x" + "00" * 32,
+            "transactionIndex": "0x0",
+            "logIndex": "0x0",
+            "removed": False,
+        }
+    )
+    chain.block_number = 6
+    bot.check_and_alert()
+    assert bot.stats["bounds_miss"] == 2
+
+
+def test_cycle_samples_are_recorded(tmp_path):
+    _, client = _client()
+    recorder = SampleRecorder(str(tmp_path), segment_records=8)
+    bot = BotLogic(client, FakeHyperliquid(), portfolio=[PortfolioEntry(OTHER_POOL, 3, "BTC")], recorder=recorder)
+    bot.check_and_alert()
+    recorder.flush()
+    rows = SampleReader(str(tmp_path)).all()
+    assert rows["tick"].tolist() == [950] and rows["block"].tolist() == [1]
+    assert rows["hedge"].tolist() == [-1.0]
+
+
+def test_hedge_uses_the_pool_side_matching_the_symbol(capsys):
+    liquidity, bounds = 10**18, (-1000, 2000)
+    amount0, amount1 = position_amounts(
+        np.array([liquidity], dtype=np.float64), np.array([1.0]), *(sqrt_price_at_ticks([b]) for b in bounds)
+    )
+    drifts = {}
+    for token0, token1, expected in ((WETH, USDC, amount0[0]), (USDC, WETH, amount1[0])):
+        bot = BotLogic(None, None, portfolio=[PortfolioEntry(POOL_WETH_USDC_005, 1, "ETH")])
+        bot.position_liquidity[1] = liquidity
+        state = {"sqrtPriceX96": Q96, "tick": 0, "token0": token0, "token1": token1, "decimals0": 18, "decimals1": 18}
+        bot._report_hedge({POOL_WETH_USDC_005: state}, {"ETH": None}, {1: bounds})
+        drifts[token1] = bot.hedge_drift["ETH"]
+        assert drifts[token1] == pytest.approx(expected / 1e18)
+    assert drifts[USDC] != pytest.approx(drifts[WETH])
+    assert "[WARN]" not in capsys.readouterr().out
@@ -0,0 +1,64 @@
+import json
+import urllib.request
+
+import pytest
+from tenacity import wait_none
+
+from utils import metrics
+from utils.metrics import Counter, Histogram, Registry, serve
+from utils.uniswap import rpc_retry
+
+
+def test_prometheus_exposition():
+    registry = Registry()
+    hist = registry.register(Histogram("req_seconds", "Latency", ("method",), buckets=(0.1, 1.0)))
+    count = registry.register(Counter("errors_total", "Errors"))
+    hist.labels("eth_call").observe(0.05)
+    hist.labels("eth_call").observe(0.5)
+    hist.labels("eth_call").observe(5)
+    count.inc()
+    text = registry.render()
+    assert '# TYPE req_seconds histogram' in text
+    assert 'req_seconds_bucket{method="eth_call",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{method="eth_call",le="1"} 2' in text
+    assert 'req_seconds_bucket{method="eth_call",le="+Inf"} 3' in text
+    assert 'req_seconds_count{method="eth_call"} 3' in text
+    assert "errors_total 1" in text
+
+
+def test_retries_and_degraded_transitions_are_counted():
+    calls = []
+
+    @rpc_retry
+    def flaky_read():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError("transient")
+        return "ok"
+
+    before = metrics.RPC_RETRIES.labels("flaky_read").value
+    assert flaky_read.retry_with(wait=wait_none())() == "ok"
+    assert metrics.RPC_RETRIES.labels("flaky_read").value == before + 2
+
+    transitions = metrics.DEGRADED_TRANSITIONS.labels().value
+    for state in (True, True, False, True):
+        metrics.set_degraded(state)
+    assert metrics.DEGRADED_TRANSITIONS.labels().value == transitions + 2
+    metrics.set_degraded(False)
+
+
+def test_http_endpoints():
+    state = {"ok": True}
+    server = serve(0, lambda: (state["ok"], {"status": "ok" if state["ok"] else "stalled"}), host="127.0.0.1")
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        body = urllib.request.urlopen(f"{base}/metrics").read().decode()
+        assert "# TYPE rpc_request_seconds histogram" in body
+        assert json.loads(urllib.request.urlopen(f"{base}/healthz").read())["status"] == "ok"
+        state["ok"] = False
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(f"{base}/healthz")
+        assert err.value.code == 503
+    finally:
+        server.shutdown()
+        server.server_close()
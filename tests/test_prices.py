@@ -0,0 +1,52 @@
+import time
+
+from utils.prices import PriceAggregator
+
+
+def _source(price, delay=0.0, fail=False, calls=None):
+    def fetch(session, timeout):
+        if calls is not None:
+            calls.append(1)
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("down")
+        return price
+
+    return fetch
+
+
+def test_first_valid_answer_wins_within_deadline():
+    agg = PriceAggregator(
+        {"slow": _source(1.0, delay=1.0), "fast": _source(3000.0), "broken": _source(0, fail=True)},
+        deadline=0.5,
+    )
+    start = time.perf_counter()
+    assert agg.get() == 3000.0
+    assert time.perf_counter() - start < 0.5
+
+
+def test_deadline_bounds_latency_when_sources_hang():
+    agg = PriceAggregator({"a": _source(1.0, delay=2.0), "b": _source(2.0, delay=2.0)}, deadline=0.2)
+    start = time.perf_counter()
+    assert agg.get() is None
+    assert time.perf_counter() - start < 0.5
+
+
+def test_quorum_returns_median_and_caches():
+    calls = []
+    agg = PriceAggregator(
+        {"a": _source(2990.0, calls=calls), "b": _source(3000.0, calls=calls), "c": _source(3100.0, calls=calls)},
+        quorum=3,
+        ttl=60,
+    )
+    assert agg.get() == 3000.0
+    assert agg.get() == 3000.0
+    assert len(calls) == 3
+
+
+def test_circuit_breaker_skips_dead_source():
+    calls = []
+    agg = PriceAggregator({"dead": _source(0, fail=True, calls=calls), "ok": _source(3000.0)}, ttl=0, quorum=2)
+    for _ in range(5):
+        assert agg.get() == 3000.0
+    assert len(calls) == agg.breakers["dead"].max_failures
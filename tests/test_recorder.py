@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+from utils.recorder import SampleReader, SampleRecorder
+
+
+def _fill(directory, n, start=0, segment_records=4):
+    rec = SampleRecorder(str(directory), segment_records=segment_records)
+    for i in range(start, start + n):
+        rec.append(1000.0 + i, 100 + i, (1 << 96) * 2, 6931 + i, 10**18, hedge=-1.5 if i % 2 else None, mark=3000.0)
+    rec.close()
+
+
+def test_recorder_rotates_and_resumes(tmp_path):
+    _fill(tmp_path, 6)
+    _fill(tmp_path, 4, start=6)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["seg-000000.bin", "seg-000001.bin", "seg-000002.bin"]
+
+    reader = SampleReader(str(tmp_path))
+    rows = reader.all()
+    assert len(reader) == 10
+    assert rows["block"].tolist() == list(range(100, 110))
+    assert rows["sqrt_price"][0] == 2.0 and rows["tick"][9] == 6940
+    assert math.isnan(rows["hedge"][0]) and rows["hedge"][1] == -1.5
+
+
+def test_reader_range_queries(tmp_path):
+    _fill(tmp_path, 10)
+    reader = SampleReader(str(tmp_path))
+    assert reader.range(1001.0, 1003.0)["block"].tolist() == [101, 102]
+    assert reader.range(105, 108, field="block")["timestamp"].tolist() == [1005.0, 1006.0, 1007.0]
+    assert len(reader.range(2000.0)) == 0
+
+    view = reader.range(1000.0, 1002.0)
+    assert isinstance(view, np.memmap)  # inside one segment: no copy
+
+
+def test_reader_views_are_per_segment_and_zero_copy(tmp_path):
+    _fill(tmp_path, 10)
+    reader = SampleReader(str(tmp_path))
+    views = reader.views(1002.0, 1009.0)
+    assert [len(v) for v in views] == [2, 4, 1]
+    assert all(isinstance(v, np.memmap) for v in views)
+    assert np.concatenate(views)["block"].tolist() == list(range(102, 109))
+
+
+def test_block_queries_skip_rows_without_block(tmp_path):
+    rec = SampleRecorder(str(tmp_path), segment_records=4)
+    for i, block in enumerate([100, None, 101, 102, None, 103]):
+        rec.append(1000.0 + i, block, 1 << 96, 0, 10**18)
+    rec.close()
+    reader = SampleReader(str(tmp_path))
+    assert reader.range(101, 103, field="block")["timestamp"].tolist() == [1002.0, 1003.0]
+    assert reader.range(100, field="block")["block"].tolist() == [100, 101, 102, 103]
+    assert len(reader.range(1000.0)) == 6
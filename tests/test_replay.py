@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+
+from utils.recorder import RECORD_DTYPE
+from utils.replay import ReplayConfig, grid, history_from_swaps, replay, sweep
+from utils.valuation import sqrt_price_at_ticks
+
+
+def _history():
+    ticks = [0, 0, 0, 50, 150, 250, 250, 100, 0, 0]
+    history = np.zeros(len(ticks), dtype=RECORD_DTYPE)
+    history["timestamp"] = np.arange(len(ticks)) * 10.0
+    history["block"] = np.arange(len(ticks))
+    history["tick"] = ticks
+    history["sqrt_price"] = sqrt_price_at_ticks(ticks)
+    history["liquidity"] = 1e18
+    history["hedge"] = -0.5
+    history["mark"] = math.nan
+    return history
+
+
+def test_replay_metrics_match_stepwise_semantics():
+    config = ReplayConfig(tick_lower=-200, tick_upper=200, liquidity=10**18, alert_ticks=100)
+    metrics = replay(_history(), config)
+    assert metrics["samples"] == 10
+    assert metrics["evaluations"] == 6  # repeated samples are evaluated once
+    assert metrics["alerts"] == 4  # ticks 150, 250, 250 and 100
+    assert metrics["time_out_of_range"] == 20.0
+    assert metrics["drift_max_abs"] > 0
+
+
+def test_sweep_over_process_pool():
+    base = ReplayConfig(tick_lower=-200, tick_upper=200, liquidity=10**18)
+    configs = grid(base, alert_ticks=[0, 100], hedge_size=[0.0, -1.0])
+    results = sweep(_history(), configs, workers=2)
+    assert [c for c, _ in results] == configs
+    alerts = {(c.alert_ticks, c.hedge_size): m["alerts"] for c, m in results}
+    assert alerts[(0, 0.0)] < alerts[(100, 0.0)]
+    assert results == sweep(_history(), configs, workers=1)
+
+
+def test_history_from_swaps():
+    swaps = [{"blockNumber": 7, "tick": -3, "sqrtPriceX96": 1 << 96, "liquidity": 10}]
+    history = history_from_swaps(swaps, hedge=-1.0)
+    assert history["timestamp"].tolist() == [7.0] and history["sqrt_price"].tolist() == [1.0]
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from utils.rpc import RpcPool, RpcUnavailable
+
+
+class FakeEndpoint:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def make_request(self, method, params):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("down")
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+
+
+def _pool(*fakes, **kwargs):
+    pool = RpcPool([f"http://rpc{i}" for i in range(len(fakes))], **kwargs)
+    for ep, fake in zip(pool.endpoints, fakes):
+        ep.provider = fake
+    return pool
+
+
+def test_routes_to_fastest_endpoint():
+    slow, fast = FakeEndpoint(0.02), FakeEndpoint(0.0)
+    pool = _pool(slow, fast, hedge=False)
+    assert pool.probe_all() == 2
+    for _ in range(5):
+        pool.make_request("eth_blockNumber", [])
+    assert fast.calls == 6 and slow.calls == 1
+
+
+def test_fails_over_and_recovers():
+    bad, good = FakeEndpoint(fail=True), FakeEndpoint()
+    pool = _pool(bad, good, hedge=False, max_failures=1)
+    assert pool.make_request("eth_blockNumber", [])["result"] == "0x1"
+    assert not pool.endpoints[0].up
+    bad.fail = False
+    pool.endpoints[0].down_until = time.monotonic()
+    deadline = time.monotonic() + 3
+    while not pool.endpoints[0].up and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert pool.endpoints[0].up
+
+
+def test_raises_when_all_endpoints_down():
+    pool = _pool(FakeEndpoint(fail=True), hedge=False, max_failures=1)
+    with pytest.raises(RpcUnavailable):
+        pool.make_request("eth_blockNumber", [])
+    with pytest.raises(RpcUnavailable):
+        pool.make_request("eth_blockNumber", [])
+
+
+def test_hedged_request_beats_stalled_primary():
+    primary, backup = FakeEndpoint(0.01), FakeEndpoint(0.05)
+    pool = _pool(primary, backup, hedge=True)
+    pool.probe_all()
+    for _ in range(5):
+        pool.make_request("eth_blockNumber", [])
+    primary.delay = 1.0
+    start = time.perf_counter()
+    pool.make_request("eth_blockNumber", [])
+    assert time.perf_counter() - start < 0.5
+    assert backup.calls >= 1
+
+
+def test_throttled_endpoint_fails_over_over_http():
+    from fake_chain import FakeChain
+    from fake_rpc_server import FakeRpcServer
+
+    throttled, healthy = FakeRpcServer(FakeChain(), rate_limit=1), FakeRpcServer(FakeChain(), latency=0.05)
+    try:
+        pool = RpcPool([throttled.start(), healthy.start()], timeout=2, hedge=False, max_failures=1)
+        assert pool.probe_all() == 2  # uses the throttled endpoint's only token
+        for _ in range(5):
+            assert pool.make_request("eth_blockNumber", [])["result"] == "0x1"
+        assert throttled.stats["throttled"] >= 1
+        assert healthy.stats["eth_blockNumber"] >= 1
+    finally:
+        throttled.stop()
+        healthy.stop()
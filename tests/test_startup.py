@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import time
+
+import main
+import utils.hyperliquid as hl
+from utils import uniswap
+from utils.uniswap import _checksum
+
+
+def test_main_does_not_import_heavy_sdks():
+    deferred = ("web3", "hyperliquid", "eth_account", "websocket", "utils.supervisor", "utils.recorder")
+    code = f"import main, sys; print(sorted(m for m in {deferred!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_address_constants_are_checksummed():
+    for name in ("WETH", "USDC", "FACTORY_ADDRESS", "QUOTER_V2_ADDRESS", "NONFUNGIBLE_POSITION_MANAGER",
+                 "POOL_WETH_USDC_005", "MULTICALL3_ADDRESS"):
+        address = getattr(uniswap, name)
+        assert _checksum(address) == address, name
+
+
+class SlowInfo:
+    def __init__(self, *args, **kwargs):
+        time.sleep(0.3)
+
+
+def test_start_bot_connects_while_hyperliquid_starts(monkeypatch):
+    client = object()
+    seen = []
+
+    def connect(rpc_url, fallbacks, pools):
+        time.sleep(0.3)
+        seen.append(pools)
+        return client
+
+    monkeypatch.setattr(hl, "Info", SlowInfo)
+    monkeypatch.setattr(main, "connect_uniswap", connect)
+    start = time.perf_counter()
+    bot = main.start_bot("0xabc", "http://rpc", "", lp_token_id=1)
+    assert time.perf_counter() - start < 0.5
+    assert bot.uniswap is client and isinstance(bot.hyperliquid.info, SlowInfo)
+    assert seen == [[uniswap.POOL_WETH_USDC_005]]
@@ -0,0 +1,122 @@
+import json
+
+from utils.logic import BotLogic
+from utils.stream import PoolStream, decode_swap_log
+from utils.uniswap import CallResult, RpcUnavailable
+
+
+def _word(value):
+    return (value % (1 << 256)).to_bytes(32, "big").hex()
+
+
+def _swap_log(sqrt_price, liquidity, tick, block=100):
+    data = "0x" + _word(-5) + _word(10) + _word(sqrt_price) + _word(liquidity) + _word(tick)
+    return {"data": data, "blockNumber": hex(block), "removed": False}
+
+
+class Bounds:
+    def __init__(self):
+        self.calls = 0
+
+    def get_positions(self, token_ids):
+        self.calls += 1
+        return {t: CallResult(True, [0, None, None, None, 500, -200, 200, 1]) for t in token_ids}
+
+
+def test_decode_swap_log_negative_tick():
+    state = decode_swap_log(_swap_log(1 << 96, 12345, -887))
+    assert state == {"pool": None, "sqrtPriceX96": 1 << 96, "liquidity": 12345, "tick": -887, "blockNumber": 100}
+
+
+def test_stream_only_checks_bounds_on_tick_change(capsys):
+    uniswap = Bounds()
+    bot = BotLogic(uniswap, None, lp_token_id=7)
+    stream = PoolStream("ws://unused", bot.on_pool_update, on_head=bot.on_new_head)
+    stream._pending = {1: "logs", 2: "newHeads"}
+    stream.handle_message(json.dumps({"jsonrpc": "2.0", "id": 1, "result": "0xaa"}))
+    stream.handle_message(json.dumps({"jsonrpc": "2.0", "id": 2, "result": "0xbb"}))
+
+    def push(sub, result):
+        msg = {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": sub, "result": result}}
+        stream.handle_message(json.dumps(msg))
+
+    push("0xaa", _swap_log(1 << 96, 1, -150))
+    push("0xaa", _swap_log(1 << 96, 2, -150))
+    push("0xaa", _swap_log(1 << 96, 3, 0))
+    push("0xbb", {"number": "0x65"})
+
+    out = capsys.readouterr().out
+    assert out.count("[ALERT] Price near lower bound") == 1
+    assert out.count("Pool sqrtPriceX96") == 2
+    assert uniswap.calls == 1
+    assert bot.last_block == 101
+
+
+class Hedges:
+    def __init__(self):
+        self.calls = 0
+
+    def get_positions(self, symbols):
+        self.calls += 1
+        return {s: {"coin": s, "szi": "-1.0"} for s in symbols}
+
+
+class Recorder:
+    def __init__(self):
+        self.rows = []
+
+    def append(self, *row, **kwargs):
+        self.rows.append(row)
+
+
+class Metadata(Bounds):
+    def get_pool_metadata(self, pool):
+        return {"fee": 500, "token0": "0xa", "token1": "0xb", "decimals0": 18, "decimals1": 6}
+
+
+def test_streamed_cycle_reads_hedges_and_records_pushed_state():
+    hedges, recorder = Hedges(), Recorder()
+    bot = BotLogic(Metadata(), hedges, lp_token_id=7, recorder=recorder)
+    bot.on_pool_update(decode_swap_log(_swap_log(1 << 96, 10**18, 0)))
+    bot.check_streamed()
+    bot.check_streamed()
+    assert hedges.calls == 2
+    assert len(recorder.rows) == 2 and recorder.rows[-1][3] == 0
+    assert "ETH" in bot.hedge_drift
+    assert bot.pool_states[bot.pools[0]]["decimals0"] == 18
+
+
+class Unreachable:
+    def get_positions(self, token_ids):
+        raise RpcUnavailable("all endpoints down")
+
+
+def test_callback_errors_do_not_drop_the_socket(capsys):
+    bot = BotLogic(Unreachable(), None, lp_token_id=7)
+    stream = PoolStream("ws://unused", bot.on_pool_update)
+    stream._subscriptions = {"0xaa": "logs"}
+    msg = {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": "0xaa", "result": None}}
+    stream.handle_message(json.dumps(msg))  # undecodable log
+    msg["params"]["result"] = _swap_log(1 << 96, 1, -150)
+    stream.handle_message(json.dumps(msg))  # bounds read fails
+    out = capsys.readouterr().out
+    assert out.count("[STREAM] Failed to handle logs message") == 2
+
+
+class Pools(Metadata):
+    def __init__(self):
+        super().__init__()
+        self.pool_calls = 0
+
+    def get_pool_states(self, pools):
+        self.pool_calls += 1
+        return {p: CallResult(True, {"sqrtPriceX96": 1 << 96, "tick": -150, "liquidity": 1}) for p in pools}
+
+
+def test_quiet_pool_is_seeded_when_the_stream_connects(capsys):
+    uniswap = Pools()
+    bot = BotLogic(uniswap, Hedges(), lp_token_id=7)
+    bot.on_stream_connected()
+    bot.check_streamed()
+    assert uniswap.pool_calls == 1
+    assert "[ALERT] Price near lower bound" in capsys.readouterr().out
@@ -0,0 +1,197 @@
+import multiprocessing as mp
+import time
+
+import pytest
+
+from fake_chain import FakeChain
+from fake_hyperliquid import FakeInfo, HangingInfo
+from fake_rpc_server import FakeRpcServer
+from utils.logic import PortfolioEntry
+from utils.supervisor import (
+    Account,
+    RateLimiter,
+    SharedTokenBucket,
+    Supervisor,
+    WorkerConfig,
+    parse_accounts,
+    shard_accounts,
+)
+from utils.uniswap import (
+    ERC20_ABI,
+    INCREASE_LIQUIDITY_TOPIC,
+    NONFUNGIBLE_POSITION_MANAGER,
+    POOL_WETH_USDC_005,
+    POSITION_MANAGER_ABI,
+    UNISWAP_V3_POOL_ABI,
+    USDC,
+    WETH,
+    UniswapClient,
+)
+
+
+def test_parse_accounts_and_shard_by_position_count():
+    accounts = parse_accounts(
+        f"""
+        # wallet=pool:tokenId:symbol,...
+        0xa={POOL_WETH_USDC_005}:1:ETH,{POOL_WETH_USDC_005}:2:ETH,{POOL_WETH_USDC_005}:3:ETH
+        0xb={POOL_WETH_USDC_005}:4:ETH  # one position
+        0xc={POOL_WETH_USDC_005}:5:ETH,{POOL_WETH_USDC_005}:6:ETH
+        """
+    )
+    assert [a.wallet for a in accounts] == ["0xa", "0xb", "0xc"]
+    assert accounts[1].portfolio == [PortfolioEntry(POOL_WETH_USDC_005, 4, "ETH")]
+    shards = shard_accounts(accounts, 2)
+    assert [[a.wallet for a in s] for s in shards] == [["0xa"], ["0xc", "0xb"]]
+    assert len(shard_accounts(accounts, 8)) == 3
+
+
+def _drain(bucket, tokens):
+    for _ in range(tokens):
+        bucket.acquire()
+
+
+def test_token_bucket_is_shared_across_processes():
+    ctx = mp.get_context("spawn")
+    bucket = SharedTokenBucket(rate=20.0, capacity=1.0, ctx=ctx)
+    procs = [ctx.Process(target=_drain, args=(bucket, 10)) for _ in range(2)]
+    for proc in procs:
+        proc.start()
+    start = time.monotonic()
+    for proc in procs:
+        proc.join(30)
+    # 20 tokens at 20/s with a burst of one: close to a second, not half of it.
+    assert all(p.exitcode == 0 for p in procs)
+    assert time.monotonic() - start >= 0.8
+
+
+def test_token_bucket_does_not_wait_forever_on_a_held_lock():
+    bucket = SharedTokenBucket(rate=20.0, capacity=1.0, ctx=mp.get_context("spawn"))
+    bucket.lock_timeout = 0.1
+    # As if a worker had been killed while holding the lock.
+    assert bucket._state.get_lock().acquire()
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start < 1.0
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.notified, self.resolved = [], []
+
+    def notify(self, key, message):
+        self.notified.append(key)
+        return True
+
+    def resolve(self, key, message=None):
+        self.resolved.append(key)
+
+
+def _chain():
+    chain = FakeChain()
+    chain.register(
+        POOL_WETH_USDC_005,
+        UNISWAP_V3_POOL_ABI,
+        slot0=lambda: (4339505179874779489431521786, -196256, 1, 1, 1, 0, True),
+        liquidity=lambda: 10**18,
+        fee=lambda: 500,
+        token0=lambda: WETH,
+        token1=lambda: USDC,
+    )
+    chain.register(WETH, ERC20_ABI, decimals=lambda: 18)
+    chain.register(USDC, ERC20_ABI, decimals=lambda: 6)
+    # Token 1 of every wallet sits 44 ticks above its lower bound.
+    chain.register(
+        NONFUNGIBLE_POSITION_MANAGER,
+        POSITION_MANAGER_ABI,
+        positions=lambda t: (0, WETH, WETH, USDC, 500, -196300 if t % 2 else -197000, -195500, 10**15, 0, 0, 0, 0),
+    )
+    return chain
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("POOL_METADATA_CACHE", str(tmp_path / "meta.json"))
+    server = FakeRpcServer(_chain())
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_supervisor_shares_reads_and_restarts_workers_with_state(server):
+    accounts = [
+        Account(f"0x{i}", [PortfolioEntry(POOL_WETH_USDC_005, t, "ETH") for t in (2 * i + 1, 2 * i + 2)])
+        for i in range(4)
+    ]
+    limiter = RateLimiter.for_endpoints(server.url, "", rpc_rate=200.0, hyperliquid_rate=200.0)
+    config = WorkerConfig(rpc_url=server.url, incremental=True, info_factory=FakeInfo)
+    dispatcher = RecordingDispatcher()
+    uniswap = UniswapClient(rpc_url=server.url, fallbacks="")
+    supervisor = Supervisor(accounts, 2, config, limiter, uniswap=uniswap, dispatcher=dispatcher, hang_timeout=30)
+    uniswap.prepare(supervisor.pools)
+    supervisor.start()
+    try:
+        calls = server.stats["eth_call"]
+        assert supervisor.run_cycle(timeout=60) == {0, 1}
+        # The pool multicall plus one positions batch per shard, not per wallet.
+        assert server.stats["eth_call"] - calls == 3
+        calls, scans = server.stats["eth_call"], server.stats["eth_getLogs"]
+        for _ in range(2):
+            server.chain.block_number += 1
+            assert supervisor.run_cycle(timeout=60) == {0, 1}
+        # Cached bounds in every worker: only the supervisor's pool multicall,
+        # and one position-event scan per shard and cycle.
+        assert server.stats["eth_call"] - calls == 2
+        assert server.stats["eth_getLogs"] - scans == 4
+        assert sorted(dispatcher.notified) == [f"0x{i}:bounds:{2 * i + 1}:lower" for i in range(4)]
+
+        server.chain.block_number += 1
+        server.chain.logs.append(
+            {
+                "address": NONFUNGIBLE_POSITION_MANAGER,
+                "topics": [INCREASE_LIQUIDITY_TOPIC, "0x" + (3).to_bytes(32, "big").hex()],
+                "data": "0x",
+                "blockNumber": hex(server.chain.block_number),
+                "blockHash": "0x" + "00" * 32,
+                "transactionHash": "0x" + "00" * 32,
+                "transactionIndex": "0x0",
+                "logIndex": "0x0",
+                "removed": False,
+            }
+        )
+        calls = server.stats["eth_call"]
+        assert supervisor.run_cycle(timeout=60) == {0, 1}
+        # Only the touched token is re-read, in its shard's batch.
+        assert server.stats["eth_call"] - calls == 2
+        shard = next(s for s, accounts in enumerate(supervisor.shards) if any(a.wallet == "0x1" for a in accounts))
+        assert supervisor.checkpoints[shard]["0x1"]["stats"]["bounds_miss"] == 2
+
+        supervisor.workers[0].process.kill()
+        supervisor.workers[0].process.join()
+        calls = server.stats["eth_call"]
+        assert supervisor.run_cycle(timeout=60) == {0, 1}
+        assert supervisor.restarts == {0: 1}
+        # The restarted worker resumed from its checkpoint: no bounds re-read, no repeated alerts.
+        assert server.stats["eth_call"] - calls == 1
+        assert len(dispatcher.notified) == 4
+        wallet = supervisor.shards[0][0].wallet
+        assert supervisor.checkpoints[0][wallet]["stats"]["cycle_hit"] == 4
+    finally:
+        supervisor.stop()
+
+
+def test_hung_worker_gets_no_new_cycles_and_is_restarted(server):
+    accounts = [Account("0x0", [PortfolioEntry(POOL_WETH_USDC_005, 1, "ETH")])]
+    config = WorkerConfig(rpc_url=server.url, info_factory=HangingInfo)
+    uniswap = UniswapClient(rpc_url=server.url, fallbacks="")
+    supervisor = Supervisor(accounts, 1, config, uniswap=uniswap, hang_timeout=1.0)
+    supervisor.start()
+    try:
+        deadline = time.monotonic() + 30
+        while not supervisor.restarts and time.monotonic() < deadline:
+            worker = supervisor.workers[0]
+            assert supervisor.run_cycle(timeout=0.2) == set()
+            # Only the first cycle was queued; later ones skip the busy worker.
+            assert worker.commands.qsize() <= 1
+        assert supervisor.restarts == {0: 1}
+    finally:
+        supervisor.stop(timeout=0.1)
@@ -0,0 +1,91 @@
+from web3 import Web3
+
+from fake_chain import FakeChain
+from utils.swapsim import (
+    PoolSnapshot,
+    get_amount1_delta,
+    get_next_sqrt_price_from_input,
+    mul_div,
+)
+from utils.tickmath import get_sqrt_ratio_at_tick
+from utils.uniswap import POOL_WETH_USDC_005, UNISWAP_V3_POOL_ABI, PoolMetadataRegistry, UniswapClient
+
+SPACING = 10
+L1 = 10**21
+L2 = 5 * 10**20
+# liquidityNet per initialized tick: [-600, 600) with L1 and [200, 800) with L2
+NET = {-600: L1, 600: -L1, 200: L2, 800: -L2}
+
+
+def _bitmap(ticks, words):
+    bitmap = {w: 0 for w in words}
+    for t in ticks:
+        c = t // SPACING
+        bitmap[c >> 8] |= 1 << (c & 0xFF)
+    return bitmap
+
+
+def _snapshot():
+    return PoolSnapshot(
+        get_sqrt_ratio_at_tick(0), 0, L1, 500, SPACING, _bitmap(NET, range(-2, 2)), dict(NET)
+    )
+
+
+def test_exact_input_within_range_matches_closed_form():
+    snap = _snapshot()
+    amount_in = 10**18
+    quote = snap.quote_exact_input(amount_in, zero_for_one=True)
+    less_fee = mul_div(amount_in, 1_000_000 - 500, 1_000_000)
+    sqrt_after = get_next_sqrt_price_from_input(snap.sqrt_price_x96, L1, less_fee, True)
+    assert quote["sqrtPriceX96After"] == sqrt_after
+    assert quote["amountOut"] == get_amount1_delta(sqrt_after, snap.sqrt_price_x96, L1, False)
+    assert quote["amountIn"] == amount_in
+    assert quote["initializedTicksCrossed"] == 0
+
+
+def test_exact_output_inverts_exact_input():
+    snap = _snapshot()
+    for size in (10**15, 10**18, 2 * 10**19):
+        out = snap.quote_exact_input(size, zero_for_one=False)["amountOut"]
+        back = snap.quote_exact_output(out, zero_for_one=False)
+        assert back["amountOut"] == out
+        assert size - 2 <= back["amountIn"] <= size
+
+
+def test_crossing_initialized_tick_adds_liquidity():
+    snap = _snapshot()
+    res = snap.swap(False, 4 * 10**19)
+    assert res["tickAfter"] > 200
+    assert res["initializedTicksCrossed"] == 1
+    assert res["liquidityAfter"] == L1 + L2
+    sizes = [10**18 * k for k in range(1, 6)]
+    outs = [q["amountOut"] for q in snap.quote_exact_input_batch(sizes, zero_for_one=True)]
+    assert outs == sorted(outs)
+
+
+def test_load_and_refresh_from_chain():
+    chain = FakeChain()
+    state = {"tick": 0, "net": dict(NET)}
+
+    chain.register(
+        POOL_WETH_USDC_005,
+        UNISWAP_V3_POOL_ABI,
+        slot0=lambda: (get_sqrt_ratio_at_tick(state["tick"]), state["tick"], 0, 1, 1, 0, True),
+        liquidity=lambda: L1,
+        fee=lambda: 500,
+        tickSpacing=lambda: SPACING,
+        tickBitmap=lambda w: _bitmap(state["net"], range(-2, 2)).get(w, 0),
+        ticks=lambda t: (abs(state["net"].get(t, 0)), state["net"].get(t, 0), 0, 0, 0, 0, 0, t in state["net"]),
+    )
+    client = UniswapClient(w3=Web3(chain), metadata=PoolMetadataRegistry(""))
+    snap = PoolSnapshot.load(client, POOL_WETH_USDC_005, words=1)
+    assert snap.liquidity_net == NET
+    assert chain.requests["eth_call"] == 3
+
+    state["tick"] = 5
+    snap.refresh(client)
+    assert chain.requests["eth_call"] == 4 and snap.tick == 5
+
+    state["net"][300] = 7
+    snap.refresh(client)
+    assert chain.requests["eth_call"] == 6 and snap.liquidity_net[300] == 7
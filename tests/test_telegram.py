@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.logic import BotLogic
+from utils.metrics import ALERTS
+from utils.telegram import MAX_MESSAGE_CHARS, AlertDispatcher, digest
+
+
+class StubTelegram:
+    """Local ``sendMessage`` endpoint answering ``429`` for the first requests."""
+
+    def __init__(self, throttle: int = 0, retry_after: int = 1, status: int = 200) -> None:
+        self.throttle = throttle
+        self.status = status
+        self.retry_after = retry_after
+        self.requests = []
+        self.texts = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+                form = urllib.parse.parse_qs(body)
+                stub.requests.append((self.path, time.monotonic()))
+                if len(stub.requests) <= stub.throttle:
+                    status = 429
+                    payload = {"ok": False, "error_code": 429, "parameters": {"retry_after": stub.retry_after}}
+                elif stub.status != 200:
+                    status = stub.status
+                    payload = {"ok": False, "error_code": status, "description": "Bad Request: chat not found"}
+                else:
+                    status = 200
+                    stub.texts.append(form["text"][0])
+                    payload = {"ok": True}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubTelegram()
+    yield server
+    server.stop()
+
+
+def make_dispatcher(url, **kwargs):
+    kwargs.setdefault("digest_window", 0.05)
+    return AlertDispatcher("TOKEN", "42", api_url=url, rate=100.0, burst=100.0, **kwargs)
+
+
+def test_repeated_alerts_are_deduplicated_with_hysteresis(stub):
+    dispatcher = make_dispatcher(stub.url, clear_after=0.2)
+    before = ALERTS.labels("deduplicated").value
+    assert dispatcher.notify("bounds:1:lower", "Price near lower bound")
+    assert not dispatcher.notify("bounds:1:lower", "Price near lower bound")
+    # Resolved only moments ago: flapping back does not alert again.
+    dispatcher.resolve("bounds:1:lower")
+    assert not dispatcher.notify("bounds:1:lower", "Price near lower bound")
+    dispatcher.resolve("bounds:1:lower")
+    time.sleep(0.25)
+    assert dispatcher.notify("bounds:1:lower", "Price near lower bound again")
+    assert dispatcher.flush(timeout=5)
+    assert ALERTS.labels("deduplicated").value - before == 2
+    assert stub.texts == ["Price near lower bound", "Price near lower bound again"]
+    assert all(path == "/botTOKEN/sendMessage" for path, _ in stub.requests)
+
+
+def test_alert_storm_is_sent_as_one_digest(stub):
+    dispatcher = make_dispatcher(stub.url, digest_window=0.2)
+    for i in range(20):
+        dispatcher.notify(f"bounds:{i}:upper", f"Price near upper bound (token {i})")
+    assert dispatcher.flush(timeout=5)
+    assert len(stub.texts) == 1
+    assert stub.texts[0].startswith("20 alerts:")
+    assert "(token 19)" in stub.texts[0]
+
+
+def test_rate_limited_send_waits_retry_after():
+    stub = StubTelegram(throttle=1, retry_after=1)
+    try:
+        dispatcher = make_dispatcher(stub.url)
+        dispatcher.send("hedge drift")
+        assert dispatcher.flush(timeout=5)
+        (_, first), (_, second) = stub.requests
+        assert second - first >= 0.9
+        assert stub.texts == ["hedge drift"]
+    finally:
+        stub.stop()
+
+
+def test_rejected_send_is_not_counted_as_sent():
+    stub = StubTelegram(status=400)
+    try:
+        dispatcher = make_dispatcher(stub.url)
+        sent, rejected = ALERTS.labels("sent").value, ALERTS.labels("rejected").value
+        dispatcher.send("hedge drift")
+        assert dispatcher.flush(timeout=5)
+        assert len(stub.requests) == 1
+        assert ALERTS.labels("rejected").value - rejected == 1
+        assert ALERTS.labels("sent").value == sent
+    finally:
+        stub.stop()
+
+
+def test_notify_never_blocks_and_queue_is_bounded(stub):
+    stub.throttle, stub.retry_after = 1, 1
+    dispatcher = make_dispatcher(stub.url, max_queue=5)
+    start = time.perf_counter()
+    for i in range(50):
+        dispatcher.send(f"message {i}")
+    assert time.perf_counter() - start < 0.1
+    assert len(dispatcher._queue) <= 5
+    assert dispatcher.flush(timeout=5)
+
+
+def test_digest_splits_at_telegram_limit():
+    texts = digest(["x" * 1000] * 10)
+    assert len(texts) == 3
+    assert all(len(t) <= MAX_MESSAGE_CHARS for t in texts)
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.notified, self.resolved = [], []
+
+    def notify(self, key, message):
+        self.notified.append(key)
+        return True
+
+    def resolve(self, key, message=None):
+        self.resolved.append(key)
+
+
+def test_bot_alerts_are_keyed_per_position_and_bound():
+    dispatcher = RecordingDispatcher()
+    bot = BotLogic(None, None, lp_token_id=7, dispatcher=dispatcher)
+    entry = bot.portfolio[0]
+    bot._check_bounds(entry, -1000, (-1050, 1000))
+    bot._check_bounds(entry, 0, (-1050, 1000))
+    assert dispatcher.notified == ["bounds:7:lower"]
+    assert dispatcher.resolved[:1] == ["bounds:7:upper"]
+    assert set(dispatcher.resolved[1:]) == {"bounds:7:lower", "bounds:7:upper"}
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.tickmath import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    get_sqrt_ratio_at_tick,
+    get_sqrt_ratio_at_tick_batch,
+    get_tick_at_sqrt_ratio,
+    get_tick_at_sqrt_ratio_batch,
+)
+
+
+def test_boundaries_match_tickmath_library():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == 1 << 96
+    assert get_tick_at_sqrt_ratio(MIN_SQRT_RATIO) == MIN_TICK
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+    with pytest.raises(ValueError):
+        get_sqrt_ratio_at_tick(MAX_TICK + 1)
+    with pytest.raises(ValueError):
+        get_tick_at_sqrt_ratio(MAX_SQRT_RATIO)
+
+
+def test_tick_at_sqrt_ratio_is_exact_inverse():
+    rng = random.Random(1234)
+    for tick in [rng.randint(MIN_TICK + 1, MAX_TICK - 1) for _ in range(2000)] + list(range(-50, 50)):
+        sqrt_ratio = get_sqrt_ratio_at_tick(tick)
+        assert get_tick_at_sqrt_ratio(sqrt_ratio) == tick
+        assert get_tick_at_sqrt_ratio(sqrt_ratio - 1) == tick - 1
+
+
+def test_batch_agrees_bit_for_bit():
+    rng = np.random.default_rng(42)
+    ticks = np.concatenate([rng.integers(MIN_TICK, MAX_TICK, 5000), [MIN_TICK, MAX_TICK, 0, -1, 1]])
+    sqrt_ratios = get_sqrt_ratio_at_tick_batch(ticks)
+    assert [int(s) for s in sqrt_ratios] == [get_sqrt_ratio_at_tick(int(t)) for t in ticks]
+
+    probes = np.concatenate([sqrt_ratios, sqrt_ratios - 1, sqrt_ratios + 1])
+    probes = probes[(probes >= MIN_SQRT_RATIO) & (probes < MAX_SQRT_RATIO)]
+    assert get_tick_at_sqrt_ratio_batch(probes).tolist() == [get_tick_at_sqrt_ratio(int(p)) for p in probes]
@@ -1,9 +1,16 @@
 import os
 import pytest
+from web3 import Web3
 
+from fake_chain import FakeChain, Revert
 from utils.uniswap import (
     UniswapClient,
     POOL_WETH_USDC_005,
+    NONFUNGIBLE_POSITION_MANAGER,
+    UNISWAP_V3_POOL_ABI,
+    ERC20_ABI,
+    POSITION_MANAGER_ABI,
+    PoolMetadataRegistry,
     get_web3_client,
     RpcUnavailable,
 )
@@ -23,3 +30,76 @@ def test_get_pool_state():
     state = client.get_pool_state(POOL_WETH_USDC_005)
     assert state["sqrtPriceX96"] > 0
     assert isinstance(state["tick"], int)
+
+
+WETH_ADDR = "0x82aF49447D8a07e3bd95BD0d56f35241523fBab1"
+USDC_ADDR = "0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8"
+SQRT_PRICE = 3543191142285914205922034323214
+
+
+def _fake_pool_chain():
+    chain = FakeChain()
+    chain.register(
+        POOL_WETH_USDC_005,
+        UNISWAP_V3_POOL_ABI,
+        slot0=lambda: (SQRT_PRICE, 69080, 1, 1, 1, 0, True),
+        liquidity=lambda: 10**18,
+        fee=lambda: 500,
+        token0=lambda: WETH_ADDR,
+        token1=lambda: USDC_ADDR,
+    )
+    chain.register(WETH_ADDR, ERC20_ABI, decimals=lambda: 18)
+    chain.register(USDC_ADDR, ERC20_ABI, decimals=lambda: 6)
+    return chain
+
+
+def test_get_pool_state_batches_reads(tmp_path):
+    chain = _fake_pool_chain()
+    registry = PoolMetadataRegistry(str(tmp_path / "meta.json"))
+    client = UniswapClient(w3=Web3(chain), metadata=registry)
+    state = client.get_pool_state(POOL_WETH_USDC_005)
+    assert state == {
+        "sqrtPriceX96": SQRT_PRICE,
+        "liquidity": 10**18,
+        "tick": 69080,
+        "blockNumber": 1,
+        "fee": 500,
+        "token0": WETH_ADDR,
+        "token1": USDC_ADDR,
+        "decimals0": 18,
+        "decimals1": 6,
+    }
+    assert chain.requests["eth_call"] == 3
+
+    client.get_pool_state(POOL_WETH_USDC_005)
+    assert chain.requests["eth_call"] == 4
+
+
+def test_pool_metadata_survives_restart(tmp_path):
+    path = str(tmp_path / "meta.json")
+    UniswapClient(w3=Web3(_fake_pool_chain()), metadata=PoolMetadataRegistry(path)).get_pool_state(
+        POOL_WETH_USDC_005
+    )
+
+    chain = _fake_pool_chain()
+    client = UniswapClient(w3=Web3(chain), metadata=PoolMetadataRegistry(path), chain_id=42161)
+    state = client.get_pool_state(POOL_WETH_USDC_005)
+    assert state["decimals1"] == 6
+    assert chain.requests["eth_call"] == 1
+
+
+def test_multicall_reports_failures_individually():
+    chain = FakeChain()
+
+    def positions(token_id):
+        if token_id == 2:
+            raise Revert("Invalid token ID")
+        return (0, WETH_ADDR, WETH_ADDR, USDC_ADDR, 500, -100, 100, 5, 0, 0, 0, 0)
+
+    chain.register(NONFUNGIBLE_POSITION_MANAGER, POSITION_MANAGER_ABI, positions=positions)
+    client = UniswapClient(w3=Web3(chain), metadata=PoolMetadataRegistry(""))
+    results = client.get_positions([1, 2, 3])
+    assert chain.requests["eth_call"] == 1
+    assert results[1].success and results[1].value[5:7] == [-100, 100]
+    assert not results[2].success and "Invalid token ID" in results[2].error
+    assert results[3].success
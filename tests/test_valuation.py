@@ -0,0 +1,40 @@
+import time
+
+import numpy as np
+
+from utils.tickmath import get_sqrt_ratio_at_tick
+from utils.valuation import Q96, hedge_drift, position_amounts_exact, price_grid, valuate
+
+
+def test_vectorized_amounts_match_exact_integer_math():
+    liquidity, lower, upper = 10**18, -6000, 600
+    for tick in (-5000, lower, 0, 300, upper, 9000):
+        sqrt_x96 = get_sqrt_ratio_at_tick(tick)
+        res = valuate([liquidity], [lower], [upper], [sqrt_x96 / Q96], decimals0=0, decimals1=0)
+        exact0, exact1 = position_amounts_exact(liquidity, sqrt_x96, lower, upper)
+        assert np.isclose(res["amount0"][0, 0], exact0, rtol=1e-9, atol=2)
+        assert np.isclose(res["amount1"][0, 0], exact1, rtol=1e-9, atol=2)
+
+
+def test_delta_and_gamma_are_derivatives_of_value():
+    grid = price_grid(int(Q96), span=0.05, points=201)
+    res = valuate([10**12], [-1000], [1000], grid, decimals0=6, decimals1=6)
+    price, value, delta, gamma = res["price"], res["value"][0], res["delta"][0], res["gamma"][0]
+    num_delta = np.gradient(value, price)
+    num_gamma = np.gradient(delta, price)
+    assert np.allclose(num_delta[1:-1], delta[1:-1], rtol=1e-3)
+    assert np.allclose(num_gamma[1:-1], gamma[1:-1], rtol=1e-2)
+
+
+def test_grid_sweep_is_fast_and_reports_drift():
+    rng = np.random.default_rng(0)
+    lower = rng.integers(-2000, 0, 100) // 10 * 10
+    upper = lower + rng.integers(1, 400, 100) * 10
+    liquidity = rng.integers(10**15, 10**18, 100)
+    grid = price_grid(int(Q96), span=0.2, points=81)
+    start = time.perf_counter()
+    res = valuate(liquidity, lower, upper, grid)
+    assert time.perf_counter() - start < 0.1
+    assert res["delta"].shape == (100, 81)
+    assert hedge_drift(2.5, -2.0) == 0.5
+    assert hedge_drift(1.0, None) == 1.0
@@ -0,0 +1,61 @@
+"""Asyncio cycle engine running the bot's reads concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable
+
+from .logic import BotLogic, IncrementalBotLogic
+
+
+async def check_and_alert_async(bot: BotLogic) -> None:
+    """Run one :class:`BotLogic` cycle with all upstream reads in parallel.
+
+    The chain, Hyperliquid and reference-price clients are blocking, so each
+    read runs in the default thread pool; cycle latency is the slowest source
+    instead of the sum of all of them. :class:`RpcUnavailable` propagates just
+    like in :meth:`BotLogic.check_and_alert`.
+
+    An :class:`IncrementalBotLogic` scans position events up to the block of
+    the pool read, so its bounds read runs after the pool read in the same
+    thread; otherwise the scan would use the previous cycle's block and
+    pick up liquidity changes one cycle late.
+    """
+
+    if isinstance(bot, IncrementalBotLogic):
+        chain = asyncio.to_thread(_read_chain, bot)
+    else:
+        chain = asyncio.gather(asyncio.to_thread(bot.fetch_pool_states), asyncio.to_thread(bot.fetch_position_bounds))
+    (states, bounds), positions, price = await asyncio.gather(
+        chain,
+        asyncio.to_thread(bot.fetch_hedge_positions),
+        asyncio.to_thread(bot.fetch_reference_price),
+    )
+    # As in the sync cycle, bounds are not checked without a pool read.
+    bot.evaluate(states, positions, bounds if states else {}, price)
+
+
+def _read_chain(bot: BotLogic) -> tuple:
+    states = bot.fetch_pool_states()
+    return states, bot.fetch_position_bounds() if states else {}
+
+
+async def run_fixed_rate(cycle: Callable[[], Awaitable[None]], period: float) -> None:
+    """Call ``cycle`` forever, starting a new run every ``period`` seconds.
+
+    Start times are anchored to the loop clock so I/O time does not make the
+    cadence drift. If a cycle overruns, the missed slots are skipped rather
+    than run back to back.
+    """
+
+    loop = asyncio.get_running_loop()
+    next_start = loop.time()
+    while True:
+        await cycle()
+        next_start += period
+        now = loop.time()
+        if now > next_start:
+            missed = int((now - next_start) // period) + 1
+            print(f"[ENGINE] Cycle overran by {now - next_start:.2f}s; skipping {missed} slot(s)")
+            next_start += missed * period
+        await asyncio.sleep(next_start - now)
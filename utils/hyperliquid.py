@@ -3,78 +3,252 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
 
-from hyperliquid.info import Info
+from .metrics import HYPERLIQUID_FAILURES, HYPERLIQUID_SECONDS
+
+# ``hyperliquid.info.Info``, imported on first use (the SDK pulls in
+# eth_account). Tests and benchmarks may assign a stand-in beforehand.
+Info: Any = None
+
+UNREACHABLE_MSG = "[WARN] Hyperliquid API unreachable (read-only); skipping this cycle"
+
+
+def _make_info() -> Any:
+    global Info
+    if Info is None:
+        from hyperliquid.info import Info
+    return Info()
+
+
+class AccountSnapshot:
+    """One ``user_state`` response with positions indexed by coin."""
+
+    def __init__(self, state: Any, fetched_at: float) -> None:
+        self.raw = state
+        self.fetched_at = fetched_at
+        self.balances: Any = state
+        self.margin: Dict[str, Any] = {}
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        if not isinstance(state, dict):
+            return
+        self.balances = state.get("balances")
+        for key in ("marginSummary", "crossMarginSummary", "withdrawable"):
+            if key in state:
+                self.margin[key] = state[key]
+        entries: List[Dict[str, Any]] = list(state.get("positions") or [])
+        # The SDK nests each entry as {"position": {...}, "type": "oneWay"}.
+        entries += [p.get("position", p) for p in state.get("assetPositions") or []]
+        for pos in entries:
+            coin = (pos.get("coin") or pos.get("symbol") or "").upper()
+            if coin:
+                self.positions.setdefault(coin, pos)
+
+    def position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.positions.get(symbol.upper())
+
+
+class MidPriceFeed:
+    """In-memory table of Hyperliquid mid prices fed by ``allMids``.
+
+    The table is filled from the SDK's ``allMids`` WebSocket channel when the
+    ``Info`` client has one, so :meth:`get` normally does no I/O. When the
+    stream is unavailable or no update arrived within ``max_age`` seconds,
+    the next read falls back to a single REST ``all_mids`` call that
+    refreshes every symbol at once. :attr:`streaming` is cleared while the
+    stream is quiet and set again by its next message.
+    """
+
+    def __init__(self, info: Any, max_age: float = 10.0) -> None:
+        self.info = info
+        self.max_age = max_age
+        self.prices: Dict[str, float] = {}
+        self.updated_at: Dict[str, float] = {}
+        self.last_update = 0.0
+        self.streaming = False
+        self._started = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Subscribe to the ``allMids`` channel once, if the SDK supports it."""
+
+        if self._started:
+            return
+        self._started = True
+        if not hasattr(self.info, "subscribe"):
+            return
+        try:
+            self.info.subscribe({"type": "allMids"}, self._on_message)
+            self.streaming = True
+        except Exception as exc:
+            print(f"[WARN] Hyperliquid allMids stream unavailable, polling instead: {exc}")
+
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        mids = (msg.get("data") or {}).get("mids")
+        if isinstance(mids, dict):
+            self.streaming = True
+            self.update(mids)
+
+    def update(self, mids: Dict[str, Any]) -> None:
+        """Merge a ``{coin: mid}`` mapping into the table."""
+
+        now = time.monotonic()
+        with self._lock:
+            for coin, mid in mids.items():
+                try:
+                    self.prices[coin.upper()] = float(mid)
+                except (TypeError, ValueError):
+                    continue
+                self.updated_at[coin.upper()] = now
+            self.last_update = now
+
+    def refresh(self) -> None:
+        """Poll every mid price with one REST ``all_mids`` call."""
+
+        with HYPERLIQUID_SECONDS.labels("all_mids").time():
+            mids = self.info.all_mids()
+        self.update(mids)
+
+    # ------------------------------------------------------------------
+    def age(self, symbol: Optional[str] = None) -> float:
+        """Seconds since the last update of ``symbol`` (or of any symbol)."""
+
+        ts = self.last_update if symbol is None else self.updated_at.get(symbol.upper(), 0.0)
+        return time.monotonic() - ts if ts else float("inf")
+
+    def get(self, symbol: str) -> Optional[float]:
+        """Return the latest mid for ``symbol``, polling only when stale."""
+
+        self.start()
+        if self.age() > self.max_age:
+            if self.streaming and self.last_update:
+                self.streaming = False
+                print("[WARN] Hyperliquid allMids stream went quiet, polling instead")
+            self.refresh()
+        return self.prices.get(symbol.upper())
 
 
 class HyperliquidAPI:
-    """Read-only client that fetches data using a wallet address."""
+    """Read-only client that fetches data using a wallet address.
 
-    def __init__(self, wallet_address: Optional[str] = None) -> None:
+    Balances, positions and margin figures are served from a single
+    :class:`AccountSnapshot` that is refetched at most once per
+    ``snapshot_ttl`` seconds (``HYPERLIQUID_SNAPSHOT_TTL``, default 5).
+    Several wallets can share one ``info`` client.
+    """
+
+    def __init__(
+        self, wallet_address: Optional[str] = None, snapshot_ttl: Optional[float] = None, info: Any = None
+    ) -> None:
         self.wallet_address = wallet_address or os.getenv("HYPERLIQUID_WALLET_ADDRESS")
         if not self.wallet_address:
             raise ValueError("wallet_address is required")
-        try:
-            self.info = Info()
-        except Exception:
-            self.info = None
+        if snapshot_ttl is None:
+            snapshot_ttl = float(os.getenv("HYPERLIQUID_SNAPSHOT_TTL", "5"))
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshot: Optional[AccountSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        if info is None:
+            try:
+                info = _make_info()
+            except Exception:
+                info = None
+        self.info = info
+        self.prices = MidPriceFeed(self.info) if self.info else None
 
     # ------------------------------------------------------------------
-    def get_balances(self) -> Optional[Dict[str, Any]]:
-        """Return wallet balances using the Info client."""
+    def snapshot(self, max_age: Optional[float] = None) -> Optional[AccountSnapshot]:
+        """Return an account snapshot no older than ``max_age`` seconds."""
 
         if not self.info:
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
+            print(UNREACHABLE_MSG)
             return None
-        try:
-            if hasattr(self.info, "balances"):
-                return self.info.balances(self.wallet_address)
-            if hasattr(self.info, "user_state"):
-                state = self.info.user_state(self.wallet_address)
-                if isinstance(state, dict):
-                    return state.get("balances")
-                return state
-        except Exception:  # pragma: no cover - defensive
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
-        return None
+        ttl = self.snapshot_ttl if max_age is None else max_age
+        with self._snapshot_lock:
+            snap = self._snapshot
+            if snap is not None and time.monotonic() - snap.fetched_at < ttl:
+                return snap
+            try:
+                with HYPERLIQUID_SECONDS.labels("user_state").time():
+                    state = self._fetch_state()
+                snap = AccountSnapshot(state, time.monotonic())
+            except Exception:  # pragma: no cover - defensive
+                HYPERLIQUID_FAILURES.labels("user_state").inc()
+                print(UNREACHABLE_MSG)
+                return None
+            self._snapshot = snap
+            return snap
+
+    def _fetch_state(self) -> Any:
+        if hasattr(self.info, "user_state"):
+            return self.info.user_state(self.wallet_address)
+        state: Dict[str, Any] = {}
+        if hasattr(self.info, "balances"):
+            state["balances"] = self.info.balances(self.wallet_address)
+        if hasattr(self.info, "positions"):
+            state["positions"] = self.info.positions(self.wallet_address)
+        return state
+
+    # ------------------------------------------------------------------
+    def get_balances(self) -> Optional[Dict[str, Any]]:
+        """Return wallet balances using the Info client."""
+
+        snap = self.snapshot()
+        return snap.balances if snap else None
+
+    # ------------------------------------------------------------------
+    def get_margin(self) -> Optional[Dict[str, Any]]:
+        """Return margin summary figures from the account snapshot."""
+
+        snap = self.snapshot()
+        return snap.margin if snap else None
 
     # ------------------------------------------------------------------
     def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Return open position for ``symbol`` if it exists."""
 
-        if not self.info:
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
-            return None
-        try:
-            positions = None
-            if hasattr(self.info, "positions"):
-                positions = self.info.positions(self.wallet_address)
-            elif hasattr(self.info, "user_state"):
-                state = self.info.user_state(self.wallet_address)
-                if isinstance(state, dict):
-                    positions = state.get("positions")
-            for pos in positions or []:
-                coin = (pos.get("coin") or pos.get("symbol") or "").upper()
-                if coin == symbol.upper():
-                    return pos
-        except Exception:  # pragma: no cover - defensive
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
-        return None
+        snap = self.snapshot()
+        return snap.position(symbol) if snap else None
+
+    # ------------------------------------------------------------------
+    def get_positions(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return open positions for many symbols from one snapshot."""
+
+        snap = self.snapshot()
+        return {s: snap.position(s) if snap else None for s in symbols}
 
     # ------------------------------------------------------------------
     def get_mark_price(self, symbol: str) -> Optional[float]:
-        """Return current mid/mark price for ``symbol``."""
+        """Return current mid/mark price for ``symbol``.
+
+        Served from :attr:`prices` when possible; the order book snapshot is
+        only used if the symbol is missing from ``all_mids`` or that call
+        failed.
+        """
 
         if not self.info:
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
+            print(UNREACHABLE_MSG)
             return None
+        if hasattr(self.info, "all_mids"):
+            try:
+                price = self.prices.get(symbol)
+            except Exception as exc:
+                HYPERLIQUID_FAILURES.labels("all_mids").inc()
+                print(f"[WARN] Hyperliquid all_mids failed, trying the order book: {exc}")
+                price = None
+            if price is not None:
+                return price
         try:
             if hasattr(self.info, "l2_snapshot"):
-                snap = self.info.l2_snapshot(symbol.upper())
+                with HYPERLIQUID_SECONDS.labels("l2_snapshot").time():
+                    snap = self.info.l2_snapshot(symbol.upper())
                 if isinstance(snap, dict) and snap.get("mid") is not None:
                     return float(snap["mid"])
         except Exception:  # pragma: no cover - defensive
-            print("[WARN] Hyperliquid API unreachable (read-only); skipping this cycle")
+            HYPERLIQUID_FAILURES.labels("mark_price").inc()
+            print(UNREACHABLE_MSG)
         return None
 
@@ -0,0 +1,388 @@
+"""Local event history: an ``eth_getLogs`` indexer backed by SQLite.
+
+Pool ``Swap``/``Mint``/``Burn``/``Collect`` and position-manager
+``IncreaseLiquidity``/``DecreaseLiquidity``/``Collect``/``Transfer`` logs
+are scanned in block-range chunks and stored in three tables keyed by
+``(block, log_index)``. Position-manager logs cover every NFT on the chain
+unless ``token_ids`` restricts them to the tracked positions. Progress is checkpointed in the same transaction as
+the rows it covers, so a restart resumes where it stopped. Values wider
+than 64 bits (amounts, sqrt prices, liquidity) are stored as decimal text.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .stream import SWAP_TOPIC
+from .uniswap import (
+    DECREASE_LIQUIDITY_TOPIC,
+    INCREASE_LIQUIDITY_TOPIC,
+    NONFUNGIBLE_POSITION_MANAGER,
+    POOL_WETH_USDC_005,
+    RpcUnavailable,
+    _checksum,
+)
+
+if TYPE_CHECKING:  # web3 is imported on first use: it alone takes ~1s to import
+    from web3 import Web3
+
+MINT_TOPIC = "0x7a53080ba414158be7ec69b987b5fb7d07dee101fe85488f0853ae16239d0bde"
+BURN_TOPIC = "0x0c396cd989a39f4459b5fa1aed6a9a8dcdbc45908acfd67e028cd568da98982c"
+POOL_COLLECT_TOPIC = "0x70935338e69775456a85ddef226c395fb668b63fa0115f5f20610b388e6ca9c0"
+NPM_COLLECT_TOPIC = "0x40d0efd1a53d60ecbf40971b9daf7dc90178c3aadc7aab1765632738fa8b8f01"
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS swaps (
+    block INTEGER NOT NULL, log_index INTEGER NOT NULL, pool TEXT NOT NULL, tx_hash TEXT NOT NULL,
+    amount0 TEXT NOT NULL, amount1 TEXT NOT NULL, sqrt_price_x96 TEXT NOT NULL,
+    liquidity TEXT NOT NULL, tick INTEGER NOT NULL,
+    PRIMARY KEY (block, log_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS swaps_pool ON swaps (pool, block);
+CREATE TABLE IF NOT EXISTS pool_liquidity (
+    block INTEGER NOT NULL, log_index INTEGER NOT NULL, pool TEXT NOT NULL, tx_hash TEXT NOT NULL,
+    kind TEXT NOT NULL, owner TEXT NOT NULL, tick_lower INTEGER NOT NULL, tick_upper INTEGER NOT NULL,
+    amount TEXT, amount0 TEXT NOT NULL, amount1 TEXT NOT NULL,
+    PRIMARY KEY (block, log_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS position_events (
+    block INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    kind TEXT NOT NULL, token_id INTEGER NOT NULL, account TEXT,
+    liquidity TEXT, amount0 TEXT, amount1 TEXT,
+    PRIMARY KEY (block, log_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS position_events_token ON position_events (token_id, block);
+CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, block INTEGER NOT NULL, hash TEXT);
+"""
+
+TABLES = ("swaps", "pool_liquidity", "position_events")
+
+# Providers that cap eth_getLogs answer with an error; some (Alchemy,
+# Infura) also suggest a range that fits, e.g. "[0x10, 0x1f]".
+_LIMIT_HINTS = ("more than", "limit", "too large", "too many", "range", "exceed", "timeout", "-32005")
+_SUGGESTED_RANGE = re.compile(r"\[0x([0-9a-fA-F]+),\s*0x([0-9a-fA-F]+)\]")
+
+
+def _words(data: Any) -> List[int]:
+    raw = bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+    return [int.from_bytes(raw[i : i + 32], "big") for i in range(0, len(raw), 32)]
+
+
+def _topic_int(topic: Any) -> int:
+    return int(topic, 16) if isinstance(topic, str) else int.from_bytes(bytes(topic), "big")
+
+
+def _topic_hex(topic: Any) -> str:
+    return topic if isinstance(topic, str) else "0x" + bytes(topic).hex()
+
+
+def _signed(word: int, bits: int = 256) -> int:
+    return word - (1 << bits) if word >= 1 << (bits - 1) else word
+
+
+def _address(word: int) -> str:
+    return _checksum("0x" + (word & ((1 << 160) - 1)).to_bytes(20, "big").hex())
+
+
+def _head(log: Dict[str, Any]) -> Tuple[int, int, str]:
+    block = log["blockNumber"]
+    index = log["logIndex"]
+    block = int(block, 16) if isinstance(block, str) else int(block)
+    index = int(index, 16) if isinstance(index, str) else int(index)
+    return block, index, _topic_hex(log["transactionHash"])
+
+
+# ---------------------------------------------------------------------------
+# Batch decoders: one call per (topic, chunk), returning rows for executemany
+# ---------------------------------------------------------------------------
+def decode_swaps(logs: Sequence[Dict[str, Any]]) -> List[tuple]:
+    rows = []
+    for log in logs:
+        block, index, tx = _head(log)
+        a0, a1, sqrt_price, liquidity, tick = _words(log["data"])[:5]
+        rows.append(
+            (block, index, _checksum(log["address"]), tx, str(_signed(a0)), str(_signed(a1)),
+             str(sqrt_price), str(liquidity), _signed(tick))
+        )
+    return rows
+
+
+def _decode_pool_liquidity(kind: str) -> Callable[[Sequence[Dict[str, Any]]], List[tuple]]:
+    def decode(logs: Sequence[Dict[str, Any]]) -> List[tuple]:
+        rows = []
+        for log in logs:
+            block, index, tx = _head(log)
+            topics = log["topics"]
+            owner = _address(_topic_int(topics[1]))
+            lower, upper = _signed(_topic_int(topics[2])), _signed(_topic_int(topics[3]))
+            words = _words(log["data"])
+            if kind == "mint":  # sender, amount, amount0, amount1
+                amount, amount0, amount1 = words[1:4]
+            elif kind == "burn":  # amount, amount0, amount1
+                amount, amount0, amount1 = words[0:3]
+            else:  # collect: recipient, amount0, amount1
+                amount, (amount0, amount1) = None, words[1:3]
+            rows.append(
+                (block, index, _checksum(log["address"]), tx, kind, owner, lower, upper,
+                 None if amount is None else str(amount), str(amount0), str(amount1))
+            )
+        return rows
+
+    return decode
+
+
+def _decode_position(kind: str) -> Callable[[Sequence[Dict[str, Any]]], List[tuple]]:
+    def decode(logs: Sequence[Dict[str, Any]]) -> List[tuple]:
+        rows = []
+        for log in logs:
+            block, index, tx = _head(log)
+            topics = log["topics"]
+            if kind == "transfer":  # from, to, tokenId all indexed
+                row = (kind, _topic_int(topics[3]), _address(_topic_int(topics[2])), None, None, None)
+            else:
+                words = _words(log["data"])
+                if kind == "collect":  # recipient, amount0, amount1
+                    row = (kind, _topic_int(topics[1]), _address(words[0]), None, str(words[1]), str(words[2]))
+                else:  # liquidity, amount0, amount1
+                    row = (kind, _topic_int(topics[1]), None, str(words[0]), str(words[1]), str(words[2]))
+            rows.append((block, index, tx, *row))
+        return rows
+
+    return decode
+
+
+POOL_DECODERS: Dict[str, Tuple[str, Callable]] = {
+    SWAP_TOPIC: ("swaps", decode_swaps),
+    MINT_TOPIC: ("pool_liquidity", _decode_pool_liquidity("mint")),
+    BURN_TOPIC: ("pool_liquidity", _decode_pool_liquidity("burn")),
+    POOL_COLLECT_TOPIC: ("pool_liquidity", _decode_pool_liquidity("collect")),
+}
+POSITION_DECODERS: Dict[str, Tuple[str, Callable]] = {
+    INCREASE_LIQUIDITY_TOPIC: ("position_events", _decode_position("increase")),
+    DECREASE_LIQUIDITY_TOPIC: ("position_events", _decode_position("decrease")),
+    NPM_COLLECT_TOPIC: ("position_events", _decode_position("collect")),
+    TRANSFER_TOPIC: ("position_events", _decode_position("transfer")),
+}
+
+
+class EventIndexer:
+    """Scan pool and position-manager logs into a SQLite database.
+
+    :meth:`sync` walks from the checkpoint to the chain head in chunks of
+    ``chunk`` blocks, halving the range whenever the provider rejects a
+    query as too large (or jumping straight to the range it suggests) and
+    growing it again after light chunks. Before resuming, the stored hash of
+    the checkpoint block is compared with the chain; on mismatch the last
+    ``reorg_depth`` blocks are deleted and re-scanned.
+
+    The first sync needs ``start_block`` (there is no cheap way to find
+    where a pool's history begins); later ones resume from the checkpoint.
+    With ``token_ids`` set, position-manager logs are filtered by token id
+    topic instead of covering every position on the chain.
+    """
+
+    CHECKPOINT = "events"
+
+    def __init__(
+        self,
+        w3: Web3,
+        path: str,
+        pools: Iterable[str] = (POOL_WETH_USDC_005,),
+        position_manager: str = NONFUNGIBLE_POSITION_MANAGER,
+        start_block: Optional[int] = None,
+        token_ids: Optional[Iterable[int]] = None,
+        chunk: int = 2_000,
+        max_chunk: int = 100_000,
+        target_logs: int = 5_000,
+        reorg_depth: int = 64,
+    ) -> None:
+        self.w3 = w3
+        self.pools = [_checksum(p) for p in pools]
+        self.position_manager = _checksum(position_manager)
+        self.start_block = start_block
+        self.token_ids = None if token_ids is None else sorted(set(token_ids))
+        self.chunk = chunk
+        self.max_chunk = max_chunk
+        self.target_logs = target_logs
+        self.reorg_depth = reorg_depth
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    def checkpoint(self) -> Optional[int]:
+        """Last fully indexed block, or ``None`` before the first sync."""
+
+        row = self.db.execute("SELECT block FROM checkpoints WHERE name = ?", (self.CHECKPOINT,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """Index up to ``to_block`` (default: head) and return the rows added."""
+
+        head = self.w3.eth.block_number if to_block is None else to_block
+        last = self._check_reorg()
+        if last is None and self.start_block is None:
+            raise ValueError("start_block is required for the first sync")
+        start = self.start_block if last is None else last + 1
+        added = 0
+        while start <= head:
+            end = min(start + self.chunk - 1, head)
+            try:
+                logs = self._get_logs(start, end)
+            except RpcUnavailable:
+                raise
+            except Exception as exc:
+                end = self._shrink(start, end, exc)
+                continue
+            added += self._store(logs, end)
+            if len(logs) < self.target_logs // 2:
+                self.chunk = min(self.chunk * 2, self.max_chunk)
+            start = end + 1
+        if added:
+            print(f"[INDEX] {added} events indexed up to block {self.checkpoint()}")
+        return added
+
+    def rollback(self, block: int) -> None:
+        """Delete everything after ``block`` and move the checkpoint back to it."""
+
+        with self.db:
+            for table in TABLES:
+                self.db.execute(f"DELETE FROM {table} WHERE block > ?", (block,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, block, hash) VALUES (?, ?, NULL)",
+                (self.CHECKPOINT, block),
+            )
+
+    # ------------------------------------------------------------------
+    def _get_logs(self, start: int, end: int) -> List[Dict[str, Any]]:
+        if self.token_ids is None:
+            return self._query(start, end, [*self.pools, self.position_manager], [[*POOL_DECODERS, *POSITION_DECODERS]])
+        if not self.token_ids:
+            return self._query(start, end, self.pools, [list(POOL_DECODERS)])
+        ids = ["0x" + t.to_bytes(32, "big").hex() for t in self.token_ids]
+        # tokenId is the first indexed argument of the liquidity/collect
+        # events but the third of Transfer, so they need separate filters.
+        by_token = [t for t in POSITION_DECODERS if t != TRANSFER_TOPIC]
+        return [
+            *self._query(start, end, self.pools, [list(POOL_DECODERS)]),
+            *self._query(start, end, self.position_manager, [by_token, ids]),
+            *self._query(start, end, self.position_manager, [TRANSFER_TOPIC, None, None, ids]),
+        ]
+
+    def _query(self, start: int, end: int, address: Any, topics: List[Any]) -> List[Dict[str, Any]]:
+        return self.w3.eth.get_logs({"address": address, "topics": topics, "fromBlock": start, "toBlock": end})
+
+    def _shrink(self, start: int, end: int, exc: Exception) -> int:
+        message = str(exc)
+        if end == start or not any(h in message.lower() for h in _LIMIT_HINTS):
+            raise RuntimeError(f"Failed to fetch logs {start}-{end}: {exc}") from exc
+        match = _SUGGESTED_RANGE.search(message)
+        if match and int(match.group(1), 16) == start and int(match.group(2), 16) < end:
+            self.chunk = int(match.group(2), 16) - start + 1
+        else:
+            self.chunk = max(1, (end - start + 1) // 2)
+        print(f"[INDEX] Range {start}-{end} rejected; retrying with {self.chunk} blocks")
+        return start + self.chunk - 1
+
+    def _store(self, logs: Sequence[Dict[str, Any]], end: int) -> int:
+        groups: Dict[Tuple[str, Callable], List[Dict[str, Any]]] = {}
+        for log in logs:
+            if log.get("removed"):
+                continue
+            npm = _checksum(log["address"]) == self.position_manager
+            decoder = (POSITION_DECODERS if npm else POOL_DECODERS).get(_topic_hex(log["topics"][0]))
+            if decoder is not None:
+                groups.setdefault(decoder, []).append(log)
+        count = 0
+        with self.db:
+            for (table, decode), batch in groups.items():
+                rows = decode(batch)
+                marks = ",".join("?" * len(rows[0]))
+                self.db.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({marks})", rows)
+                count += len(rows)
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, block, hash) VALUES (?, ?, ?)",
+                (self.CHECKPOINT, end, self._block_hash(end)),
+            )
+        return count
+
+    def _block_hash(self, number: int) -> Optional[str]:
+        try:
+            return _topic_hex(self.w3.eth.get_block(number)["hash"])
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            print(f"[INDEX] Failed to read block {number}: {exc}")
+            return None
+
+    def _check_reorg(self) -> Optional[int]:
+        row = self.db.execute(
+            "SELECT block, hash FROM checkpoints WHERE name = ?", (self.CHECKPOINT,)
+        ).fetchone()
+        if row is None:
+            return None
+        block, stored = row
+        if stored is None or self._block_hash(block) in (stored, None):
+            return block
+        back = max(block - self.reorg_depth, (self.start_block or 0) - 1)
+        print(f"[INDEX] Reorg detected at block {block}; rolling back to {back}")
+        self.rollback(back)
+        return back
+
+    # ------------------------------------------------------------------
+    def swaps(
+        self, from_block: int = 0, to_block: Optional[int] = None, pool: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield swaps in ``[from_block, to_block]`` (of one ``pool`` if given) with integer fields.
+
+        Rows are streamed from the cursor, so large ranges are never held in
+        memory at once.
+        """
+
+        query = (
+            "SELECT block, log_index, pool, sqrt_price_x96, liquidity, tick, amount0, amount1 "
+            "FROM swaps WHERE block BETWEEN ? AND ?"
+        )
+        params: List[Any] = [from_block, to_block if to_block is not None else 2**62]
+        if pool is not None:
+            query += " AND pool = ?"
+            params.append(_checksum(pool))
+        for b, i, pool_, sp, liq, tick, a0, a1 in self.db.execute(query + " ORDER BY block, log_index", params):
+            yield {
+                "blockNumber": b,
+                "logIndex": i,
+                "pool": pool_,
+                "sqrtPriceX96": int(sp),
+                "liquidity": int(liq),
+                "tick": tick,
+                "amount0": int(a0),
+                "amount1": int(a1),
+            }
+
+    def position_history(self, token_id: int) -> List[Dict[str, Any]]:
+        """Return every indexed position-manager event of ``token_id``."""
+
+        rows = self.db.execute(
+            "SELECT block, log_index, kind, account, liquidity, amount0, amount1 "
+            "FROM position_events WHERE token_id = ? ORDER BY block, log_index",
+            (token_id,),
+        )
+        return [
+            {
+                "blockNumber": b,
+                "logIndex": i,
+                "kind": kind,
+                "account": account,
+                "liquidity": None if liq is None else int(liq),
+                "amount0": None if a0 is None else int(a0),
+                "amount1": None if a1 is None else int(a1),
+            }
+            for b, i, kind, account, liq, a0, a1 in rows
+        ]
@@ -2,12 +2,79 @@
 
 from __future__ import annotations
 
-from .uniswap import UniswapClient, POOL_WETH_USDC_005, RpcUnavailable
+import copy
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import time
+
+import numpy as np
+
+from .uniswap import TOKEN_SYMBOLS, UniswapClient, POOL_WETH_USDC_005, RpcUnavailable, _checksum
 from .hyperliquid import HyperliquidAPI
+from .telegram import AlertDispatcher
+from .valuation import Q96, hedge_drift, position_amounts, sqrt_price_at_ticks
+
+if TYPE_CHECKING:  # only used when RECORDER_DIR is set
+    from .recorder import SampleRecorder
+
+
+_TOKEN_SYMBOLS = {address.lower(): symbol for address, symbol in TOKEN_SYMBOLS.items()}
+
+
+class PortfolioEntry(NamedTuple):
+    """One monitored LP position and the Hyperliquid symbol hedging it."""
+
+    pool: str
+    token_id: Optional[int]
+    symbol: str = "ETH"
+
+
+def parse_portfolio(spec: str) -> List[PortfolioEntry]:
+    """Parse ``"pool:tokenId:symbol,..."`` (symbol defaults to ETH)."""
+
+    entries = []
+    for item in spec.split(","):
+        parts = [p.strip() for p in item.split(":")]
+        if not parts[0]:
+            continue
+        token_id = int(parts[1]) if len(parts) > 1 and parts[1] else None
+        symbol = parts[2] if len(parts) > 2 and parts[2] else "ETH"
+        entries.append(PortfolioEntry(_checksum(parts[0]), token_id, symbol.upper()))
+    return entries
+
+
+def _hedge_size(position: Optional[Dict[str, Any]]) -> Optional[float]:
+    return float(position["szi"]) if position and position.get("szi") is not None else None
+
+
+def _mark_price(position: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Mark implied by a Hyperliquid position (``positionValue / |szi|``)."""
+
+    size = _hedge_size(position)
+    if not size or position.get("positionValue") is None:
+        return None
+    return abs(float(position["positionValue"]) / size)
 
 
 class BotLogic:
-    """Monitor pool state and Hyperliquid position and raise alerts."""
+    """Monitor pool state and Hyperliquid position and raise alerts.
+
+    The bot watches a portfolio of ``(pool, tokenId, symbol)`` entries; the
+    legacy ``lp_token_id`` argument maps to a single WETH/USDC entry. Each
+    cycle reads every distinct pool once, all ``positions(tokenId)`` in one
+    batch and all hedge positions from one Hyperliquid snapshot, then
+    evaluates every position in a single pass.
+
+    A cycle is split into independent ``fetch_*`` reads and a pure
+    :meth:`evaluate` step so the reads can also be run concurrently (see
+    :mod:`utils.engine`). With a ``recorder`` every evaluated pool state is
+    also appended to a :class:`SampleRecorder`, and with a ``dispatcher``
+    alerts are also sent through an :class:`AlertDispatcher`, keyed per
+    position and bound so a condition that holds across cycles notifies
+    once.
+    """
 
     def __init__(
         self,
@@ -15,40 +82,467 @@ class BotLogic:
         hyperliquid: HyperliquidAPI,
         lp_token_id: int | None = None,
         alert_ticks: int = 100,
+        price_source: Callable[[], float] | None = None,
+        portfolio: List[PortfolioEntry] | None = None,
+        recorder: SampleRecorder | None = None,
+        dispatcher: AlertDispatcher | None = None,
     ) -> None:
         self.uniswap = uniswap
         self.hyperliquid = hyperliquid
-        self.lp_token_id = lp_token_id
         self.alert_ticks = alert_ticks
+        self.price_source = price_source
+        self.recorder = recorder
+        self.dispatcher = dispatcher
+        if portfolio is None:
+            portfolio = [PortfolioEntry(POOL_WETH_USDC_005, lp_token_id, "ETH")]
+        self.portfolio = list(portfolio)
+        self.pools = list(dict.fromkeys(e.pool for e in self.portfolio))
+        self.symbols = list(dict.fromkeys(e.symbol for e in self.portfolio))
+        self.token_ids = [e.token_id for e in self.portfolio if e.token_id is not None]
+        self.last_ticks: Dict[str, int] = {}
+        self.last_block: Optional[int] = None
+        self._bounds: Dict[int, Tuple[int, int]] = {}
+        self.position_liquidity: Dict[int, int] = {}
+        self.hedge_drift: Dict[str, float] = {}
+        # Latest state of every pool, polled or pushed by the stream.
+        self.pool_states: Dict[str, Dict[str, Any]] = {}
+        self._unmatched: Set[Tuple[str, str]] = set()
+        # Guards the caches the stream thread updates (see :meth:`on_pool_update`).
+        self._lock = threading.RLock()
+
+    @property
+    def lp_token_id(self) -> Optional[int]:
+        return self.token_ids[0] if self.token_ids else None
+
+    # Cached reads carried over when a bot is rebuilt (see :mod:`utils.supervisor`).
+    STATE_FIELDS: Tuple[str, ...] = ("last_ticks", "last_block", "_bounds", "position_liquidity", "hedge_drift")
+
+    def export_state(self) -> Dict[str, Any]:
+        """Return a picklable copy of the bot's cached state."""
+
+        return {name: copy.copy(getattr(self, name)) for name in self.STATE_FIELDS}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Resume from :meth:`export_state` output."""
+
+        for name in self.STATE_FIELDS:
+            if name in state:
+                setattr(self, name, copy.copy(state[name]))
+
+    # ------------------------------------------------------------------
+    def fetch_pool_states(self) -> Dict[str, Dict[str, Any]]:
+        """Return the state of every distinct pool that could be read."""
+
+        if self.uniswap is None:
+            print("[LOGIC] Skipping pool state (no RPC)")
+            return {}
+        try:
+            results = self.uniswap.get_pool_states(self.pools)
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            print(f"[LOGIC] Failed to fetch pool state: {exc}")
+            return {}
+        states = {}
+        for pool, res in results.items():
+            if res.success:
+                states[pool] = res.value
+            else:
+                print(f"[LOGIC] Failed to fetch pool state for {pool}: {res.error}")
+        with self._lock:
+            self.pool_states.update(states)
+        return states
+
+    def fetch_hedge_positions(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return the Hyperliquid position of every hedge symbol."""
+
+        return self.hyperliquid.get_positions(self.symbols)
+
+    def fetch_position_bounds(self) -> Dict[int, Tuple[int, int]]:
+        """Return tick bounds for every LP token id, read in one batch."""
+
+        if not self.token_ids or self.uniswap is None:
+            return {}
+        return self._read_bounds(self.token_ids)
+
+    def _read_bounds(self, token_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+        try:
+            results = self.uniswap.get_positions(token_ids)
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            print(f"[LOGIC] Failed to fetch position bounds: {exc}")
+            return {}
+        bounds = {}
+        for token_id, res in results.items():
+            if res.success:
+                bounds[token_id] = (int(res.value[5]), int(res.value[6]))
+                self.position_liquidity[token_id] = int(res.value[7])
+            else:
+                print(f"[LOGIC] Failed to fetch position bounds for {token_id}: {res.error}")
+        self._bounds.update(bounds)
+        return bounds
+
+    def fetch_reference_price(self) -> Optional[float]:
+        """Return the off-chain ETH/USDC reference price if a source is set."""
+
+        if self.price_source is None:
+            return None
+        try:
+            return self.price_source()
+        except Exception as exc:
+            print(f"[LOGIC] Failed to fetch reference price: {exc}")
+        return None
+
+    # ------------------------------------------------------------------
+    def evaluate(
+        self,
+        states: Dict[str, Dict[str, Any]],
+        positions: Dict[str, Optional[Dict[str, Any]]],
+        bounds: Dict[int, Tuple[int, int]],
+        reference_price: Optional[float] = None,
+    ) -> None:
+        """Print the fetched data and warn for positions near their bounds."""
+
+        self._record(states, positions)
+        for pool, state in states.items():
+            self.last_ticks[pool] = state["tick"]
+            self._print_pool(pool, state)
+        for symbol in self.symbols:
+            self._print_position(symbol, positions.get(symbol))
+        if reference_price is not None:
+            print(f"Reference ETH/USDC price: {reference_price}")
+
+        self._check_entries(self.portfolio, states, bounds)
+        self._report_hedge(states, positions, bounds)
+
+    def _check_entries(
+        self,
+        entries: Iterable[PortfolioEntry],
+        states: Dict[str, Dict[str, Any]],
+        bounds: Dict[int, Tuple[int, int]],
+    ) -> None:
+        for entry in entries:
+            state = states.get(entry.pool)
+            if state is not None and entry.token_id in bounds:
+                self._check_bounds(entry, state["tick"], bounds[entry.token_id])
+
+    def _report_hedge(
+        self,
+        states: Dict[str, Dict[str, Any]],
+        positions: Dict[str, Optional[Dict[str, Any]]],
+        bounds: Dict[int, Tuple[int, int]],
+        symbols: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Compare each symbol's LP exposure to that asset with its hedge size.
+
+        The hedged side of each pool is the token whose symbol matches the
+        entry's (:data:`TOKEN_SYMBOLS`), so the asset may be token0 or token1.
+        """
+
+        for symbol in self.symbols if symbols is None else symbols:
+            entries = [
+                e
+                for e in self.portfolio
+                if e.symbol == symbol
+                and e.pool in states
+                and e.token_id in bounds
+                and e.token_id in self.position_liquidity
+            ]
+            if not entries:
+                continue
+            liquidity = np.array([self.position_liquidity[e.token_id] for e in entries], dtype=np.float64)
+            sqrt_lower = sqrt_price_at_ticks([bounds[e.token_id][0] for e in entries])
+            sqrt_upper = sqrt_price_at_ticks([bounds[e.token_id][1] for e in entries])
+            sqrt_price = np.array([states[e.pool]["sqrtPriceX96"] / Q96 for e in entries])
+            sides = [self._hedged_side(e, states[e.pool]) for e in entries]
+            scale = np.array([10.0 ** -states[e.pool].get(f"decimals{side}", 18) for e, side in zip(entries, sides)])
+            amount0, amount1 = position_amounts(liquidity, sqrt_price, sqrt_lower, sqrt_upper)
+            lp_delta = float((np.where(np.array(sides) == 1, amount1, amount0) * scale).sum())
+            hedge = _hedge_size(positions.get(symbol))
+            drift = hedge_drift(lp_delta, hedge)
+            self.hedge_drift[symbol] = drift
+            print(f"[HEDGE] {symbol} LP delta={lp_delta:.6f} hedge={hedge} drift={drift:.6f}")
+
+    def _hedged_side(self, entry: PortfolioEntry, state: Dict[str, Any]) -> int:
+        """0 or 1: which pool token ``entry.symbol`` hedges (token0 if unknown)."""
 
+        for side in (0, 1):
+            token = state.get(f"token{side}")
+            if token is not None and _TOKEN_SYMBOLS.get(str(token).lower()) == entry.symbol:
+                return side
+        if (entry.pool, entry.symbol) not in self._unmatched:
+            self._unmatched.add((entry.pool, entry.symbol))
+            print(f"[WARN] No token of pool {entry.pool} matches {entry.symbol}; assuming token0 is hedged")
+        return 0
+
+    def _record(self, states: Dict[str, Dict[str, Any]], positions: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        if self.recorder is None:
+            return
+        now = time.time()
+        for pool, state in states.items():
+            symbol = next((e.symbol for e in self.portfolio if e.pool == pool), self.symbols[0])
+            position = positions.get(symbol)
+            self.recorder.append(
+                now,
+                state.get("blockNumber", self.last_block),
+                state["sqrtPriceX96"],
+                state["tick"],
+                state["liquidity"],
+                _hedge_size(position),
+                _mark_price(position),
+                pool=self.pools.index(pool) if pool in self.pools else -1,
+            )
+
+    def _print_pool(self, pool: str, state: Dict[str, Any]) -> None:
+        prefix = "Pool" if len(self.pools) == 1 else f"Pool {pool}"
+        print(f"{prefix} sqrtPriceX96={state['sqrtPriceX96']} tick={state['tick']}")
+
+    def _print_position(self, symbol: str, position: Optional[Dict[str, Any]]) -> None:
+        label = "Hyperliquid position" if len(self.symbols) == 1 else f"Hyperliquid {symbol} position"
+        print(f"{label}: {position}")
+
+    def _check_bounds(self, entry: PortfolioEntry, tick: int, bounds: Tuple[int, int]) -> None:
+        lower, upper = bounds
+        suffix = "" if len(self.portfolio) == 1 else f" (token {entry.token_id})"
+        side = None
+        if tick <= lower + self.alert_ticks:
+            side = "lower"
+        elif tick >= upper - self.alert_ticks:
+            side = "upper"
+        if side is not None:
+            self.alert(f"Price near {side} bound{suffix}", key=f"bounds:{entry.token_id}:{side}")
+        if self.dispatcher is not None:
+            for other in ("lower", "upper"):
+                if other != side:
+                    self.dispatcher.resolve(f"bounds:{entry.token_id}:{other}")
+
+    def alert(self, message: str, key: Optional[str] = None) -> None:
+        """Emit one alert; subclasses can route or count them instead."""
+
+        print(f"[ALERT] {message}")
+        if self.dispatcher is not None:
+            self.dispatcher.notify(key or message, message)
+
+    # ------------------------------------------------------------------
+    def on_pool_update(self, state: Dict[str, int]) -> None:
+        """Handle a pushed pool state (e.g. a decoded ``Swap`` log).
+
+        The bound check only runs when the tick actually moved, and position
+        bounds are read once and reused between updates. Called from the
+        stream thread, so the shared caches are only touched under the lock.
+        """
+
+        with self._lock:
+            self.last_block = state.get("blockNumber", self.last_block)
+            pool = _checksum(state["pool"]) if state.get("pool") else self.pools[0]
+            fields = {k: v for k, v in state.items() if k != "pool"}
+            self.pool_states[pool] = {**self.pool_states.get(pool, {}), **fields}
+            tick = state["tick"]
+            if self.last_ticks.get(pool) == tick:
+                return
+            self.last_ticks[pool] = tick
+            self._print_pool(pool, state)
+            entries = [e for e in self.portfolio if e.pool == pool and e.token_id is not None]
+            if any(e.token_id not in self._bounds for e in entries):
+                self.fetch_position_bounds()
+            for entry in entries:
+                if entry.token_id in self._bounds:
+                    self._check_bounds(entry, tick, self._bounds[entry.token_id])
+
+    def on_new_head(self, block_number: int) -> None:
+        """Record the latest block seen on the stream."""
+
+        with self._lock:
+            self.last_block = block_number
+
+    def on_stream_connected(self) -> None:
+        """Poll every pool once so quiet pools are checked before their first Swap."""
+
+        self.fetch_pool_states()
+
+    def check_streamed(self) -> None:
+        """Run a cycle on the pool states pushed by the stream.
+
+        Only the pool reads are replaced: hedge positions, drift, bound
+        checks and recording keep the polling cadence. The Hyperliquid and
+        price reads run outside :attr:`_lock`, so the stream thread is only
+        held up while the cached states are evaluated.
+        """
+
+        positions = self.fetch_hedge_positions()
+        reference_price = self.fetch_reference_price()
+        with self._lock:
+            states = {pool: self._with_metadata(pool, state) for pool, state in dict(self.pool_states).items()}
+            bounds = {t: self._bounds[t] for t in self.token_ids if t in self._bounds}
+            if states and len(bounds) < len(self.token_ids):
+                bounds = self.fetch_position_bounds()
+            self.evaluate(states, positions, bounds, reference_price)
+
+    def _with_metadata(self, pool: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the immutable pool fields ``Swap`` logs do not carry."""
+
+        if "token0" in state or self.uniswap is None:
+            return state
+        try:
+            state = {**self.uniswap.get_pool_metadata(pool), **state}
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            print(f"[LOGIC] Failed to fetch pool metadata for {pool}: {exc}")
+            return state
+        self.pool_states[pool] = state
+        return state
+
+    # ------------------------------------------------------------------
     def check_and_alert(self) -> None:
         """Print pool state and warn if near LP bounds."""
 
-        tick = None
-        if self.uniswap is not None:
-            try:
-                state = self.uniswap.get_pool_state(POOL_WETH_USDC_005)
-                tick = state["tick"]
-                print(f"Pool sqrtPriceX96={state['sqrtPriceX96']} tick={tick}")
-            except RpcUnavailable:
-                raise
-            except Exception as exc:
-                print(f"[LOGIC] Failed to fetch pool state: {exc}")
-        else:
-            print("[LOGIC] Skipping pool state (no RPC)")
+        states = self.fetch_pool_states()
+        positions = self.fetch_hedge_positions()
+        bounds = self.fetch_position_bounds() if states else {}
+        self.evaluate(states, positions, bounds, self.fetch_reference_price())
+
+
+class IncrementalBotLogic(BotLogic):
+    """:class:`BotLogic` that only recomputes what changed since the last cycle.
+
+    Pool results are keyed by ``(tick, liquidity)`` at the block they were
+    read, positions by their bounds and liquidity and hedges by their size.
+    A cycle where none of those moved is skipped outright; otherwise bound
+    checks, valuation and alerts run only for the affected positions and
+    symbols. Cached ``positions(tokenId)`` reads are reused until an
+    ``IncreaseLiquidity``/``DecreaseLiquidity`` event for the token shows up
+    between polled blocks or :meth:`invalidate_position` is called.
+
+    :attr:`stats` counts ``cycle``, ``entry`` and ``bounds`` hits and misses.
+    """
+
+    STATE_FIELDS = BotLogic.STATE_FIELDS + (
+        "stats",
+        "_pool_keys",
+        "_bound_keys",
+        "_hedge_keys",
+        "_dirty",
+        "_events_block",
+    )
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats: Counter = Counter()
+        self._pool_keys: Dict[str, Tuple[int, int]] = {}
+        self._bound_keys: Dict[int, Tuple[Tuple[int, int], Optional[int]]] = {}
+        self._hedge_keys: Dict[str, Optional[float]] = {}
+        self._dirty: Set[int] = set()
+        self._events_block: Optional[int] = None
+
+    def invalidate_position(self, token_id: int) -> None:
+        """Force ``token_id`` to be re-read on the next cycle."""
+
+        self._dirty.add(token_id)
+
+    @property
+    def events_block(self) -> Optional[int]:
+        """Last block scanned for ``IncreaseLiquidity``/``DecreaseLiquidity`` events."""
+
+        return self._events_block
+
+    def mark_events_scanned(self, block: int) -> None:
+        """Record a scan up to ``block`` done elsewhere (e.g. once for a whole shard).
 
-        pos = self.hyperliquid.get_position("ETH")
-        print(f"Hyperliquid position: {pos}")
+        Tokens it found touched are passed in through :meth:`invalidate_position`.
+        """
 
-        if tick is not None and self.lp_token_id is not None and self.uniswap is not None:
+        if self._events_block is None or block > self._events_block:
+            self._events_block = block
+
+    def stale_token_ids(self) -> List[int]:
+        """Tokens whose bounds the next :meth:`fetch_position_bounds` re-reads."""
+
+        return [t for t in self.token_ids if t not in self._bounds or t in self._dirty]
+
+    # ------------------------------------------------------------------
+    def fetch_pool_states(self) -> Dict[str, Dict[str, Any]]:
+        states = super().fetch_pool_states()
+        blocks = [s["blockNumber"] for s in states.values() if s.get("blockNumber") is not None]
+        if blocks:
+            self.last_block = max(blocks)
+        return states
+
+    def fetch_position_bounds(self) -> Dict[int, Tuple[int, int]]:
+        """Return cached bounds, re-reading only tokens touched by an event."""
+
+        if not self.token_ids or self.uniswap is None:
+            return {}
+        self._scan_position_events()
+        stale = self.stale_token_ids()
+        if stale:
+            self.stats["bounds_miss"] += 1
+            fresh = self._read_bounds(stale)
+            for token_id in stale:
+                if token_id not in fresh:
+                    # Burned or unreadable: drop it so the next cycle retries.
+                    self._bounds.pop(token_id, None)
+                    self.position_liquidity.pop(token_id, None)
+            self._dirty.difference_update(fresh)
+        else:
+            self.stats["bounds_hit"] += 1
+        return {t: self._bounds[t] for t in self.token_ids if t in self._bounds}
+
+    def _scan_position_events(self) -> None:
+        block = self.last_block
+        if block is None or (self._events_block is not None and block <= self._events_block):
+            return
+        if self._events_block is not None:
             try:
-                lower, upper = self.uniswap.get_position_bounds(self.lp_token_id)
-                if tick <= lower + self.alert_ticks:
-                    print("[ALERT] Price near lower bound")
-                elif tick >= upper - self.alert_ticks:
-                    print("[ALERT] Price near upper bound")
+                touched = self.uniswap.get_position_events(self.token_ids, self._events_block + 1, block)
             except RpcUnavailable:
                 raise
             except Exception as exc:
-                print(f"[LOGIC] Failed to fetch position bounds: {exc}")
+                print(f"[LOGIC] Failed to scan position events: {exc}; re-reading bounds")
+                touched = set(self.token_ids)
+            self._dirty.update(touched)
+        self._events_block = block
+
+    # ------------------------------------------------------------------
+    def evaluate(
+        self,
+        states: Dict[str, Dict[str, Any]],
+        positions: Dict[str, Optional[Dict[str, Any]]],
+        bounds: Dict[int, Tuple[int, int]],
+        reference_price: Optional[float] = None,
+    ) -> None:
+        """Evaluate only the positions and hedges whose inputs changed."""
+
+        self._record(states, positions)
+        pool_keys = {p: (s["tick"], s["liquidity"]) for p, s in states.items()}
+        bound_keys = {t: (b, self.position_liquidity.get(t)) for t, b in bounds.items()}
+        hedge_keys = {s: _hedge_size(positions.get(s)) for s in self.symbols}
+        dirty_pools = {p for p, key in pool_keys.items() if self._pool_keys.get(p) != key}
+        dirty_tokens = {t for t, key in bound_keys.items() if self._bound_keys.get(t) != key}
+        dirty_symbols = {
+            s for s, key in hedge_keys.items() if s not in self._hedge_keys or self._hedge_keys[s] != key
+        }
+        entries = [e for e in self.portfolio if e.pool in dirty_pools or e.token_id in dirty_tokens]
+        symbols = [s for s in self.symbols if s in dirty_symbols or any(e.symbol == s for e in entries)]
+
+        self.stats["entry_miss"] += len(entries)
+        self.stats["entry_hit"] += len(self.portfolio) - len(entries)
+        if not entries and not symbols:
+            self.stats["cycle_hit"] += 1
+            print(f"[LOGIC] No change at block {self.last_block}; skipping evaluation")
+            return
+        self.stats["cycle_miss"] += 1
 
+        for pool in dirty_pools:
+            self.last_ticks[pool] = states[pool]["tick"]
+            self._print_pool(pool, states[pool])
+        for symbol in dirty_symbols:
+            self._print_position(symbol, positions.get(symbol))
+        if reference_price is not None:
+            print(f"Reference ETH/USDC price: {reference_price}")
+        self._check_entries(entries, states, bounds)
+        self._report_hedge(states, positions, bounds, symbols)
+        self._pool_keys.update(pool_keys)
+        self._bound_keys.update(bound_keys)
+        self._hedge_keys.update(hedge_keys)
@@ -0,0 +1,251 @@
+"""In-process metrics with Prometheus text exposition and a health endpoint.
+
+Counters, gauges and histograms keep plain Python numbers per label set.
+Recording an event is a dict lookup (cached per label values) plus an add;
+histograms also bisect a short bucket list. That keeps the hot path well
+under a microsecond, so no lock is taken: a racing increment can in rare
+cases be lost, which is acceptable for monitoring data.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "Timer":
+        return Timer(self)
+
+
+class Timer:
+    """Context manager observing the elapsed seconds into a histogram."""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _Buckets) -> None:
+        self.child = child
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class Metric:
+    """A named metric family; :meth:`labels` returns the per-label child."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        return _Value()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, values)} {child.value:g}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def value(self, *labels: str) -> float:
+        return self.labels(*labels).value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> Timer:
+        return Timer(self.labels())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _label_text(self.labelnames, values, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum:g}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together on ``/metrics``."""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+RPC_SECONDS: Histogram = REGISTRY.register(
+    Histogram("rpc_request_seconds", "JSON-RPC request latency", ("endpoint", "method"))
+)
+RPC_FAILURES: Counter = REGISTRY.register(Counter("rpc_failures_total", "Failed JSON-RPC requests", ("endpoint",)))
+RPC_RETRIES: Counter = REGISTRY.register(Counter("rpc_retries_total", "Retried client reads", ("call",)))
+HYPERLIQUID_SECONDS: Histogram = REGISTRY.register(
+    Histogram("hyperliquid_request_seconds", "Hyperliquid Info call latency", ("call",))
+)
+HYPERLIQUID_FAILURES: Counter = REGISTRY.register(
+    Counter("hyperliquid_failures_total", "Failed Hyperliquid Info calls", ("call",))
+)
+PRICE_SECONDS: Histogram = REGISTRY.register(Histogram("price_source_seconds", "Price source latency", ("source",)))
+PRICE_FAILURES: Counter = REGISTRY.register(Counter("price_failures_total", "Failed price source queries", ("source",)))
+CYCLE_SECONDS: Histogram = REGISTRY.register(Histogram("cycle_seconds", "Bot cycle duration"))
+LAST_CYCLE: Gauge = REGISTRY.register(Gauge("last_cycle_timestamp_seconds", "Unix time of the last finished cycle"))
+SHARD_SECONDS: Histogram = REGISTRY.register(
+    Histogram("shard_cycle_seconds", "Supervisor worker cycle duration", ("shard",))
+)
+WORKER_RESTARTS: Counter = REGISTRY.register(
+    Counter("worker_restarts_total", "Supervisor worker restarts", ("shard",))
+)
+ALERTS: Counter = REGISTRY.register(Counter("alerts_total", "Alert dispatcher outcomes", ("outcome",)))
+DEGRADED: Gauge = REGISTRY.register(Gauge("degraded", "1 while no RPC endpoint is reachable"))
+DEGRADED_TRANSITIONS: Counter = REGISTRY.register(
+    Counter("degraded_transitions_total", "Times the bot entered degraded mode")
+)
+
+
+def set_degraded(degraded: bool) -> None:
+    """Update the degraded gauge, counting healthy -> degraded transitions."""
+
+    if degraded and not DEGRADED.value():
+        DEGRADED_TRANSITIONS.inc()
+    DEGRADED.set(1.0 if degraded else 0.0)
+
+
+def health(max_age: float) -> Tuple[bool, Dict[str, Any]]:
+    """Healthy while cycles keep finishing; degraded mode is reported, not fatal."""
+
+    last = LAST_CYCLE.value()
+    age = time.time() - last if last else None
+    ok = age is None or age <= max_age
+    return ok, {"status": "ok" if ok else "stalled", "degraded": bool(DEGRADED.value()), "last_cycle_age": age}
+
+
+def serve(
+    port: int,
+    health_check: Optional[Callable[[], Tuple[bool, Dict[str, Any]]]] = None,
+    registry: Registry = REGISTRY,
+    host: str = "0.0.0.0",
+) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` and ``/healthz`` from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            if self.path == "/metrics":
+                status, body, ctype = 200, registry.render(), "text/plain; version=0.0.4"
+            elif self.path == "/healthz":
+                ok, detail = health_check() if health_check else (True, {"status": "ok"})
+                status, body, ctype = 200 if ok else 503, json.dumps(detail), "application/json"
+            else:
+                status, body, ctype = 404, "not found\n", "text/plain"
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] Serving /metrics and /healthz on port {server.server_address[1]}")
+    return server
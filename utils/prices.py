@@ -1,47 +1,49 @@
 import os
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
 import requests
 
+from .metrics import PRICE_FAILURES, PRICE_SECONDS
+
 # URLs e identificadores padrão do subgrafo Uniswap v3
 DEFAULT_SUBGRAPH_URL = "https://api.thegraph.com/subgraphs/name/ianlapham/uniswap-v3-arbitrum"
 DEFAULT_POOL_ID = "0x88f38662f45c78302b556271cd0a4da9d1cb1a0d"
 
+PriceSource = Callable[[requests.Session, float], float]
 
-def get_eth_usdc_price() -> float:
-    """Obtém o preço do par ETH/USDC.
 
-    A busca é feita em múltiplas fontes, em ordem de prioridade:
-    1. API pública da Coinbase
-    2. Subgrafo do Uniswap v3
+# ---------------------------------------------------------------------------
+# Fontes de preço
+# ---------------------------------------------------------------------------
+def coinbase_price(session: requests.Session, timeout: float) -> float:
+    """API pública da Coinbase."""
 
-    Se todas falharem, utiliza ETH_PRICE_FALLBACK ou lança exceção.
-    """
+    resp = session.get("https://api.coinbase.com/v2/prices/ETH-USD/spot", timeout=timeout)
+    resp.raise_for_status()
+    return float(resp.json()["data"]["amount"])
 
-    # 1) Tentativa via Coinbase
-    try:
-        resp = requests.get(
-            "https://api.coinbase.com/v2/prices/ETH-USD/spot",
-            timeout=10,
-        )
-        resp.raise_for_status()
-        return float(resp.json()["data"]["amount"])
-    except Exception as exc:
-        print(f"[WARN] Coinbase price unavailable: {exc}")
 
-    # 2) Tentativa via subgrafo do Uniswap
+def subgraph_bundle_price(session: requests.Session, timeout: float) -> float:
+    """Bundle com preço do ETH em USD (instrução oficial do Uniswap)."""
+
     subgraph_url = os.getenv("UNISWAP_SUBGRAPH", DEFAULT_SUBGRAPH_URL)
+    bundle_query = {"query": "{ bundle(id: \"1\") { ethPriceUSD } }"}
+    response = session.post(subgraph_url, json=bundle_query, timeout=timeout)
+    response.raise_for_status()
+    price = response.json()["data"]["bundle"]["ethPriceUSD"]
+    if not price:
+        raise ValueError("bundle price missing")
+    return float(price)
+
 
-    # 2a) bundle com preço do ETH em USD (instrução oficial do Uniswap)
-    try:
-        bundle_query = {"query": "{ bundle(id: \"1\") { ethPriceUSD } }"}
-        response = requests.post(subgraph_url, json=bundle_query, timeout=10)
-        response.raise_for_status()
-        price = response.json()["data"]["bundle"]["ethPriceUSD"]
-        if price:
-            return float(price)
-    except Exception as exc:
-        print(f"[WARN] Uniswap bundle price unavailable: {exc}")
-
-    # 2b) fallback via pool específica WETH/USDC
+def subgraph_pool_price(session: requests.Session, timeout: float) -> float:
+    """Preço via pool específica WETH/USDC no subgrafo."""
+
+    subgraph_url = os.getenv("UNISWAP_SUBGRAPH", DEFAULT_SUBGRAPH_URL)
     pool_id = os.getenv("UNISWAP_POOL_ID", DEFAULT_POOL_ID)
     pool_query = {
         "query": (
@@ -49,23 +51,156 @@ def get_eth_usdc_price() -> float:
             % pool_id
         )
     }
-    try:
-        response = requests.post(subgraph_url, json=pool_query, timeout=10)
-        response.raise_for_status()
-        payload = response.json().get("data", {}).get("pool")
-        if not payload:
-            raise ValueError("pool data missing")
-        t0 = payload["token0"]["symbol"].upper()
-        t1 = payload["token1"]["symbol"].upper()
-        if t0 == "WETH" and t1 in ("USDC", "USDT"):
-            return float(payload["token0Price"])
-        if t1 == "WETH" and t0 in ("USDC", "USDT"):
-            return float(payload["token1Price"])
-        raise ValueError("unexpected pool tokens")
-    except Exception as exc:
-        print(f"[WARN] Uniswap pool price unavailable: {exc}")
-
-    # 3) Fallback via variável de ambiente
+    response = session.post(subgraph_url, json=pool_query, timeout=timeout)
+    response.raise_for_status()
+    payload = response.json().get("data", {}).get("pool")
+    if not payload:
+        raise ValueError("pool data missing")
+    t0 = payload["token0"]["symbol"].upper()
+    t1 = payload["token1"]["symbol"].upper()
+    if t0 == "WETH" and t1 in ("USDC", "USDT"):
+        return float(payload["token0Price"])
+    if t1 == "WETH" and t0 in ("USDC", "USDT"):
+        return float(payload["token1Price"])
+    raise ValueError("unexpected pool tokens")
+
+
+DEFAULT_SOURCES: Dict[str, PriceSource] = {
+    "Coinbase": coinbase_price,
+    "Uniswap bundle": subgraph_bundle_price,
+    "Uniswap pool": subgraph_pool_price,
+}
+
+
+# ---------------------------------------------------------------------------
+# Agregador
+# ---------------------------------------------------------------------------
+class CircuitBreaker:
+    """Desativa uma fonte por ``reset_after`` segundos após falhas seguidas."""
+
+    def __init__(self, max_failures: int = 3, reset_after: float = 60.0) -> None:
+        self.max_failures = max_failures
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        # Depois do período de espera, deixa passar uma tentativa (half-open)
+        return self.failures < self.max_failures or time.monotonic() - self.opened_at >= self.reset_after
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.opened_at = time.monotonic()
+
+
+class PriceAggregator:
+    """Consulta todas as fontes em paralelo e devolve um preço dentro do prazo.
+
+    Com ``quorum`` 1 retorna a primeira resposta válida; com ``quorum`` maior
+    espera esse número de respostas e retorna a mediana. A espera nunca passa
+    de ``deadline`` segundos (se houver alguma resposta até lá, usa a mediana
+    do que chegou). O resultado fica em cache por ``ttl`` segundos, as
+    conexões HTTP são reaproveitadas e cada fonte tem um
+    :class:`CircuitBreaker` para não ser consultada enquanto estiver fora.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Dict[str, PriceSource]] = None,
+        deadline: float = 3.0,
+        ttl: float = 5.0,
+        quorum: int = 1,
+    ) -> None:
+        self.sources = dict(sources or DEFAULT_SOURCES)
+        self.deadline = deadline
+        self.ttl = ttl
+        self.quorum = quorum
+        self.session = requests.Session()
+        self.breakers = {name: CircuitBreaker() for name in self.sources}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.sources)), thread_name_prefix="price")
+        self._cache: Optional[Tuple[float, float]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[float]:
+        """Retorna o preço agregado ou ``None`` se nenhuma fonte responder."""
+
+        with self._lock:
+            if self._cache and time.monotonic() - self._cache[1] < self.ttl:
+                return self._cache[0]
+            price = self._query()
+            if price is not None:
+                self._cache = (price, time.monotonic())
+            return price
+
+    def _query(self) -> Optional[float]:
+        futures = {
+            self._executor.submit(self._fetch, name, source): name
+            for name, source in self.sources.items()
+            if self.breakers[name].allow()
+        }
+        results: List[float] = []
+        pending = set(futures)
+        end = time.monotonic() + self.deadline
+        while pending and len(results) < self.quorum:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            results += [f.result() for f in done if f.result() is not None]
+        if not results:
+            return None
+        return statistics.median(results)
+
+    def _fetch(self, name: str, source: PriceSource) -> Optional[float]:
+        try:
+            with PRICE_SECONDS.labels(name).time():
+                price = source(self.session, self.deadline)
+            if not price > 0:
+                raise ValueError(f"invalid price {price}")
+        except Exception as exc:
+            PRICE_FAILURES.labels(name).inc()
+            print(f"[WARN] {name} price unavailable: {exc}")
+            self.breakers[name].record_failure()
+            return None
+        self.breakers[name].record_success()
+        return price
+
+
+_aggregator: Optional[PriceAggregator] = None
+
+
+def get_aggregator() -> PriceAggregator:
+    """Agregador compartilhado, configurado por variáveis de ambiente."""
+
+    global _aggregator
+    if _aggregator is None:
+        _aggregator = PriceAggregator(
+            deadline=float(os.getenv("PRICE_DEADLINE", "3")),
+            ttl=float(os.getenv("PRICE_CACHE_TTL", "5")),
+            quorum=int(os.getenv("PRICE_QUORUM", "1")),
+        )
+    return _aggregator
+
+
+def get_eth_usdc_price() -> float:
+    """Obtém o preço do par ETH/USDC.
+
+    A busca é feita em paralelo em múltiplas fontes (via :class:`PriceAggregator`):
+    1. API pública da Coinbase
+    2. Subgrafo do Uniswap v3 (bundle e pool WETH/USDC)
+
+    Se todas falharem dentro do prazo, utiliza ETH_PRICE_FALLBACK ou lança exceção.
+    """
+
+    price = get_aggregator().get()
+    if price is not None:
+        return price
+
+    # Fallback via variável de ambiente
     fallback = os.getenv("ETH_PRICE_FALLBACK")
     if fallback:
         try:
@@ -0,0 +1,196 @@
+"""Fixed-width, memory-mapped time series of per-cycle pool and hedge samples.
+
+Samples are appended to segment files of ``segment_records`` preallocated
+records (``seg-000000.bin``, ``seg-000001.bin``...). Each file starts with a
+64-byte header holding the record count, followed by packed
+:data:`RECORD_DTYPE` rows, so a reader maps it with :class:`numpy.memmap`
+and gets column views without parsing or copying; only the pages actually
+touched are loaded, keeping RAM bounded for years of 1 s samples.
+"""
+
+from __future__ import annotations
+
+import glob
+import math
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .valuation import Q96
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("block", "<i8"),
+        ("pool", "<i4"),
+        ("tick", "<i4"),
+        ("sqrt_price", "<f8"),  # sqrtPriceX96 / 2**96
+        ("liquidity", "<f8"),
+        ("hedge", "<f8"),  # signed size, NaN when unknown
+        ("mark", "<f8"),  # NaN when unknown
+    ]
+)
+
+MAGIC = b"HBREC001"
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sQQ")  # magic, count, itemsize
+
+
+def _segment_path(directory: str, index: int) -> str:
+    return os.path.join(directory, f"seg-{index:06d}.bin")
+
+
+def _read_count(path: str) -> int:
+    with open(path, "rb") as fh:
+        magic, count, itemsize = _HEADER.unpack(fh.read(_HEADER.size))
+    if magic != MAGIC or itemsize != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a sample segment")
+    return count
+
+
+class SampleRecorder:
+    """Append samples to the newest segment, rotating when it is full.
+
+    The header count is advanced after the record is written, so a crash
+    never exposes a half-written row; :meth:`flush` pushes both to disk.
+    """
+
+    def __init__(self, directory: str, segment_records: int = 1 << 20) -> None:
+        self.directory = directory
+        self.segment_records = segment_records
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(directory, "seg-*.bin")))
+        self._index = len(existing) - 1 if existing else 0
+        self._open(self._index)
+
+    def _open(self, index: int) -> None:
+        path = _segment_path(self.directory, index)
+        if os.path.exists(path):
+            self._count = _read_count(path)
+            capacity = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        else:
+            self._count, capacity = 0, self.segment_records
+            with open(path, "wb") as fh:
+                fh.write(_HEADER.pack(MAGIC, 0, RECORD_DTYPE.itemsize).ljust(HEADER_SIZE, b"\0"))
+                fh.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._header = np.memmap(path, dtype="<u8", mode="r+", shape=(HEADER_SIZE // 8,))
+        self._rows = np.memmap(path, dtype=RECORD_DTYPE, mode="r+", offset=HEADER_SIZE, shape=(capacity,))
+
+    def append(
+        self,
+        timestamp: float,
+        block: Optional[int],
+        sqrt_price_x96: int,
+        tick: int,
+        liquidity: int,
+        hedge: Optional[float] = None,
+        mark: Optional[float] = None,
+        pool: int = 0,
+    ) -> None:
+        """Append one sample; ``None`` values are stored as -1 / NaN."""
+
+        if self._count >= len(self._rows):
+            self.flush()
+            self._index += 1
+            self._open(self._index)
+        self._rows[self._count] = (
+            timestamp,
+            -1 if block is None else block,
+            pool,
+            tick,
+            sqrt_price_x96 / Q96,
+            float(liquidity),
+            math.nan if hedge is None else hedge,
+            math.nan if mark is None else mark,
+        )
+        self._count += 1
+        self._header[1] = self._count
+
+    def flush(self) -> None:
+        self._rows.flush()
+        self._header.flush()
+
+    def close(self) -> None:
+        self.flush()
+        del self._rows, self._header
+
+
+class SampleReader:
+    """Read-only views over every segment in ``directory``.
+
+    :meth:`views` binary-searches the sorted ``timestamp`` or ``block``
+    column and returns one zero-copy view per segment, so a query over
+    months of samples only maps the pages it touches. :meth:`range` and
+    :meth:`all` join those views into one array, which copies them when the
+    result spans several segments. Rows recorded without a block number
+    (stored as -1) are left out of ``block`` queries.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.segments: List[np.ndarray] = []
+        self._blocks: Dict[int, Optional[Tuple[np.ndarray, np.ndarray]]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        """Remap the segments to pick up samples appended since opening."""
+
+        self.segments = []
+        self._blocks = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, "seg-*.bin"))):
+            count = _read_count(path)
+            if count:
+                rows = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+                self.segments.append(rows)
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self.segments)
+
+    def all(self) -> np.ndarray:
+        """Every sample in one array (a copy when there are several segments)."""
+
+        return self._join(self.segments)
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None, field: str = "timestamp") -> np.ndarray:
+        """Return samples with ``start <= field < end`` joined into one array."""
+
+        return self._join(self.views(start, end, field))
+
+    def views(
+        self, start: Optional[float] = None, end: Optional[float] = None, field: str = "timestamp"
+    ) -> List[np.ndarray]:
+        """Return samples with ``start <= field < end`` as one view per segment."""
+
+        parts = []
+        for i, rows in enumerate(self.segments):
+            index = self._block_index(i) if field == "block" else None
+            keys = rows[field] if index is None else index[1]
+            if not len(keys) or (end is not None and keys[0] >= end) or (start is not None and keys[-1] < start):
+                continue
+            lo = 0 if start is None else int(np.searchsorted(keys, start, "left"))
+            hi = len(keys) if end is None else int(np.searchsorted(keys, end, "left"))
+            if hi <= lo:
+                continue
+            if index is None:
+                parts.append(rows[lo:hi])
+                continue
+            part = rows[index[0][lo] : index[0][hi - 1] + 1]
+            parts.append(part if len(part) == hi - lo else part[part["block"] >= 0])
+        return parts
+
+    def _block_index(self, segment: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Positions and blocks of the rows with a known block; ``None`` if all are known."""
+
+        if segment not in self._blocks:
+            blocks = self.segments[segment]["block"]
+            known = blocks >= 0
+            self._blocks[segment] = None if known.all() else (np.flatnonzero(known), np.asarray(blocks[known]))
+        return self._blocks[segment]
+
+    @staticmethod
+    def _join(parts: List[np.ndarray]) -> np.ndarray:
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
@@ -0,0 +1,221 @@
+"""Historical replay of :class:`BotLogic` for backtests and parameter sweeps.
+
+Recorded samples (:class:`utils.recorder.SampleReader`) or indexed swaps
+(:meth:`utils.indexer.EventIndexer.swaps`) are fed through stand-ins for
+``UniswapClient`` and ``HyperliquidAPI``, so the exact live decision code
+runs on them. Runs of identical consecutive samples are evaluated once and
+weighted by their length, which gives the same counts as stepping through
+every sample. :func:`sweep` fans a parameter grid out over a process pool.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .logic import BotLogic, PortfolioEntry
+from .recorder import RECORD_DTYPE
+from .uniswap import POOL_WETH_USDC_005, CallResult
+from .valuation import Q96
+
+
+class ReplayConfig(NamedTuple):
+    """One backtest configuration: the LP range and the bot parameters."""
+
+    tick_lower: int
+    tick_upper: int
+    liquidity: int
+    alert_ticks: int = 100
+    hedge_size: Optional[float] = None  # override the recorded hedge
+    pool: int = 0  # pool index in the recorded samples
+    symbol: str = "ETH"
+
+
+class ReplayUniswap:
+    """Serve the current sample where :class:`BotLogic` expects a UniswapClient."""
+
+    def __init__(self, positions: Dict[int, Tuple[int, int, int]]) -> None:
+        self.positions = positions
+        self.states: Dict[str, Dict[str, Any]] = {}
+
+    def get_pool_states(self, pool_addresses: Iterable[str]) -> Dict[str, CallResult]:
+        return {p: CallResult(True, self.states[p]) for p in pool_addresses if p in self.states}
+
+    def get_positions(self, token_ids: Iterable[int]) -> Dict[int, CallResult]:
+        out = {}
+        for token_id in token_ids:
+            lower, upper, liquidity = self.positions[token_id]
+            out[token_id] = CallResult(True, (0, "", "", "", 0, lower, upper, liquidity, 0, 0, 0, 0))
+        return out
+
+    def get_position_events(self, token_ids: Iterable[int], from_block: int, to_block: int) -> Set[int]:
+        return set()
+
+
+class ReplayHyperliquid:
+    """Serve the current sample's hedge where a HyperliquidAPI is expected."""
+
+    def __init__(self) -> None:
+        self.positions: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def get_positions(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {s: self.positions.get(s) for s in symbols}
+
+
+class _Discard(io.TextIOBase):
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+class ReplayBot(BotLogic):
+    """:class:`BotLogic` that counts alerts instead of printing them."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.alerts: Counter = Counter()
+
+    def alert(self, message: str, key: Optional[str] = None) -> None:
+        self.alerts[message] += 1
+
+
+def history_from_swaps(swaps: Iterable[Dict[str, Any]], hedge: Optional[float] = None) -> np.ndarray:
+    """Convert :meth:`EventIndexer.swaps` rows into recorder samples.
+
+    Swaps carry no wall-clock time, so ``timestamp`` is the block number and
+    time-based metrics come out in blocks.
+    """
+
+    blocks: List[int] = []
+    ticks: List[int] = []
+    prices: List[float] = []
+    liquidity: List[float] = []
+    for s in swaps:  # a single pass, so a streaming cursor works too
+        blocks.append(s["blockNumber"])
+        ticks.append(s["tick"])
+        prices.append(s["sqrtPriceX96"] / Q96)
+        liquidity.append(float(s["liquidity"]))
+    history = np.zeros(len(blocks), dtype=RECORD_DTYPE)
+    history["timestamp"] = blocks
+    history["block"] = blocks
+    history["tick"] = ticks
+    history["sqrt_price"] = prices
+    history["liquidity"] = liquidity
+    history["hedge"] = math.nan if hedge is None else hedge
+    history["mark"] = math.nan
+    return history
+
+
+def _runs(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start index and length of each run of identical decision inputs."""
+
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    changed = np.zeros(len(rows), dtype=bool)
+    changed[0] = True
+    for field in ("tick", "sqrt_price", "liquidity", "hedge", "mark"):
+        col = rows[field]
+        same = col[1:] == col[:-1]
+        if col.dtype.kind == "f":
+            same |= np.isnan(col[1:]) & np.isnan(col[:-1])
+        changed[1:] |= ~same
+    starts = np.flatnonzero(changed)
+    return starts, np.diff(np.append(starts, len(rows)))
+
+
+def replay(history: np.ndarray, config: ReplayConfig) -> Dict[str, float]:
+    """Run ``config`` over ``history`` and return its metrics.
+
+    ``alerts`` counts alerts as the live loop would (one per sample near a
+    bound), ``time_out_of_range`` sums the time until the next sample for
+    samples outside ``[tick_lower, tick_upper)`` and the drift figures are
+    the hedge drift :class:`BotLogic` reports, weighted by sample count.
+    """
+
+    rows = history[history["pool"] == config.pool]
+    if config.hedge_size is not None:
+        rows = rows.copy()
+        rows["hedge"] = config.hedge_size
+    dt = np.diff(rows["timestamp"], append=rows["timestamp"][-1:]) if len(rows) else np.empty(0)
+    out = (rows["tick"] < config.tick_lower) | (rows["tick"] >= config.tick_upper)
+    total = float(dt.sum())
+
+    uniswap = ReplayUniswap({1: (config.tick_lower, config.tick_upper, config.liquidity)})
+    hyper = ReplayHyperliquid()
+    portfolio = [PortfolioEntry(POOL_WETH_USDC_005, 1, config.symbol)]
+    bot = ReplayBot(uniswap, hyper, alert_ticks=config.alert_ticks, portfolio=portfolio)
+    alerts = 0
+    drift_sum = drift_max = 0.0
+    drift_last = math.nan
+    starts, lengths = _runs(rows)
+    with contextlib.redirect_stdout(_Discard()):
+        for start, length in zip(starts.tolist(), lengths.tolist()):
+            row = rows[start]
+            uniswap.states[POOL_WETH_USDC_005] = {
+                "sqrtPriceX96": int(float(row["sqrt_price"]) * Q96),
+                "tick": int(row["tick"]),
+                "liquidity": int(row["liquidity"]),
+                "blockNumber": int(row["block"]),
+            }
+            hedge = float(row["hedge"])
+            hyper.positions[config.symbol] = None if math.isnan(hedge) else {"coin": config.symbol, "szi": hedge}
+            before = sum(bot.alerts.values())
+            bot.check_and_alert()
+            alerts += (sum(bot.alerts.values()) - before) * length
+            drift_last = bot.hedge_drift.get(config.symbol, math.nan)
+            if not math.isnan(drift_last):
+                drift_sum += abs(drift_last) * length
+                drift_max = max(drift_max, abs(drift_last))
+    out_time = float(dt[out].sum())
+    return {
+        "samples": float(len(rows)),
+        "evaluations": float(len(starts)),
+        "alerts": float(alerts),
+        "time_out_of_range": out_time,
+        "out_of_range_ratio": out_time / total if total else 0.0,
+        "drift_mean_abs": drift_sum / len(rows) if len(rows) else 0.0,
+        "drift_max_abs": drift_max,
+        "drift_final": drift_last,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parameter sweeps
+# ---------------------------------------------------------------------------
+_HISTORY: Optional[np.ndarray] = None
+
+
+def _init_worker(history: np.ndarray) -> None:
+    global _HISTORY
+    _HISTORY = history
+
+
+def _replay_worker(config: ReplayConfig) -> Dict[str, float]:
+    return replay(_HISTORY, config)
+
+
+def grid(base: ReplayConfig, **params: Sequence[Any]) -> List[ReplayConfig]:
+    """Every combination of ``params`` applied on top of ``base``."""
+
+    names = list(params)
+    return [base._replace(**dict(zip(names, values))) for values in product(*params.values())]
+
+
+def sweep(
+    history: np.ndarray, configs: Sequence[ReplayConfig], workers: Optional[int] = None
+) -> List[Tuple[ReplayConfig, Dict[str, float]]]:
+    """Replay every config in a process pool; the history is shipped once per worker."""
+
+    history = np.array(history)  # plain array: memmaps do not pickle as views
+    if workers == 1:
+        return [(c, replay(history, c)) for c in configs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history,)) as pool:
+        chunksize = max(1, len(configs) // (4 * (workers or os.cpu_count() or 1)))
+        return list(zip(configs, pool.map(_replay_worker, configs, chunksize=chunksize)))
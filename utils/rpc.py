@@ -0,0 +1,288 @@
+"""Latency-aware pool of JSON-RPC endpoints used as a single web3 provider."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Deque, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from .metrics import RPC_FAILURES, RPC_SECONDS
+
+
+class RpcUnavailable(Exception):
+    """Raised when no RPC endpoint is reachable."""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class JsonRpcSession:
+    """JSON-RPC over a keep-alive HTTP session.
+
+    Does what web3's ``HTTPProvider`` does for the pool (POST, raise on HTTP
+    errors, return the decoded response) without importing web3.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._ids = itertools.count(1)
+
+    def make_request(self, method: Any, params: Any) -> Any:
+        payload = {"jsonrpc": "2.0", "method": str(method), "params": params, "id": next(self._ids)}
+        resp = self.session.post(
+            self.url,
+            data=json.dumps(payload, default=_json_default),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+class Endpoint:
+    """One RPC URL with a persistent HTTP session and rolling health stats."""
+
+    def __init__(self, url: str, timeout: float, window: int = 50) -> None:
+        self.url = url
+        # Metrics are labelled by host only: URL paths often carry API keys.
+        self.host = urlparse(url).hostname or url
+        self.provider = JsonRpcSession(url, timeout)
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.backoff = 0.0
+
+    @property
+    def up(self) -> bool:
+        return self.down_until == 0.0
+
+    def p50(self) -> float:
+        return _percentile(self.latencies, 0.5)
+
+    def p95(self) -> float:
+        return _percentile(self.latencies, 0.95)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def score(self) -> float:
+        """Lower is healthier: median latency inflated by the error rate."""
+
+        return self.p50() * (1.0 + 4.0 * self.error_rate())
+
+
+def _percentile(samples: Deque[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RpcPool:
+    """Route each JSON-RPC request to the healthiest configured endpoint.
+
+    Every endpoint keeps its own keep-alive session and rolling latency and
+    error-rate window. A request goes to the endpoint with the best
+    :meth:`Endpoint.score` and fails over to the next one on transport
+    errors. With ``hedge`` enabled, a duplicate request is sent to the
+    runner-up when the primary has not answered within its p95 latency, and
+    the first answer wins. With a ``limiter`` (see
+    :class:`utils.supervisor.RateLimiter`) every request first takes a token
+    from the bucket named after the endpoint's host. Endpoints that fail
+    ``max_failures`` times in a row are taken out of rotation and re-probed
+    in the background with exponential backoff. :class:`RpcUnavailable` is
+    raised only while every endpoint is down.
+
+    The pool implements web3's synchronous provider interface itself rather
+    than subclassing ``BaseProvider`` and endpoints speak JSON-RPC through
+    :class:`JsonRpcSession`, so the pool works without importing web3
+    (about a second of start-up time).
+    """
+
+    is_async = False
+    has_persistent_connection = False
+    global_ccip_read_enabled = True
+    ccip_read_max_redirects = 4
+    middlewares: Tuple[Any, ...] = ()
+
+    def __init__(
+        self,
+        urls: List[str],
+        timeout: float = 15,
+        hedge: Optional[bool] = None,
+        max_failures: int = 2,
+        max_backoff: float = 300.0,
+        min_hedge_samples: int = 5,
+    ) -> None:
+        if not urls:
+            raise RpcUnavailable("no RPC endpoints configured")
+        self.endpoints = [Endpoint(u, timeout) for u in urls]
+        self.hedge = os.getenv("RPC_HEDGE") == "1" if hedge is None else hedge
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.min_hedge_samples = min_hedge_samples
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(urls)), thread_name_prefix="rpc")
+        self._recovery: Optional[threading.Thread] = None
+        self.limiter: Any = None
+        self._request_func: Tuple[Optional[Sequence[Any]], Optional[Callable[..., Any]]] = (None, None)
+
+    # ------------------------------------------------------------------
+    def healthy(self) -> List[Endpoint]:
+        """Return endpoints in rotation, best score first."""
+
+        with self._lock:
+            live = [(ep.score(), i, ep) for i, ep in enumerate(self.endpoints) if ep.up]
+        return [ep for _, _, ep in sorted(live, key=lambda x: (x[0], x[1]))]
+
+    def probe_all(self) -> int:
+        """Probe every endpoint in parallel and return how many answered."""
+
+        futures = [self._executor.submit(self._probe, ep) for ep in self.endpoints]
+        return sum(1 for f in futures if f.result())
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return bool(self.healthy())
+
+    def request_func(self, w3: Any, outer_middlewares: Any) -> Callable[..., Any]:
+        """Same middleware chaining (and caching) as web3's ``BaseProvider``."""
+
+        middlewares = tuple(outer_middlewares) + tuple(self.middlewares)
+        if self._request_func[0] != middlewares:
+            from web3.middleware import combine_middlewares
+
+            func = combine_middlewares(middlewares=middlewares, w3=w3, provider_request_fn=self.make_request)
+            self._request_func = (middlewares, func)
+        return self._request_func[1]
+
+    # ------------------------------------------------------------------
+    def make_request(self, method: Any, params: Any) -> Any:
+        candidates = self.healthy()
+        if not candidates:
+            raise RpcUnavailable("no RPC endpoints reachable")
+        if self.hedge and len(candidates) > 1 and len(candidates[0].latencies) >= self.min_hedge_samples:
+            return self._hedged(candidates, method, params)
+        last_exc: Optional[Exception] = None
+        for ep in candidates:
+            try:
+                return self._call(ep, method, params)
+            except Exception as exc:
+                last_exc = exc
+        raise RpcUnavailable(f"all RPC endpoints failed: {last_exc}")
+
+    def _hedged(self, candidates: List[Endpoint], method: Any, params: Any) -> Any:
+        primary, backup = candidates[0], candidates[1]
+        futures = [self._executor.submit(self._call, primary, method, params)]
+        done, _ = wait(futures, timeout=primary.p95())
+        if not done or futures[0].exception() is not None:
+            futures.append(self._executor.submit(self._call, backup, method, params))
+        last_exc: Optional[BaseException] = None
+        for fut in as_completed(futures):
+            if fut.exception() is None:
+                return fut.result()
+            last_exc = fut.exception()
+        for ep in candidates[2:]:
+            try:
+                return self._call(ep, method, params)
+            except Exception as exc:
+                last_exc = exc
+        raise RpcUnavailable(f"all RPC endpoints failed: {last_exc}")
+
+    # ------------------------------------------------------------------
+    def _call(self, ep: Endpoint, method: Any, params: Any) -> Any:
+        if self.limiter is not None:
+            self.limiter.acquire(ep.host)
+        start = time.perf_counter()
+        try:
+            response = ep.provider.make_request(method, params)
+        except Exception:
+            RPC_FAILURES.labels(ep.host).inc()
+            self._record_failure(ep)
+            raise
+        elapsed = time.perf_counter() - start
+        RPC_SECONDS.labels(ep.host, str(method)).observe(elapsed)
+        self._record_success(ep, elapsed)
+        return response
+
+    def _probe(self, ep: Endpoint) -> bool:
+        start = time.perf_counter()
+        try:
+            ep.provider.make_request("eth_blockNumber", [])
+        except Exception:
+            self._mark_down(ep)
+            return False
+        self._record_success(ep, time.perf_counter() - start)
+        return True
+
+    def _record_success(self, ep: Endpoint, elapsed: float) -> None:
+        with self._lock:
+            ep.latencies.append(elapsed)
+            ep.outcomes.append(True)
+            ep.consecutive_failures = 0
+            if not ep.up:
+                print(f"[RPC] Endpoint recovered: {ep.url}")
+            ep.down_until = 0.0
+            ep.backoff = 0.0
+
+    def _record_failure(self, ep: Endpoint) -> None:
+        with self._lock:
+            ep.outcomes.append(False)
+            ep.consecutive_failures += 1
+            failing = ep.consecutive_failures >= self.max_failures
+        if failing:
+            self._mark_down(ep)
+
+    def _mark_down(self, ep: Endpoint) -> None:
+        with self._lock:
+            if ep.up:
+                print(f"[RPC] Endpoint down: {ep.url}")
+            ep.backoff = min(self.max_backoff, ep.backoff * 2 if ep.backoff else 1.0)
+            ep.down_until = time.monotonic() + ep.backoff
+        self._ensure_recovery()
+
+    # ------------------------------------------------------------------
+    def _ensure_recovery(self) -> None:
+        with self._lock:
+            if self._recovery is None:
+                self._recovery = threading.Thread(target=self._recover, name="rpc-recovery", daemon=True)
+                self._recovery.start()
+
+    def _recover(self) -> None:
+        while True:
+            with self._lock:
+                down = [ep for ep in self.endpoints if not ep.up]
+                if not down:
+                    self._recovery = None
+                    return
+            now = time.monotonic()
+            for ep in down:
+                if ep.down_until <= now:
+                    self._probe(ep)
+            time.sleep(0.5)
+
+
+def build_rpc_pool(urls: List[str], timeout: float = 15) -> RpcPool:
+    """Return an :class:`RpcPool` with at least one reachable endpoint."""
+
+    pool = RpcPool(urls, timeout=timeout)
+    reachable = pool.probe_all()
+    if not reachable:
+        raise RpcUnavailable("no RPC endpoints reachable")
+    print(f"[RPC] {reachable}/{len(urls)} endpoints reachable")
+    return pool
@@ -0,0 +1,145 @@
+"""WebSocket push mode: follow a pool through its Swap logs and new heads."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import websocket
+
+from .uniswap import POOL_WETH_USDC_005
+
+# keccak("Swap(address,address,int256,int256,uint160,uint128,int24)")
+SWAP_TOPIC = "0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67"
+
+
+def _signed(word: int, bits: int) -> int:
+    return word - (1 << bits) if word >= 1 << (bits - 1) else word
+
+
+def decode_swap_log(log: Dict[str, Any]) -> Dict[str, int]:
+    """Return pool state carried by a Uniswap v3 ``Swap`` log.
+
+    The non-indexed data is ``amount0, amount1, sqrtPriceX96, liquidity,
+    tick``, each padded to 32 bytes, so no extra call is needed to know the
+    post-swap price.
+    """
+
+    data = bytes.fromhex(log["data"][2:])
+    words = [int.from_bytes(data[i : i + 32], "big") for i in range(0, 160, 32)]
+    return {
+        "pool": log.get("address"),
+        "sqrtPriceX96": words[2],
+        "liquidity": words[3],
+        "tick": _signed(words[4], 256),
+        "blockNumber": int(log["blockNumber"], 16),
+    }
+
+
+class PoolStream:
+    """Subscribe to ``newHeads`` and the ``Swap`` logs of one or more pools.
+
+    ``on_state`` receives the decoded swap state for each log, ``on_head``
+    the block number of each new head and ``on_connect`` is called once the
+    subscriptions are sent. :meth:`start` runs the subscription in a daemon
+    thread that reconnects with exponential backoff; while the socket is down
+    :attr:`connected` is ``False`` so callers can fall back to polling.
+    Errors raised by the callbacks are logged and do not drop the socket.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        on_state: Callable[[Dict[str, int]], None],
+        pool_address: Union[str, List[str]] = POOL_WETH_USDC_005,
+        on_head: Optional[Callable[[int], None]] = None,
+        timeout: float = 30,
+        on_connect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.ws_url = ws_url
+        self.pool_address = pool_address
+        self.on_state = on_state
+        self.on_head = on_head
+        self.on_connect = on_connect
+        self.timeout = timeout
+        self.connected = False
+        self.last_message = 0.0
+        self._subscriptions: Dict[str, str] = {}
+        self._pending: Dict[int, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Run the subscription loop in a background thread."""
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="pool-stream", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                self.run_once()
+                backoff = 1.0
+            except Exception as exc:
+                print(f"[STREAM] WebSocket error: {exc}; falling back to polling")
+            self.connected = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def run_once(self) -> None:
+        """Connect, subscribe and dispatch messages until the socket drops."""
+
+        ws = websocket.create_connection(self.ws_url, timeout=self.timeout)
+        try:
+            for request_id, (kind, params) in enumerate(self._subscribe_params(), start=1):
+                self._pending[request_id] = kind
+                ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "eth_subscribe", "params": params}))
+            self.connected = True
+            print(f"[STREAM] Subscribed to {self.pool_address} via {self.ws_url}")
+            if self.on_connect is not None:
+                try:
+                    self.on_connect()
+                except Exception as exc:
+                    print(f"[STREAM] on_connect failed: {exc}")
+            while True:
+                self.handle_message(ws.recv())
+        finally:
+            self.connected = False
+            self._subscriptions.clear()
+            ws.close()
+
+    def _subscribe_params(self):
+        yield "logs", ["logs", {"address": self.pool_address, "topics": [SWAP_TOPIC]}]
+        if self.on_head is not None:
+            yield "newHeads", ["newHeads"]
+
+    # ------------------------------------------------------------------
+    def handle_message(self, raw: str) -> None:
+        """Dispatch one JSON-RPC message received on the socket."""
+
+        if not raw:
+            raise ConnectionError("connection closed")
+        self.last_message = time.monotonic()
+        msg = json.loads(raw)
+        if "id" in msg:
+            kind = self._pending.pop(msg["id"], None)
+            if "error" in msg:
+                raise ConnectionError(f"subscription failed: {msg['error']}")
+            if kind is not None:
+                self._subscriptions[msg["result"]] = kind
+            return
+        params = msg.get("params") or {}
+        kind = self._subscriptions.get(params.get("subscription"))
+        result = params.get("result")
+        # Only socket errors should reconnect (and lose swaps during the backoff).
+        try:
+            if kind == "logs" and not result.get("removed"):
+                self.on_state(decode_swap_log(result))
+            elif kind == "newHeads" and self.on_head is not None:
+                self.on_head(int(result["number"], 16))
+        except Exception as exc:
+            print(f"[STREAM] Failed to handle {kind} message: {exc}")
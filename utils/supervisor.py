@@ -0,0 +1,516 @@
+"""Supervisor mode: many wallets sharded across worker processes.
+
+The supervisor reads the state of every monitored pool once per cycle (one
+multicall for all of them) and hands it to the workers, so pool state is
+never read per wallet. Each worker runs one :class:`BotLogic` per wallet of
+its shard, sharing a single Hyperliquid ``Info`` client and RPC pool, and
+batches the ``positions(tokenId)`` reads of its whole shard (in incremental
+mode, position events are also scanned once per shard and only the touched
+tokens re-read). All processes
+draw from the same :class:`RateLimiter`, a set of token buckets in shared
+memory (one per RPC host and one for Hyperliquid), so the combined request
+rate stays within each provider's quota however many workers run.
+
+Alerts are forwarded to the supervisor, which owns the only
+:class:`AlertDispatcher`. After every cycle a worker checkpoints the cached
+state of its bots (:meth:`BotLogic.export_state`); when a worker dies or
+stops answering it is restarted with that checkpoint, so bounds, liquidity
+and incremental caches survive the restart.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+from urllib.parse import urlparse
+
+from .hyperliquid import HyperliquidAPI, _make_info
+from .logic import BotLogic, IncrementalBotLogic, PortfolioEntry, parse_portfolio
+from .metrics import LAST_CYCLE, SHARD_SECONDS, WORKER_RESTARTS, set_degraded
+from .uniswap import CallResult, RpcUnavailable, UniswapClient, _rpc_urls
+
+
+class Account(NamedTuple):
+    """One Hyperliquid wallet and the LP positions it hedges."""
+
+    wallet: str
+    portfolio: List[PortfolioEntry]
+
+
+def parse_accounts(text: str) -> List[Account]:
+    """Parse ``wallet=pool:tokenId:symbol,...`` lines (``#`` starts a comment)."""
+
+    accounts = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        wallet, _, spec = line.partition("=")
+        accounts.append(Account(wallet.strip(), parse_portfolio(spec)))
+    return accounts
+
+
+def shard_accounts(accounts: Iterable[Account], shards: int) -> List[List[Account]]:
+    """Split ``accounts`` into ``shards`` groups holding similar numbers of positions."""
+
+    groups: List[List[Account]] = [[] for _ in range(max(1, shards))]
+    loads = [0] * len(groups)
+    for account in sorted(accounts, key=lambda a: (-len(a.portfolio), a.wallet)):
+        i = loads.index(min(loads))
+        groups[i].append(account)
+        loads[i] += max(1, len(account.portfolio))
+    return [g for g in groups if g]
+
+
+# ---------------------------------------------------------------------------
+# Shared rate limiting
+# ---------------------------------------------------------------------------
+class SharedTokenBucket:
+    """Token bucket kept in shared memory, usable from any process.
+
+    ``time.monotonic`` is system-wide on Linux, so the refill arithmetic is
+    valid across processes. The lock is only held around that arithmetic and
+    taken with a timeout: a worker killed while holding it would otherwise
+    stall every other process, so after ``lock_timeout`` the request goes
+    through unthrottled instead.
+    """
+
+    lock_timeout = 1.0
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, ctx: Any = None) -> None:
+        ctx = ctx or mp.get_context("spawn")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._state = ctx.Array("d", [self.capacity, time.monotonic()])  # tokens, updated
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``, sleeping until they are available; return seconds waited."""
+
+        waited = 0.0
+        lock = self._state.get_lock()
+        while True:
+            if not lock.acquire(timeout=self.lock_timeout):
+                print("[SUPERVISOR] Rate limiter lock unavailable (held by a dead worker?); not throttling")
+                return waited
+            try:
+                now = time.monotonic()
+                available = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+                if available >= tokens:
+                    self._state[0], self._state[1] = available - tokens, now
+                    return waited
+                self._state[0], self._state[1] = available, now
+                delay = (tokens - available) / self.rate
+            finally:
+                lock.release()
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """Named :class:`SharedTokenBucket` instances; unknown names are not limited."""
+
+    def __init__(self, rates: Dict[str, float], burst: float = 1.0, ctx: Any = None) -> None:
+        self.buckets = {name: SharedTokenBucket(rate, max(1.0, rate * burst), ctx) for name, rate in rates.items()}
+        self.waited: Counter = Counter()
+
+    @classmethod
+    def for_endpoints(
+        cls, rpc_url: Optional[str], fallbacks: Optional[str], rpc_rate: float, hyperliquid_rate: float
+    ) -> "RateLimiter":
+        """One bucket per RPC host at ``rpc_rate`` plus a ``hyperliquid`` bucket."""
+
+        rates = {urlparse(u).hostname or u: rpc_rate for u in _rpc_urls(rpc_url, fallbacks)}
+        rates["hyperliquid"] = hyperliquid_rate
+        return cls(rates)
+
+    def acquire(self, name: str) -> None:
+        bucket = self.buckets.get(name)
+        if bucket is not None:
+            self.waited[name] += bucket.acquire()
+
+
+class RateLimitedInfo:
+    """Hyperliquid ``Info`` proxy taking a limiter token before each request."""
+
+    _UNLIMITED = {"subscribe", "unsubscribe"}
+
+    def __init__(self, info: Any, limiter: RateLimiter, name: str = "hyperliquid") -> None:
+        self._info = info
+        self._limiter = limiter
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._info, attr)
+        if not callable(value) or attr in self._UNLIMITED:
+            return value
+
+        def limited(*args: Any, **kwargs: Any) -> Any:
+            self._limiter.acquire(self._name)
+            return value(*args, **kwargs)
+
+        return limited
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+class WorkerConfig(NamedTuple):
+    """Settings every worker is started with."""
+
+    rpc_url: Optional[str] = None
+    fallbacks: str = ""
+    incremental: bool = False
+    alert_ticks: int = 100
+    info_factory: Optional[Callable[[], Any]] = None  # defaults to hyperliquid.info.Info
+
+
+class SharedPoolReads:
+    """``UniswapClient`` facade serving the reads shared by a whole shard.
+
+    Pool states come from the supervisor's per-cycle read and positions from
+    one batch for every token of the shard; anything else goes to the real
+    client.
+    """
+
+    def __init__(self, client: UniswapClient) -> None:
+        self.client = client
+        self.states: Optional[Dict[str, CallResult]] = None
+        self.positions: Dict[int, CallResult] = {}
+
+    def get_pool_states(self, pool_addresses: Iterable[str]) -> Dict[str, CallResult]:
+        if self.states is None:
+            raise RpcUnavailable("supervisor could not read pool states")
+        missing = CallResult(False, error="not in the shared pool read")
+        return {p: self.states.get(p, missing) for p in pool_addresses}
+
+    def get_positions(self, token_ids: Iterable[int]) -> Dict[int, CallResult]:
+        ids = list(token_ids)
+        if all(t in self.positions for t in ids):
+            return {t: self.positions[t] for t in ids}
+        return self.client.get_positions(ids)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class QueueDispatcher:
+    """:class:`AlertDispatcher` stand-in forwarding alerts to the supervisor.
+
+    Keys already reported active are not sent again, so the queue only
+    carries changes; the supervisor's dispatcher applies the real dedup and
+    hysteresis.
+    """
+
+    def __init__(self, results: Any, wallet: str, active: Optional[Set[str]] = None) -> None:
+        self.results = results
+        self.wallet = wallet
+        self.active: Set[str] = set(active or ())
+
+    def notify(self, key: str, message: str) -> bool:
+        if key in self.active:
+            return False
+        self.active.add(key)
+        self.results.put(("alert", f"{self.wallet}:{key}", f"{self.wallet}: {message}"))
+        return True
+
+    def resolve(self, key: str, message: Optional[str] = None) -> None:
+        if key in self.active:
+            self.active.discard(key)
+            self.results.put(("resolve", f"{self.wallet}:{key}", message))
+
+
+def _connect(config: WorkerConfig) -> Optional[UniswapClient]:
+    try:
+        return UniswapClient(rpc_url=config.rpc_url, fallbacks=config.fallbacks)
+    except RpcUnavailable:
+        return None
+
+
+def _shard_scan(client: UniswapClient, bots: List[Any], token_ids: List[int], block: int) -> List[int]:
+    """Scan position events once for the whole shard; return the tokens to re-read.
+
+    Touched tokens are handed to each :class:`IncrementalBotLogic` through
+    :meth:`~IncrementalBotLogic.invalidate_position`, and every bot is told
+    the scan is done so it does not repeat it.
+    """
+
+    scanned = [b.events_block for b in bots if b.events_block is not None]
+    touched: Iterable[int] = ()
+    if scanned and block > min(scanned):
+        try:
+            touched = client.get_position_events(token_ids, min(scanned) + 1, block)
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            print(f"[SUPERVISOR] Failed to scan position events: {exc}; re-reading bounds")
+            touched = token_ids
+    stale: List[int] = []
+    for bot in bots:
+        for token_id in set(touched) & set(bot.token_ids):
+            bot.invalidate_position(token_id)
+        bot.mark_events_scanned(block)
+        stale.extend(bot.stale_token_ids())
+    return list(dict.fromkeys(stale))
+
+
+def _worker_main(
+    shard: int,
+    accounts: List[Account],
+    config: WorkerConfig,
+    limiter: RateLimiter,
+    commands: Any,
+    results: Any,
+    checkpoint: Dict[str, Dict[str, Any]],
+) -> None:
+    """Run the bots of one shard, one cycle per command from the supervisor."""
+
+    try:
+        info = RateLimitedInfo(config.info_factory() if config.info_factory else _make_info(), limiter)
+    except Exception as exc:
+        print(f"[SUPERVISOR] Shard {shard}: Hyperliquid client unavailable: {exc}")
+        info = None
+    client = _connect(config)
+    shared = SharedPoolReads(client) if client else None
+    if client:
+        client.provider.limiter = limiter
+    bot_cls = IncrementalBotLogic if config.incremental else BotLogic
+    bots: Dict[str, BotLogic] = {}
+    for account in accounts:
+        saved = checkpoint.get(account.wallet, {})
+        bot = bot_cls(
+            shared,
+            HyperliquidAPI(account.wallet, info=info),
+            alert_ticks=config.alert_ticks,
+            portfolio=account.portfolio,
+            dispatcher=QueueDispatcher(results, account.wallet, saved.get("alerts")),
+        )
+        bot.restore_state(saved)
+        bots[account.wallet] = bot
+    token_ids = list(dict.fromkeys(e.token_id for a in accounts for e in a.portfolio if e.token_id is not None))
+    results.put(("ready", shard, None))
+
+    while True:
+        command = commands.get()
+        if command is None:
+            return
+        cycle, states = command
+        start = time.perf_counter()
+        if shared is None and (client := _connect(config)) is not None:
+            client.provider.limiter = limiter
+            shared = SharedPoolReads(client)
+            for bot in bots.values():
+                bot.uniswap = shared
+        degraded = shared is None
+        if shared is not None:
+            shared.states = states
+            shared.positions = {}
+            if states and token_ids:
+                try:
+                    stale = token_ids
+                    if config.incremental:
+                        block = max((r.value.get("blockNumber") or 0 for r in states.values() if r.success), default=0)
+                        stale = _shard_scan(shared.client, list(bots.values()), token_ids, block) if block else []
+                    if stale:
+                        shared.positions = shared.client.get_positions(stale)
+                except RpcUnavailable:
+                    degraded = True
+                except Exception as exc:
+                    print(f"[SUPERVISOR] Shard {shard}: batched positions read failed: {exc}")
+        for bot in bots.values():
+            try:
+                bot.check_and_alert()
+            except RpcUnavailable:
+                degraded = True
+            except Exception as exc:  # one bad wallet must not stall the shard
+                print(f"[SUPERVISOR] Shard {shard}: cycle failed for {bot.hyperliquid.wallet_address}: {exc}")
+        saved = {w: {**b.export_state(), "alerts": set(b.dispatcher.active)} for w, b in bots.items()}
+        results.put(("done", shard, (cycle, time.perf_counter() - start, degraded, saved)))
+
+
+# ---------------------------------------------------------------------------
+# Supervisor side
+# ---------------------------------------------------------------------------
+class _Worker:
+    def __init__(self, process: Any, commands: Any, results: Any) -> None:
+        self.process = process
+        self.commands = commands
+        # One results queue per worker: a worker killed halfway through a
+        # ``put`` can only corrupt its own queue, which is dropped on restart.
+        self.results = results
+        self.busy_since: Optional[float] = None
+
+
+class Supervisor:
+    """Start, feed and restart the worker processes of a sharded portfolio."""
+
+    def __init__(
+        self,
+        accounts: List[Account],
+        workers: int,
+        config: WorkerConfig = WorkerConfig(),
+        limiter: Optional[RateLimiter] = None,
+        uniswap: Optional[UniswapClient] = None,
+        dispatcher: Any = None,
+        hang_timeout: float = 300.0,
+        ctx: Any = None,
+    ) -> None:
+        self.ctx = ctx or mp.get_context("spawn")
+        self.shards = shard_accounts(accounts, workers)
+        self.config = config
+        self.limiter = limiter or RateLimiter({})
+        self.uniswap = uniswap
+        self.dispatcher = dispatcher
+        self.hang_timeout = hang_timeout
+        self.pools = list(dict.fromkeys(e.pool for a in accounts for e in a.portfolio))
+        self.checkpoints: List[Dict[str, Dict[str, Any]]] = [{} for _ in self.shards]
+        self.restarts: Counter = Counter()
+        self.cycle = 0
+        self.workers: List[Optional[_Worker]] = [None] * len(self.shards)
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        for shard in range(len(self.shards)):
+            self._spawn(shard)
+        print(f"[SUPERVISOR] {sum(map(len, self.shards))} wallets in {len(self.shards)} workers")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for worker in self.workers:
+            if worker is not None and worker.process.is_alive():
+                worker.commands.put(None)
+        for worker in self.workers:
+            if worker is not None:
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+
+    def _spawn(self, shard: int) -> None:
+        commands, results = self.ctx.Queue(), self.ctx.Queue()
+        process = self.ctx.Process(
+            target=_worker_main,
+            args=(shard, self.shards[shard], self.config, self.limiter, commands, results, self.checkpoints[shard]),
+            name=f"shard-{shard}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[shard] = _Worker(process, commands, results)
+
+    def _restart(self, shard: int, reason: str, grace: float = 2.0) -> None:
+        worker = self.workers[shard]
+        if worker is not None:
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(grace)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            for q in (worker.commands, worker.results):
+                q.close()
+                q.cancel_join_thread()
+        print(f"[SUPERVISOR] Restarting worker {shard}: {reason}")
+        self.restarts[shard] += 1
+        WORKER_RESTARTS.labels(str(shard)).inc()
+        self._spawn(shard)
+
+    def check_workers(self) -> None:
+        """Restart workers that exited or have been stuck on a cycle too long."""
+
+        now = time.monotonic()
+        for shard, worker in enumerate(self.workers):
+            if worker is None or not worker.process.is_alive():
+                code = worker.process.exitcode if worker else None
+                self._restart(shard, f"exited with code {code}")
+            elif worker.busy_since is not None and now - worker.busy_since > self.hang_timeout:
+                self._restart(shard, f"no answer for {now - worker.busy_since:.0f}s")
+
+    # ------------------------------------------------------------------
+    def read_pool_states(self) -> Optional[Dict[str, CallResult]]:
+        """Read every monitored pool once for all workers; ``None`` while degraded."""
+
+        if self.uniswap is None:
+            try:
+                self.uniswap = UniswapClient(rpc_url=self.config.rpc_url, fallbacks=self.config.fallbacks)
+                self.uniswap.provider.limiter = self.limiter
+                self.uniswap.prepare(self.pools)
+            except RpcUnavailable:
+                return None
+        try:
+            return self.uniswap.get_pool_states(self.pools)
+        except RpcUnavailable:
+            return None
+        except Exception as exc:
+            print(f"[SUPERVISOR] Failed to read pool states: {exc}")
+            return {}
+
+    def run_cycle(self, timeout: float) -> Set[int]:
+        """Run one cycle on every idle shard; return the shards that finished in time.
+
+        A worker still busy with an earlier cycle gets no new command, so it
+        never works through a backlog of stale states, and its busy time
+        keeps growing until :meth:`check_workers` restarts it.
+        """
+
+        self.check_workers()
+        self.cycle += 1
+        states = self.read_pool_states()
+        sent = 0
+        for worker in self.workers:
+            if worker.busy_since is None:
+                worker.commands.put((self.cycle, states))
+                worker.busy_since = time.monotonic()
+                sent += 1
+        done: Set[int] = set()
+        degraded = states is None
+        deadline = time.monotonic() + timeout
+        while len(done) < sent and time.monotonic() < deadline:
+            messages = self._poll()
+            if not messages:
+                if any(not w.process.is_alive() for w in self.workers):
+                    break
+                time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+                continue
+            for kind, shard_or_key, payload in messages:
+                if kind == "alert" and self.dispatcher is not None:
+                    self.dispatcher.notify(shard_or_key, payload)
+                elif kind == "resolve" and self.dispatcher is not None:
+                    self.dispatcher.resolve(shard_or_key, payload)
+                elif kind == "done":
+                    cycle, elapsed, shard_degraded, saved = payload
+                    self.checkpoints[shard_or_key].update(saved)
+                    self.workers[shard_or_key].busy_since = None
+                    SHARD_SECONDS.labels(str(shard_or_key)).observe(elapsed)
+                    if cycle == self.cycle:
+                        done.add(shard_or_key)
+                        degraded |= shard_degraded
+        set_degraded(degraded)
+        LAST_CYCLE.set(time.time())
+        return done
+
+    def _poll(self) -> List[Any]:
+        """Drain every worker's results queue without blocking."""
+
+        messages = []
+        for worker in self.workers:
+            while True:
+                try:
+                    messages.append(worker.results.get_nowait())
+                except queue.Empty:
+                    break
+        return messages
+
+    def run(self, period: float) -> None:
+        """Start the workers and run cycles every ``period`` seconds."""
+
+        self.start()
+        try:
+            while True:
+                start = time.monotonic()
+                done = self.run_cycle(timeout=period)
+                if len(done) < len(self.workers):
+                    late = sorted(set(range(len(self.workers))) - done)
+                    print(f"[SUPERVISOR] Shards {late} did not finish within {period:g}s")
+                time.sleep(max(0.0, period - (time.monotonic() - start)))
+        finally:
+            self.stop()
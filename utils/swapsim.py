@@ -0,0 +1,390 @@
+"""Offline Uniswap v3 swap simulation using the pool's own integer math.
+
+:class:`PoolSnapshot` holds slot0, active liquidity, the tick bitmap words
+around the current price and the ``liquidityNet`` of each initialized tick
+in them. Quotes walk the same ``computeSwapStep`` loop as
+``UniswapV3Pool.swap`` (including word-boundary steps), so amounts and the
+final sqrt price match an on-chain QuoterV2 call for the snapshot block.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .tickmath import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+from .uniswap import UNISWAP_V3_POOL_ABI, UniswapClient, _checksum, _unwrap
+
+Q96 = 1 << 96
+MAX_UINT160 = (1 << 160) - 1
+MAX_UINT256 = (1 << 256) - 1
+FEE_DENOMINATOR = 1_000_000
+
+
+class SnapshotRangeError(Exception):
+    """Raised when a swap walks past the tick bitmap words in the snapshot."""
+
+
+# ---------------------------------------------------------------------------
+# FullMath / SqrtPriceMath / SwapMath
+# ---------------------------------------------------------------------------
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+def _next_sqrt_price_from_amount0(sqrt_p: int, liquidity: int, amount: int, add: bool) -> int:
+    if amount == 0:
+        return sqrt_p
+    numerator1 = liquidity << 96
+    product = amount * sqrt_p
+    if add:
+        if product <= MAX_UINT256 and numerator1 + product <= MAX_UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_p, numerator1 + product)
+        return div_rounding_up(numerator1, numerator1 // sqrt_p + amount)
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("insufficient liquidity for output amount")
+    return mul_div_rounding_up(numerator1, sqrt_p, numerator1 - product)
+
+
+def _next_sqrt_price_from_amount1(sqrt_p: int, liquidity: int, amount: int, add: bool) -> int:
+    if add:
+        result = sqrt_p + (amount << 96) // liquidity
+        if result > MAX_UINT160:
+            raise ValueError("sqrt price overflow")
+        return result
+    quotient = div_rounding_up(amount << 96, liquidity)
+    if sqrt_p <= quotient:
+        raise ValueError("insufficient liquidity for output amount")
+    return sqrt_p - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_p: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount0(sqrt_p, liquidity, amount_in, True)
+    return _next_sqrt_price_from_amount1(sqrt_p, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(sqrt_p: int, liquidity: int, amount_out: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount1(sqrt_p, liquidity, amount_out, False)
+    return _next_sqrt_price_from_amount0(sqrt_p, liquidity, amount_out, False)
+
+
+def compute_swap_step(
+    sqrt_current: int, sqrt_target: int, liquidity: int, amount_remaining: int, fee: int
+) -> Tuple[int, int, int, int]:
+    """Port of ``SwapMath.computeSwapStep``; returns (sqrtNext, in, out, fee)."""
+
+    zero_for_one = sqrt_current >= sqrt_target
+    exact_in = amount_remaining >= 0
+    amount_in = amount_out = 0
+    if exact_in:
+        remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee, FEE_DENOMINATOR)
+        amount_in = (
+            get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+            if zero_for_one
+            else get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+        )
+        if remaining_less_fee >= amount_in:
+            sqrt_next = sqrt_target
+        else:
+            sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, remaining_less_fee, zero_for_one)
+    else:
+        amount_out = (
+            get_amount1_delta(sqrt_target, sqrt_current, liquidity, False)
+            if zero_for_one
+            else get_amount0_delta(sqrt_current, sqrt_target, liquidity, False)
+        )
+        if -amount_remaining >= amount_out:
+            sqrt_next = sqrt_target
+        else:
+            sqrt_next = get_next_sqrt_price_from_output(sqrt_current, liquidity, -amount_remaining, zero_for_one)
+
+    reached = sqrt_target == sqrt_next
+    if zero_for_one:
+        if not (reached and exact_in):
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        if not (reached and not exact_in):
+            amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not (reached and exact_in):
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        if not (reached and not exact_in):
+            amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+    if exact_in and sqrt_next != sqrt_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee, FEE_DENOMINATOR - fee)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+# ---------------------------------------------------------------------------
+# Pool snapshot
+# ---------------------------------------------------------------------------
+def _msb(x: int) -> int:
+    return x.bit_length() - 1
+
+
+def _lsb(x: int) -> int:
+    return (x & -x).bit_length() - 1
+
+
+class PoolSnapshot:
+    """Local copy of the pool state needed to simulate swaps."""
+
+    def __init__(
+        self,
+        sqrt_price_x96: int,
+        tick: int,
+        liquidity: int,
+        fee: int,
+        tick_spacing: int,
+        bitmap: Dict[int, int],
+        liquidity_net: Dict[int, int],
+        pool_address: Optional[str] = None,
+    ) -> None:
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        self.fee = fee
+        self.tick_spacing = tick_spacing
+        self.bitmap = bitmap
+        self.liquidity_net = liquidity_net
+        self.pool_address = pool_address
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def load(cls, client: UniswapClient, pool_address: str, words: int = 4) -> "PoolSnapshot":
+        """Read a snapshot covering ``words`` bitmap words on each side of the price."""
+
+        addr = _checksum(pool_address)
+        pool = client.contract(addr, UNISWAP_V3_POOL_ABI)
+        batch = client.multicall()
+        for name in ("slot0", "liquidity", "fee", "tickSpacing"):
+            batch.add(getattr(pool.functions, name)())
+        slot0, liquidity, fee, spacing = [
+            _unwrap(r, "pool state") for r in batch.execute()
+        ]
+        snap = cls(slot0[0], slot0[1], liquidity, fee, spacing, {}, {}, addr)
+        center = (slot0[1] // spacing) >> 8
+        snap._load_words(client, range(max(center - words, -(1 << 15)), min(center + words, (1 << 15) - 1) + 1))
+        return snap
+
+    def refresh(self, client: UniswapClient) -> None:
+        """Update the snapshot in place, normally in a single round trip.
+
+        slot0, liquidity, every bitmap word already covered and the
+        ``liquidityNet`` of every known tick are re-read in one batch; only
+        ticks that became initialized since the last read need a second one.
+        """
+
+        pool = client.contract(self.pool_address, UNISWAP_V3_POOL_ABI)
+        words = sorted(self.bitmap)
+        known = sorted(self.liquidity_net)
+        batch = client.multicall()
+        batch.add(pool.functions.slot0())
+        batch.add(pool.functions.liquidity())
+        for w in words:
+            batch.add(pool.functions.tickBitmap(w))
+        for t in known:
+            batch.add(pool.functions.ticks(t))
+        results = [_unwrap(r, "pool refresh") for r in batch.execute()]
+        slot0, self.liquidity = results[0], results[1]
+        self.sqrt_price_x96, self.tick = slot0[0], slot0[1]
+        self.bitmap = dict(zip(words, results[2 : 2 + len(words)]))
+        self.liquidity_net = {t: r[1] for t, r in zip(known, results[2 + len(words) :])}
+        initialized = set(self._initialized_ticks(words))
+        for t in set(self.liquidity_net) - initialized:
+            del self.liquidity_net[t]
+        self._load_ticks(client, sorted(initialized - set(self.liquidity_net)))
+
+    def _load_words(self, client: UniswapClient, words: Iterable[int]) -> None:
+        pool = client.contract(self.pool_address, UNISWAP_V3_POOL_ABI)
+        words = list(words)
+        batch = client.multicall()
+        for w in words:
+            batch.add(pool.functions.tickBitmap(w))
+        for w, r in zip(words, batch.execute()):
+            self.bitmap[w] = _unwrap(r, f"tickBitmap({w})")
+        self._load_ticks(client, self._initialized_ticks(words))
+
+    def _load_ticks(self, client: UniswapClient, ticks: List[int]) -> None:
+        if not ticks:
+            return
+        pool = client.contract(self.pool_address, UNISWAP_V3_POOL_ABI)
+        batch = client.multicall()
+        for t in ticks:
+            batch.add(pool.functions.ticks(t))
+        for t, r in zip(ticks, batch.execute()):
+            self.liquidity_net[t] = _unwrap(r, f"ticks({t})")[1]
+
+    def _initialized_ticks(self, words: Iterable[int]) -> List[int]:
+        out = []
+        for w in words:
+            word = self.bitmap.get(w, 0)
+            while word:
+                bit = _lsb(word)
+                out.append(((w << 8) + bit) * self.tick_spacing)
+                word &= word - 1
+        return out
+
+    # ------------------------------------------------------------------
+    def next_initialized_tick(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        """Port of ``TickBitmap.nextInitializedTickWithinOneWord``."""
+
+        compressed = tick // self.tick_spacing
+        if not lte:
+            compressed += 1
+        word_pos, bit_pos = compressed >> 8, compressed & 0xFF
+        if word_pos not in self.bitmap:
+            raise SnapshotRangeError(f"tick bitmap word {word_pos} not in snapshot")
+        word = self.bitmap[word_pos]
+        if lte:
+            masked = word & ((1 << bit_pos) - 1 + (1 << bit_pos))
+            if masked:
+                return (compressed - (bit_pos - _msb(masked))) * self.tick_spacing, True
+            return (compressed - bit_pos) * self.tick_spacing, False
+        masked = word & (MAX_UINT256 ^ ((1 << bit_pos) - 1))
+        if masked:
+            return (compressed + (_lsb(masked) - bit_pos)) * self.tick_spacing, True
+        return (compressed + (255 - bit_pos)) * self.tick_spacing, False
+
+    # ------------------------------------------------------------------
+    def swap(
+        self,
+        zero_for_one: bool,
+        amount_specified: int,
+        sqrt_price_limit_x96: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Simulate ``UniswapV3Pool.swap`` without mutating the snapshot.
+
+        A positive ``amount_specified`` is an exact input, a negative one an
+        exact output, as in the pool contract. ``initializedTicksCrossed``
+        counts initialized ticks whose liquidity was applied.
+        """
+
+        if amount_specified == 0:
+            raise ValueError("amount_specified must be non-zero")
+        if sqrt_price_limit_x96 is None:
+            sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        if zero_for_one:
+            if not MIN_SQRT_RATIO < sqrt_price_limit_x96 < self.sqrt_price_x96:
+                raise ValueError("invalid sqrt price limit")
+        elif not self.sqrt_price_x96 < sqrt_price_limit_x96 < MAX_SQRT_RATIO:
+            raise ValueError("invalid sqrt price limit")
+
+        exact_input = amount_specified > 0
+        remaining, calculated = amount_specified, 0
+        sqrt_price, tick, liquidity = self.sqrt_price_x96, self.tick, self.liquidity
+        crossed = 0
+        while remaining != 0 and sqrt_price != sqrt_price_limit_x96:
+            start = sqrt_price
+            tick_next, initialized = self.next_initialized_tick(tick, zero_for_one)
+            tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+            if (sqrt_next < sqrt_price_limit_x96) if zero_for_one else (sqrt_next > sqrt_price_limit_x96):
+                target = sqrt_price_limit_x96
+            else:
+                target = sqrt_next
+            sqrt_price, amount_in, amount_out, fee_amount = compute_swap_step(
+                sqrt_price, target, liquidity, remaining, self.fee
+            )
+            if exact_input:
+                remaining -= amount_in + fee_amount
+                calculated -= amount_out
+            else:
+                remaining += amount_out
+                calculated += amount_in + fee_amount
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    net = self.liquidity_net.get(tick_next, 0)
+                    liquidity += -net if zero_for_one else net
+                    crossed += 1
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        if zero_for_one == exact_input:
+            amount0, amount1 = amount_specified - remaining, calculated
+        else:
+            amount0, amount1 = calculated, amount_specified - remaining
+        return {
+            "amount0": amount0,
+            "amount1": amount1,
+            "sqrtPriceX96After": sqrt_price,
+            "tickAfter": tick,
+            "liquidityAfter": liquidity,
+            "initializedTicksCrossed": crossed,
+        }
+
+    # ------------------------------------------------------------------
+    def quote_exact_input(self, amount_in: int, zero_for_one: bool, sqrt_price_limit_x96: Optional[int] = None) -> Dict[str, int]:
+        """Quote an exact-input swap in the shape of ``get_quote_weth_usdc``."""
+
+        if amount_in <= 0:
+            raise ValueError("amount_in must be positive")
+        res = self.swap(zero_for_one, amount_in, sqrt_price_limit_x96)
+        amount_out = -(res["amount1"] if zero_for_one else res["amount0"])
+        return self._quote(res, amount_in=res["amount0"] if zero_for_one else res["amount1"], amount_out=amount_out)
+
+    def quote_exact_output(self, amount_out: int, zero_for_one: bool, sqrt_price_limit_x96: Optional[int] = None) -> Dict[str, int]:
+        """Quote the input needed to receive exactly ``amount_out``."""
+
+        if amount_out <= 0:
+            raise ValueError("amount_out must be positive")
+        res = self.swap(zero_for_one, -amount_out, sqrt_price_limit_x96)
+        amount_in = res["amount0"] if zero_for_one else res["amount1"]
+        return self._quote(res, amount_in=amount_in, amount_out=-(res["amount1"] if zero_for_one else res["amount0"]))
+
+    def quote_exact_input_batch(self, amounts_in: Iterable[int], zero_for_one: bool) -> List[Dict[str, int]]:
+        """Quote many trade sizes against the same snapshot."""
+
+        return [self.quote_exact_input(a, zero_for_one) for a in amounts_in]
+
+    def quote_exact_output_batch(self, amounts_out: Iterable[int], zero_for_one: bool) -> List[Dict[str, int]]:
+        return [self.quote_exact_output(a, zero_for_one) for a in amounts_out]
+
+    @staticmethod
+    def _quote(res: Dict[str, Any], amount_in: int, amount_out: int) -> Dict[str, int]:
+        return {
+            "amountIn": amount_in,
+            "amountOut": amount_out,
+            "sqrtPriceX96After": res["sqrtPriceX96After"],
+            "tickAfter": res["tickAfter"],
+            "initializedTicksCrossed": res["initializedTicksCrossed"],
+        }
@@ -1,6 +1,26 @@
+"""Telegram notifications: one-off sends and a background alert dispatcher."""
+
+from __future__ import annotations
+
 import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
 import requests
 
+from .metrics import ALERTS
+
+TELEGRAM_API = "https://api.telegram.org"
+MAX_MESSAGE_CHARS = 4096
+
+_session = requests.Session()
+
+# ``AlertDispatcher._post`` result for a request Telegram refused (bad token,
+# wrong chat id, malformed text): retrying will not help.
+REJECTED = -1.0
+
 
 def send_telegram_message(message: str) -> None:
     """Send a message to Telegram or log to console if not configured."""
@@ -10,9 +30,231 @@ def send_telegram_message(message: str) -> None:
         print(f"[TELEGRAM] {message}")
         return
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    url = f"{TELEGRAM_API}/bot{token}/sendMessage"
     data = {"chat_id": chat_id, "text": message}
     try:
-        requests.post(url, data=data, timeout=10)
+        _session.post(url, data=data, timeout=10)
     except Exception as exc:
         print(f"[TELEGRAM ERROR] {exc}")
+
+
+class TokenBucket:
+    """Blocking token bucket; :meth:`pause` empties it until a deadline."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def wait(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                time.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = time.monotonic() + seconds
+        self.tokens = 0.0
+
+
+class AlertDispatcher:
+    """Deliver alerts from a daemon thread without ever blocking the caller.
+
+    :meth:`notify` is keyed: while a key stays active repeated notifications
+    are dropped, and a key that was resolved less than ``clear_after``
+    seconds ago is treated as still active, so a condition flapping around a
+    threshold alerts once. Queued alerts arriving within ``digest_window``
+    seconds of each other are sent as one digest message. Sends share a
+    keep-alive session and a token bucket (``rate`` per second, ``burst``
+    capacity); a ``429`` pauses the bucket for Telegram's ``retry_after``
+    and the digest is retried. When the queue holds ``max_queue`` messages
+    the oldest is dropped.
+
+    Without a token or chat id, alerts are printed as ``[TELEGRAM]`` lines.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str],
+        chat_id: Optional[str],
+        api_url: str = TELEGRAM_API,
+        rate: float = 1.0,
+        burst: float = 3.0,
+        digest_window: float = 2.0,
+        clear_after: float = 300.0,
+        max_queue: int = 1000,
+        max_attempts: int = 5,
+        timeout: float = 10.0,
+    ) -> None:
+        self.token = token
+        self.chat_id = chat_id
+        self.api_url = api_url.rstrip("/")
+        self.digest_window = digest_window
+        self.clear_after = clear_after
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self._queue: Deque[str] = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._states: Dict[str, Optional[float]] = {}  # None = active, else resolved at
+        self._inflight = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "AlertDispatcher":
+        return cls(os.getenv("TELEGRAM_TOKEN"), os.getenv("TELEGRAM_CHAT_ID"))
+
+    # ------------------------------------------------------------------
+    def notify(self, key: str, message: str) -> bool:
+        """Queue ``message`` unless ``key`` is already active; return if queued."""
+
+        now = time.monotonic()
+        with self._cond:
+            if key in self._states:
+                resolved_at = self._states[key]
+                if resolved_at is None or now - resolved_at < self.clear_after:
+                    self._states[key] = None
+                    ALERTS.labels("deduplicated").inc()
+                    return False
+            self._states[key] = None
+        self.send(message)
+        return True
+
+    def resolve(self, key: str, message: Optional[str] = None) -> None:
+        """Mark ``key`` as cleared, optionally queueing a recovery message."""
+
+        with self._cond:
+            if key not in self._states or self._states[key] is not None:
+                return
+            self._states[key] = time.monotonic()
+        if message:
+            self.send(message)
+
+    def send(self, message: str) -> None:
+        """Queue an unkeyed message; never blocks."""
+
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                ALERTS.labels("dropped").inc()
+            self._queue.append(message)
+            self._cond.notify()
+        self._start()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every queued alert was delivered (or given up on)."""
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ------------------------------------------------------------------
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="telegram-alerts", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()
+
+    def _next_batch(self) -> List[str]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            # Keep collecting while alerts keep arriving within the window,
+            # but never hold a digest back for more than five windows.
+            deadline = time.monotonic() + 5 * self.digest_window
+            while True:
+                size = len(self._queue)
+                remaining = min(self.digest_window, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+                if len(self._queue) == size:
+                    break
+            batch = list(self._queue)
+            self._queue.clear()
+            self._inflight = len(batch)
+        return batch
+
+    def _deliver(self, batch: List[str]) -> None:
+        for text in digest(batch):
+            for attempt in range(1, self.max_attempts + 1):
+                self.bucket.wait()
+                retry_after = self._post(text)
+                if retry_after is None:
+                    ALERTS.labels("sent").inc()
+                    break
+                if retry_after == REJECTED:
+                    ALERTS.labels("rejected").inc()
+                    break
+                if attempt == self.max_attempts:
+                    ALERTS.labels("failed").inc()
+                    print(f"[TELEGRAM ERROR] Giving up after {attempt} attempts")
+                    break
+                self.bucket.pause(retry_after)
+
+    def _post(self, text: str) -> Optional[float]:
+        """Send one message; return ``None`` on success, :data:`REJECTED` or seconds to wait."""
+
+        if not self.token or not self.chat_id:
+            print(f"[TELEGRAM] {text}")
+            return None
+        url = f"{self.api_url}/bot{self.token}/sendMessage"
+        try:
+            resp = self.session.post(url, data={"chat_id": self.chat_id, "text": text}, timeout=self.timeout)
+        except Exception as exc:
+            print(f"[TELEGRAM ERROR] {exc}")
+            return 1.0
+        if resp.status_code == 429:
+            try:
+                retry_after = float(resp.json()["parameters"]["retry_after"])
+            except Exception:
+                retry_after = float(resp.headers.get("Retry-After", 1))
+            print(f"[TELEGRAM] Rate limited; retrying in {retry_after:g}s")
+            return retry_after
+        if resp.status_code >= 500:
+            print(f"[TELEGRAM ERROR] HTTP {resp.status_code}")
+            return 1.0
+        if resp.status_code >= 400:
+            print(f"[TELEGRAM ERROR] HTTP {resp.status_code}: {resp.text[:200]}")
+            return REJECTED
+        return None
+
+
+def digest(messages: List[str]) -> List[str]:
+    """Combine messages into as few Telegram-sized texts as possible."""
+
+    if len(messages) == 1:
+        return [messages[0][:MAX_MESSAGE_CHARS]]
+    header = f"{len(messages)} alerts:"
+    texts, current = [], header
+    for message in messages:
+        line = f"\n• {message}"
+        if len(current) + len(line) > MAX_MESSAGE_CHARS:
+            texts.append(current)
+            current = header + " (cont.)"
+        current += line[: MAX_MESSAGE_CHARS - len(current)]
+    texts.append(current)
+    return texts
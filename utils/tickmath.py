@@ -0,0 +1,131 @@
+"""Exact integer ports of Uniswap v3 ``TickMath`` plus vectorized batch helpers.
+
+:func:`get_sqrt_ratio_at_tick` and :func:`get_tick_at_sqrt_ratio` reproduce
+the Solidity library bit for bit. The ``*_batch`` variants take NumPy arrays
+and return the same values for thousands of inputs per call: ticks are
+handled as ``int64`` and Q64.96 prices as ``object`` arrays of Python ints,
+since they need up to 160 bits.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+MIN_TICK = -887272
+MAX_TICK = -MIN_TICK
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+_MAX_UINT256 = (1 << 256) - 1
+_Q32_MASK = (1 << 32) - 1
+
+# sqrt(1.0001)^-(2^i) as Q128.128 for i = 1..19; bit 0 is the initial ratio.
+_RATIO_BIT0 = 0xFFFCB933BD6FAD37AA2D162D1A594001
+_RATIO_CONSTANTS = (
+    (0x2, 0xFFF97272373D413259A46990580E213A),
+    (0x4, 0xFFF2E50F5F656932EF12357CF3C7FDCC),
+    (0x8, 0xFFE5CACA7E10E4E61C3624EAA0941CD0),
+    (0x10, 0xFFCB9843D60F6159C9DB58835C926644),
+    (0x20, 0xFF973B41FA98C081472E6896DFB254C0),
+    (0x40, 0xFF2EA16466C96A3843EC78B326B52861),
+    (0x80, 0xFE5DEE046A99A2A811C461F1969C3053),
+    (0x100, 0xFCBE86C7900A88AEDCFFC83B479AA3A4),
+    (0x200, 0xF987A7253AC413176F2B074CF7815E54),
+    (0x400, 0xF3392B0822B70005940C7A398E4B70F3),
+    (0x800, 0xE7159475A2C29B7443B29C7FA6E889D9),
+    (0x1000, 0xD097F3BDFD2022B8845AD8F792AA5825),
+    (0x2000, 0xA9F746462D870FDF8A65DC1F90E061E5),
+    (0x4000, 0x70D869A156D2A1B890BB3DF62BAF32F7),
+    (0x8000, 0x31BE135F97D08FD981231505542FCFA6),
+    (0x10000, 0x9AA508B5B7A84E1C677DE54F3E99BC9),
+    (0x20000, 0x5D6AF8DEDB81196699C329225EE604),
+    (0x40000, 0x2216E584F5FA1EA926041BEDFE98),
+    (0x80000, 0x48A170391F7DC42444E8FA2),
+)
+
+_LOG_SQRT10001_MUL = 255738958999603826347141
+_TICK_LOW_OFFSET = 3402992956809132418596140100660247210
+_TICK_HI_OFFSET = 291339464771989622907027621153398088495
+_LN_SQRT10001 = float(np.log(1.0001)) / 2
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """Return ``sqrt(1.0001^tick) * 2^96`` exactly as ``TickMath`` does."""
+
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+    ratio = _RATIO_BIT0 if abs_tick & 0x1 else 1 << 128
+    for bit, constant in _RATIO_CONSTANTS:
+        if abs_tick & bit:
+            ratio = (ratio * constant) >> 128
+    if tick > 0:
+        ratio = _MAX_UINT256 // ratio
+    return (ratio >> 32) + (1 if ratio & _Q32_MASK else 0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Return the greatest tick whose sqrt ratio is <= ``sqrt_price_x96``."""
+
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrtPriceX96 {sqrt_price_x96} out of range")
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+    log_2 = (msb - 128) << 64
+    for shift in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << shift
+        r >>= f
+    log_sqrt10001 = log_2 * _LOG_SQRT10001_MUL
+    tick_low = (log_sqrt10001 - _TICK_LOW_OFFSET) >> 128
+    tick_hi = (log_sqrt10001 + _TICK_HI_OFFSET) >> 128
+    if tick_low == tick_hi:
+        return tick_low
+    return tick_hi if get_sqrt_ratio_at_tick(tick_hi) <= sqrt_price_x96 else tick_low
+
+
+# ---------------------------------------------------------------------------
+# Vectorized batch API
+# ---------------------------------------------------------------------------
+def get_sqrt_ratio_at_tick_batch(ticks: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`get_sqrt_ratio_at_tick`; returns an ``object`` array."""
+
+    ticks = np.asarray(ticks, dtype=np.int64)
+    abs_ticks = np.abs(ticks)
+    if abs_ticks.size and abs_ticks.max() > MAX_TICK:
+        raise ValueError("tick out of range")
+    ratio = np.full(ticks.shape, 1 << 128, dtype=object)
+    ratio[(abs_ticks & 0x1) != 0] = _RATIO_BIT0
+    for bit, constant in _RATIO_CONSTANTS:
+        mask = (abs_ticks & bit) != 0
+        if mask.any():
+            ratio[mask] = (ratio[mask] * constant) >> 128
+    positive = ticks > 0
+    if positive.any():
+        ratio[positive] = _MAX_UINT256 // ratio[positive]
+    return (ratio >> 32) + ((ratio & _Q32_MASK) != 0).astype(object)
+
+
+def get_tick_at_sqrt_ratio_batch(sqrt_prices_x96: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`get_tick_at_sqrt_ratio`; returns an ``int64`` array.
+
+    A float64 logarithm gives every tick to within one step; two exact
+    batch evaluations of :func:`get_sqrt_ratio_at_tick_batch` then settle
+    the boundary cases, so results match the integer routine exactly.
+    """
+
+    sqrt_prices = np.asarray(sqrt_prices_x96, dtype=object)
+    if sqrt_prices.size and (
+        (sqrt_prices < MIN_SQRT_RATIO).any() or (sqrt_prices >= MAX_SQRT_RATIO).any()
+    ):
+        raise ValueError("sqrtPriceX96 out of range")
+    as_float = sqrt_prices.astype(np.float64) / float(1 << 96)
+    estimate = np.floor(np.log(as_float) / _LN_SQRT10001).astype(np.int64)
+    ticks = np.clip(estimate, MIN_TICK, MAX_TICK - 1)
+    ticks -= (get_sqrt_ratio_at_tick_batch(ticks) > sqrt_prices).astype(np.int64)
+    ticks = np.maximum(ticks, MIN_TICK)
+    above = np.minimum(ticks + 1, MAX_TICK)
+    ticks += (get_sqrt_ratio_at_tick_batch(above) <= sqrt_prices).astype(np.int64)
+    return ticks
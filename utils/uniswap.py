@@ -2,51 +2,86 @@
 
 from __future__ import annotations
 
-import math
+import json
 import os
-from typing import Dict, Tuple, Optional, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 
-from web3 import Web3
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryCallState, retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
+from .metrics import RPC_RETRIES
+from .rpc import RpcPool, RpcUnavailable, build_rpc_pool
+from .tickmath import get_tick_at_sqrt_ratio
 
-class RpcUnavailable(Exception):
-    """Raised when no RPC endpoint is reachable."""
+if TYPE_CHECKING:  # web3 is imported on first use: it alone takes ~1s to import
+    from web3 import Web3
 
 
-def get_web3_client(rpc_url: Optional[str] = None, fallbacks: Optional[str] = None) -> Web3:
-    """Return a connected Web3 instance or raise :class:`RpcUnavailable`."""
-
+def _rpc_urls(rpc_url: Optional[str], fallbacks: Optional[str]) -> List[str]:
     primary = rpc_url or os.getenv("RPC_URL_ARBITRUM", "")
     fallback_str = fallbacks or os.getenv("RPC_FALLBACKS", "")
     urls: List[str] = [primary] + [u.strip() for u in fallback_str.split(",") if u.strip()]
-    seen = set()
-    ordered: List[str] = []
-    for u in urls:
-        if u and u not in seen:
-            ordered.append(u)
-            seen.add(u)
-    for url in ordered:
-        try:
-            provider = Web3.HTTPProvider(url, request_kwargs={"timeout": 15})
-            w3 = Web3(provider)
-            if w3.is_connected():
-                print(f"[UNISWAP] Connected to {url}")
-                return w3
-        except Exception:
-            continue
-    raise RpcUnavailable("no RPC endpoints reachable")
+    return list(dict.fromkeys(u for u in urls if u))
+
+
+def get_rpc_pool(rpc_url: Optional[str] = None, fallbacks: Optional[str] = None) -> RpcPool:
+    """Return an :class:`RpcPool` of ``RPC_URL_ARBITRUM`` and ``RPC_FALLBACKS``.
+
+    Endpoints are probed in parallel; :class:`RpcUnavailable` is raised only
+    if none of them answers.
+    """
+
+    urls = _rpc_urls(rpc_url, fallbacks)
+    pool = build_rpc_pool(urls, timeout=15)
+    print(f"[UNISWAP] Connected via RPC pool ({', '.join(urls)})")
+    return pool
+
+
+def _web3(provider: Any) -> Web3:
+    from web3 import Web3
+    from web3.middleware import simple_cache_middleware
+
+    w3 = Web3(provider)
+    # web3's validation middleware asks for eth_chainId before every
+    # eth_call; cache it so each read costs a single round trip.
+    w3.middleware_onion.add(simple_cache_middleware, "simple_cache")
+    return w3
+
+
+def get_web3_client(rpc_url: Optional[str] = None, fallbacks: Optional[str] = None) -> Web3:
+    """Return a Web3 instance backed by :func:`get_rpc_pool`."""
+
+    return _web3(get_rpc_pool(rpc_url, fallbacks))
+
+
+# Retry transient read failures, but let RpcUnavailable through immediately:
+# the RPC pool has already tried every endpoint.
+def _count_retry(retry_state: RetryCallState) -> None:
+    RPC_RETRIES.labels(retry_state.fn.__name__).inc()
+
+
+rpc_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, max=5),
+    retry=retry_if_not_exception_type(RpcUnavailable),
+    before_sleep=_count_retry,
+)
 
 # ---------------------------------------------------------------------------
-# Constants
+# Constants (already checksummed, so importing this module needs no web3)
 # ---------------------------------------------------------------------------
-WETH = Web3.to_checksum_address("0x82AF49447D8a07e3bd95BD0d56f35241523fBab1")
-USDC = Web3.to_checksum_address("0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8")
+WETH = "0x82aF49447D8a07e3bd95BD0d56f35241523fBab1"
+USDC = "0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8"
+WBTC = "0x2f2a2543B76A4166549F7aaB2e75Bef0aefC5B0f"
+ARB = "0x912CE59144191C1204E64559FE8253a0e49E6548"
+# Hyperliquid symbol of the asset each Arbitrum token tracks (used to pick the hedged side of a pool).
+TOKEN_SYMBOLS: Dict[str, str] = {WETH: "ETH", WBTC: "BTC", ARB: "ARB", USDC: "USDC"}
 FEE_TIER_005 = 500
-FACTORY_ADDRESS = Web3.to_checksum_address("0x1F98431c8aD98523631AE4a59f267346ea31F984")
-QUOTER_V2_ADDRESS = Web3.to_checksum_address("0x61fFE014bA17989E743c5F6cB21bF9697530B21e")
-NONFUNGIBLE_POSITION_MANAGER = Web3.to_checksum_address("0xC36442b4a4522E871399CD717aBDD847Ab11FE88")
-POOL_WETH_USDC_005 = Web3.to_checksum_address("0xC5aF84701f98Fa483eCe78aF83F11b6C38ACA71D")
+FACTORY_ADDRESS = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+QUOTER_V2_ADDRESS = "0x61fFE014bA17989E743c5F6cB21bF9697530B21e"
+NONFUNGIBLE_POSITION_MANAGER = "0xC36442b4a4522E871399CD717aBDD847Ab11FE88"
+POOL_WETH_USDC_005 = "0xC5aF84701f98Fa483eCe78aF83F11b6C38ACA71D"
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
 
 # ---------------------------------------------------------------------------
 # Minimal ABIs
@@ -95,6 +130,36 @@ UNISWAP_V3_POOL_ABI = [
         "stateMutability": "view",
         "type": "function",
     },
+    {
+        "inputs": [],
+        "name": "tickSpacing",
+        "outputs": [{"internalType": "int24", "name": "", "type": "int24"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [{"internalType": "int16", "name": "wordPosition", "type": "int16"}],
+        "name": "tickBitmap",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [{"internalType": "int24", "name": "tick", "type": "int24"}],
+        "name": "ticks",
+        "outputs": [
+            {"internalType": "uint128", "name": "liquidityGross", "type": "uint128"},
+            {"internalType": "int128", "name": "liquidityNet", "type": "int128"},
+            {"internalType": "uint256", "name": "feeGrowthOutside0X128", "type": "uint256"},
+            {"internalType": "uint256", "name": "feeGrowthOutside1X128", "type": "uint256"},
+            {"internalType": "int56", "name": "tickCumulativeOutside", "type": "int56"},
+            {"internalType": "uint160", "name": "secondsPerLiquidityOutsideX128", "type": "uint160"},
+            {"internalType": "uint32", "name": "secondsOutside", "type": "uint32"},
+            {"internalType": "bool", "name": "initialized", "type": "bool"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    },
 ]
 
 ERC20_ABI = [
@@ -151,86 +216,611 @@ POSITION_MANAGER_ABI = [
     }
 ]
 
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "getBlockNumber",
+        "outputs": [{"internalType": "uint256", "name": "blockNumber", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+# keccak("IncreaseLiquidity(uint256,uint128,uint256,uint256)") and the
+# DecreaseLiquidity equivalent; ``tokenId`` is the first indexed topic.
+INCREASE_LIQUIDITY_TOPIC = "0x3067048beee31b25b2f1681f88dac838c8bba36af25bfb2b7cf7473a5847e35f"
+DECREASE_LIQUIDITY_TOPIC = "0x26f6a048ee9138f2c0ce266f322cb99228e8d619ae2bff30c67f8dcf9d2377b4"
+
+
+# ---------------------------------------------------------------------------
+# Multicall3 batching
+# ---------------------------------------------------------------------------
+_ERROR_STRING_SELECTOR = bytes.fromhex("08c379a0")
+
+
+class CallResult(NamedTuple):
+    """Outcome of a single sub-call inside a :class:`Multicall` batch."""
+
+    success: bool
+    value: Any = None
+    error: Optional[str] = None
+
+
+class ContractFunction:
+    """One ABI function entry with its selector and codec types computed once."""
+
+    __slots__ = ("name", "input_types", "output_types", "selector")
+
+    def __init__(self, abi: Dict[str, Any]) -> None:
+        from eth_utils import keccak
+
+        self.name = abi["name"]
+        self.input_types = _abi_types(abi["inputs"])
+        self.output_types = _abi_types(abi["outputs"])
+        self.selector = keccak(text=f"{self.name}({','.join(self.input_types)})")[:4]
+
+    def encode(self, args: Tuple[Any, ...]) -> bytes:
+        from eth_abi import encode
+
+        return self.selector + encode(self.input_types, list(args))
+
+    def decode(self, data: bytes) -> Any:
+        """Decode return data into the shape web3's ``.call()`` returns."""
+
+        from eth_abi import decode
+
+        decoded = decode(self.output_types, data)
+        values = [_checksum(v) if t == "address" else v for t, v in zip(self.output_types, decoded)]
+        return values[0] if len(values) == 1 else values
+
+
+def _abi_types(params: List[Dict[str, Any]]) -> List[str]:
+    out = []
+    for p in params:
+        if p["type"].startswith("tuple"):
+            out.append(f"({','.join(_abi_types(p['components']))}){p['type'][5:]}")
+        else:
+            out.append(p["type"])
+    return out
+
+
+_COMPILED: Dict[int, Tuple[List[Dict[str, Any]], Dict[str, ContractFunction]]] = {}
+
+
+def _compile(abi: List[Dict[str, Any]]) -> Dict[str, ContractFunction]:
+    """Functions of ``abi`` by name, compiled once per ABI list."""
+
+    cached = _COMPILED.get(id(abi))
+    if cached is None or cached[0] is not abi:
+        functions = {e["name"]: ContractFunction(e) for e in abi if e.get("type") == "function"}
+        cached = _COMPILED[id(abi)] = (abi, functions)
+    return cached[1]
+
+
+class BoundCall:
+    """A contract function bound to its arguments, ready to batch or call."""
+
+    __slots__ = ("contract", "function", "args")
+
+    def __init__(self, contract: "Contract", function: ContractFunction, args: Tuple[Any, ...]) -> None:
+        self.contract = contract
+        self.function = function
+        self.args = args
+
+    @property
+    def address(self) -> str:
+        return self.contract.address
+
+    def calldata(self) -> bytes:
+        return self.function.encode(self.args)
+
+    def call(self, block_identifier: Any = "latest") -> Any:
+        data = self.contract.client.eth_call(self.address, self.calldata(), block_identifier)
+        return self.function.decode(data)
+
+
+class _Functions:
+    def __init__(self, contract: "Contract") -> None:
+        self._contract = contract
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            function = self._contract.compiled[name]
+        except KeyError:
+            raise AttributeError(f"contract has no function {name!r}") from None
+        return lambda *args: BoundCall(self._contract, function, args)
+
+
+class Contract:
+    """Address plus precompiled ABI, used as ``contract.functions.slot0()``.
+
+    Mirrors the part of web3's contract API the client needs; encoding and
+    decoding go straight through ``eth_abi`` with selectors and types
+    computed once per ABI, so reads never build web3 contract objects.
+    """
+
+    def __init__(self, client: "UniswapClient", address: str, abi: List[Dict[str, Any]]) -> None:
+        self.client = client
+        self.address = address
+        self.compiled = _compile(abi)
+        self.functions = _Functions(self)
+
+
+class Multicall:
+    """Collect contract reads and execute them in one ``aggregate3`` call.
+
+    Sub-calls are queued with :meth:`add` as bound contract functions
+    (``contract.functions.slot0()``) and decoded back into the same shapes
+    ``.call()`` would return. Every sub-call is sent with ``allowFailure``
+    so a single revert is reported in its own :class:`CallResult` instead of
+    failing the whole batch.
+    """
+
+    def __init__(self, contract: Contract) -> None:
+        self._contract = contract
+        self._calls: List[Tuple[str, bytes, ContractFunction]] = []
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def add(self, fn: BoundCall) -> int:
+        """Queue a bound contract function and return its result index."""
+
+        self._calls.append((fn.address, fn.calldata(), fn.function))
+        return len(self._calls) - 1
+
+    def execute(self, block_identifier: Any = "latest") -> List[CallResult]:
+        """Run all queued calls in a single ``eth_call`` and decode them."""
+
+        if not self._calls:
+            return []
+        raw = self._contract.functions.aggregate3(
+            [(target, True, data) for target, data, _ in self._calls]
+        ).call(block_identifier=block_identifier)
+        return [
+            self._decode(function, success, data)
+            for (_, _, function), (success, data) in zip(self._calls, raw)
+        ]
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _decode(function: ContractFunction, success: bool, data: bytes) -> CallResult:
+        if not success:
+            return CallResult(False, error=_revert_reason(data))
+        try:
+            return CallResult(True, function.decode(data))
+        except Exception as exc:
+            return CallResult(False, error=f"undecodable return data: {exc}")
+
+
+def _revert_reason(data: bytes) -> str:
+    if data[:4] == _ERROR_STRING_SELECTOR:
+        try:
+            from eth_abi import decode
+
+            return f"execution reverted: {decode(['string'], data[4:])[0]}"
+        except Exception:  # pragma: no cover - malformed revert payload
+            pass
+    return f"execution reverted: 0x{data.hex()}" if data else "execution reverted"
+
+
+def _unwrap(result: CallResult, label: str) -> Any:
+    if not result.success:
+        raise RuntimeError(f"{label} failed: {result.error}")
+    return result.value
+
+
+@lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    from eth_utils import to_checksum_address
+
+    return to_checksum_address(address)
+
+
+# ---------------------------------------------------------------------------
+# Immutable pool metadata
+# ---------------------------------------------------------------------------
+DEFAULT_METADATA_CACHE = os.path.join(".cache", "pool_metadata.json")
+POOL_METADATA_FIELDS = ("fee", "token0", "token1", "decimals0", "decimals1")
+
+
+class PoolMetadataRegistry:
+    """Immutable pool fields keyed by ``(chainId, pool address)``.
+
+    ``fee``, ``token0``, ``token1`` and the token decimals never change for a
+    deployed pool, so they are fetched once and persisted as JSON under
+    ``path`` (``POOL_METADATA_CACHE`` env var). An empty path keeps the
+    registry in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path if path is not None else os.getenv("POOL_METADATA_CACHE", DEFAULT_METADATA_CACHE)
+        self._entries: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._load()
+
+    def get(self, chain_id: int, pool_address: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get((chain_id, pool_address.lower()))
+
+    def put(self, chain_id: int, pool_address: str, metadata: Dict[str, Any]) -> None:
+        self._entries[(chain_id, pool_address.lower())] = {
+            k: metadata[k] for k in POOL_METADATA_FIELDS
+        }
+        self._save()
+
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+            for key, meta in raw.items():
+                chain_id, addr = key.split(":", 1)
+                if all(k in meta for k in POOL_METADATA_FIELDS):
+                    self._entries[(int(chain_id), addr.lower())] = meta
+        except Exception as exc:
+            print(f"[WARN] Ignoring unreadable pool metadata cache {self.path}: {exc}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        raw = {f"{cid}:{addr}": meta for (cid, addr), meta in self._entries.items()}
+        tmp = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(raw, fh, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            print(f"[WARN] Could not persist pool metadata cache {self.path}: {exc}")
+
 
 # ---------------------------------------------------------------------------
 # Client implementation
 # ---------------------------------------------------------------------------
 class UniswapClient:
-    """Simple on-chain reader for Uniswap v3."""
+    """Simple on-chain reader for Uniswap v3.
+
+    Reads go through :class:`Contract` objects straight to the provider, so
+    web3 itself is only imported if :attr:`w3` is used.
+    """
+
+    def __init__(
+        self,
+        rpc_url: Optional[str] = None,
+        fallbacks: Optional[str] = None,
+        w3: Optional[Web3] = None,
+        metadata: Optional[PoolMetadataRegistry] = None,
+        chain_id: Optional[int] = None,
+    ):
+        self.provider = w3.provider if w3 is not None else get_rpc_pool(rpc_url, fallbacks)
+        self._w3 = w3
+        self.metadata = metadata if metadata is not None else PoolMetadataRegistry()
+        self._chain_id = chain_id
+        self._contracts: Dict[Tuple[str, int], Contract] = {}
+
+    # ------------------------------------------------------------------
+    @property
+    def w3(self) -> Web3:
+        """A Web3 instance over the same provider, created on first use."""
+
+        if self._w3 is None:
+            self._w3 = _web3(self.provider)
+        return self._w3
+
+    def request(self, method: str, params: List[Any]) -> Any:
+        """Send one JSON-RPC request and return its result."""
+
+        response = self.provider.make_request(method, params)
+        if "error" in response:
+            error = response["error"]
+            raise ValueError(error.get("message", error) if isinstance(error, dict) else error)
+        return response["result"]
+
+    def eth_call(self, to: str, data: bytes, block_identifier: Any = "latest") -> bytes:
+        block = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+        result = self.request("eth_call", [{"to": to, "data": "0x" + data.hex()}, block])
+        return bytes.fromhex(result[2:])
+
+    # ------------------------------------------------------------------
+    @property
+    def chain_id(self) -> int:
+        """Chain id of the connected network, fetched once."""
 
-    def __init__(self, rpc_url: Optional[str] = None, fallbacks: Optional[str] = None):
-        self.w3 = get_web3_client(rpc_url, fallbacks)
+        if self._chain_id is None:
+            self._chain_id = int(self.request("eth_chainId", []), 16)
+        return self._chain_id
 
     # ------------------------------------------------------------------
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5, max=5))
+    def contract(self, address: str, abi: List[Dict[str, Any]]) -> Contract:
+        """Return a cached contract object for ``address`` and ``abi``."""
+
+        key = (address, id(abi))
+        contract = self._contracts.get(key)
+        if contract is None:
+            contract = Contract(self, _checksum(address), abi)
+            self._contracts[key] = contract
+        return contract
+
+    # ------------------------------------------------------------------
+    def prepare(self, pool_addresses: Iterable[str]) -> None:
+        """Build contract objects and load pool metadata ahead of the first cycle.
+
+        Best effort: anything that fails here is simply retried by the cycle.
+        """
+
+        try:
+            for address, abi in (
+                (MULTICALL3_ADDRESS, MULTICALL3_ABI),
+                (NONFUNGIBLE_POSITION_MANAGER, POSITION_MANAGER_ABI),
+            ):
+                self.contract(address, abi)
+            for pool in pool_addresses:
+                self.contract(pool, UNISWAP_V3_POOL_ABI)
+                self.get_pool_metadata(pool)
+        except Exception as exc:
+            print(f"[WARN] Could not prepare Uniswap reads: {exc}")
+
+    # ------------------------------------------------------------------
+    def multicall(self) -> Multicall:
+        """Return an empty :class:`Multicall` batch bound to this client."""
+
+        return Multicall(self.contract(MULTICALL3_ADDRESS, MULTICALL3_ABI))
+
+    # ------------------------------------------------------------------
+    @rpc_retry
     def get_pool_state(self, pool_address: str) -> Dict[str, int]:
-        """Return core state for a Uniswap v3 pool."""
+        """Return core state for a Uniswap v3 pool.
+
+        Only ``slot0`` and ``liquidity`` are read per call; the immutable
+        fields come from :attr:`metadata`.
+        """
 
         try:
-            addr = self.w3.to_checksum_address(pool_address)
+            addr = _checksum(pool_address)
         except Exception as exc:  # pragma: no cover - validation
             raise ValueError(f"Invalid pool address {pool_address}") from exc
-        pool = self.w3.eth.contract(address=addr, abi=UNISWAP_V3_POOL_ABI)
         try:
-            slot0 = pool.functions.slot0().call()
-            liquidity = pool.functions.liquidity().call()
-            fee = pool.functions.fee().call()
-            token0 = pool.functions.token0().call()
-            token1 = pool.functions.token1().call()
-            dec0 = self.w3.eth.contract(address=token0, abi=ERC20_ABI).functions.decimals().call()
-            dec1 = self.w3.eth.contract(address=token1, abi=ERC20_ABI).functions.decimals().call()
-            return {
-                "sqrtPriceX96": slot0[0],
-                "liquidity": liquidity,
-                "tick": slot0[1],
-                "fee": fee,
-                "token0": token0,
-                "token1": token1,
-                "decimals0": dec0,
-                "decimals1": dec1,
-            }
+            return _unwrap(self._read_pool_states([addr])[addr], "pool state")
+        except RpcUnavailable:
+            raise
         except Exception as exc:
             raise RuntimeError(f"Failed to fetch pool state: {exc}") from exc
 
     # ------------------------------------------------------------------
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5, max=5))
+    @rpc_retry
+    def get_pool_states(self, pool_addresses: Iterable[str]) -> Dict[str, CallResult]:
+        """Return the state of several pools, keyed by checksummed address.
+
+        The mutable fields of every pool are read in one batch together with
+        the block number they were read at; each entry is a
+        :class:`CallResult` whose value has the :meth:`get_pool_state` shape.
+        """
+
+        addrs = list(dict.fromkeys(_checksum(a) for a in pool_addresses))
+        try:
+            return self._read_pool_states(addrs)
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"Failed to fetch pool states: {exc}") from exc
+
+    def _read_pool_states(self, addrs: List[str]) -> Dict[str, CallResult]:
+        out: Dict[str, CallResult] = {}
+        metas: Dict[str, Dict[str, Any]] = {}
+        for addr in addrs:
+            try:
+                metas[addr] = self.get_pool_metadata(addr)
+            except RpcUnavailable:
+                raise
+            except Exception as exc:
+                out[addr] = CallResult(False, error=f"metadata: {exc}")
+        batch = self.multicall()
+        for addr in metas:
+            pool = self.contract(addr, UNISWAP_V3_POOL_ABI)
+            batch.add(pool.functions.slot0())
+            batch.add(pool.functions.liquidity())
+        batch.add(self.contract(MULTICALL3_ADDRESS, MULTICALL3_ABI).functions.getBlockNumber())
+        results = batch.execute()
+        block = results[-1].value if results[-1].success else None
+        for i, (addr, meta) in enumerate(metas.items()):
+            slot0_res, liquidity_res = results[2 * i], results[2 * i + 1]
+            if not slot0_res.success or not liquidity_res.success:
+                out[addr] = CallResult(False, error=slot0_res.error or liquidity_res.error)
+                continue
+            out[addr] = CallResult(
+                True,
+                {
+                    "sqrtPriceX96": slot0_res.value[0],
+                    "liquidity": liquidity_res.value,
+                    "tick": slot0_res.value[1],
+                    "blockNumber": block,
+                    **meta,
+                },
+            )
+        return out
+
+    # ------------------------------------------------------------------
+    def get_pool_metadata(self, pool_address: str) -> Dict[str, Any]:
+        """Return fee, tokens and decimals for a pool, reading them only once."""
+
+        addr = _checksum(pool_address)
+        meta = self.metadata.get(self.chain_id, addr)
+        if meta is not None:
+            return meta
+        pool = self.contract(addr, UNISWAP_V3_POOL_ABI)
+        fields = ("fee", "token0", "token1")
+        batch = self.multicall()
+        for name in fields:
+            batch.add(getattr(pool.functions, name)())
+        fee, token0, token1 = [_unwrap(r, name) for r, name in zip(batch.execute(), fields)]
+        batch = self.multicall()
+        for token in (token0, token1):
+            batch.add(self.contract(token, ERC20_ABI).functions.decimals())
+        dec0, dec1 = [_unwrap(r, "decimals") for r in batch.execute()]
+        meta = {
+            "fee": fee,
+            "token0": token0,
+            "token1": token1,
+            "decimals0": dec0,
+            "decimals1": dec1,
+        }
+        self.metadata.put(self.chain_id, addr, meta)
+        return meta
+
+    # ------------------------------------------------------------------
+    @rpc_retry
     def get_quote_weth_usdc(self, amount_in_wei: int) -> Dict[str, int]:
         """Return a quote for WETH -> USDC using QuoterV2."""
 
         if amount_in_wei <= 0:
             raise ValueError("amount_in_wei must be positive")
-        quoter = self.w3.eth.contract(address=QUOTER_V2_ADDRESS, abi=QUOTER_V2_ABI)
+        quoter = self.contract(QUOTER_V2_ADDRESS, QUOTER_V2_ABI)
         try:
-            amount_out, sqrt_after, _, gas_est = quoter.functions.quoteExactInputSingle(
+            result = quoter.functions.quoteExactInputSingle(
                 WETH, USDC, amount_in_wei, FEE_TIER_005, 0
             ).call()
-            tick_after = self._sqrt_price_to_tick(sqrt_after)
-            return {
-                "amountOut": amount_out,
-                "sqrtPriceX96After": sqrt_after,
-                "tickAfter": tick_after,
-                "gasEstimate": gas_est,
-            }
+            return self._format_quote(result)
+        except RpcUnavailable:
+            raise
         except Exception as exc:
             raise RuntimeError(f"Failed to fetch quote: {exc}") from exc
 
     # ------------------------------------------------------------------
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5, max=5))
+    @rpc_retry
+    def get_quotes_weth_usdc(self, amounts_in_wei: Iterable[int]) -> List[CallResult]:
+        """Return QuoterV2 quotes for several WETH amounts in one batch.
+
+        Each entry mirrors :meth:`get_quote_weth_usdc`; a reverted quote is
+        reported as a failed :class:`CallResult` without affecting the rest.
+        """
+
+        amounts = list(amounts_in_wei)
+        if any(a <= 0 for a in amounts):
+            raise ValueError("amounts_in_wei must be positive")
+        quoter = self.contract(QUOTER_V2_ADDRESS, QUOTER_V2_ABI)
+        batch = self.multicall()
+        for amount in amounts:
+            batch.add(
+                quoter.functions.quoteExactInputSingle(WETH, USDC, amount, FEE_TIER_005, 0)
+            )
+        try:
+            results = batch.execute()
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"Failed to fetch quotes: {exc}") from exc
+        return [
+            CallResult(True, self._format_quote(r.value)) if r.success else r
+            for r in results
+        ]
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def _format_quote(cls, result: List[int]) -> Dict[str, int]:
+        amount_out, sqrt_after, _, gas_est = result
+        return {
+            "amountOut": amount_out,
+            "sqrtPriceX96After": sqrt_after,
+            "tickAfter": cls._sqrt_price_to_tick(sqrt_after),
+            "gasEstimate": gas_est,
+        }
+
+    # ------------------------------------------------------------------
+    @rpc_retry
     def get_position_bounds(self, token_id: int) -> Tuple[int, int]:
         """Return lower and upper ticks for a position NFT."""
 
-        manager = self.w3.eth.contract(
-            address=NONFUNGIBLE_POSITION_MANAGER, abi=POSITION_MANAGER_ABI
-        )
+        manager = self.contract(NONFUNGIBLE_POSITION_MANAGER, POSITION_MANAGER_ABI)
         try:
             pos = manager.functions.positions(token_id).call()
             return int(pos[5]), int(pos[6])
+        except RpcUnavailable:
+            raise
         except Exception as exc:
             raise RuntimeError(f"Failed to fetch position bounds: {exc}") from exc
 
+    # ------------------------------------------------------------------
+    @rpc_retry
+    def get_positions(self, token_ids: Iterable[int]) -> Dict[int, CallResult]:
+        """Return raw ``positions(tokenId)`` tuples for many NFTs in one batch."""
+
+        ids = list(token_ids)
+        manager = self.contract(NONFUNGIBLE_POSITION_MANAGER, POSITION_MANAGER_ABI)
+        batch = self.multicall()
+        for token_id in ids:
+            batch.add(manager.functions.positions(token_id))
+        try:
+            return dict(zip(ids, batch.execute()))
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"Failed to fetch positions: {exc}") from exc
+
+    # ------------------------------------------------------------------
+    @rpc_retry
+    def get_position_events(self, token_ids: Iterable[int], from_block: int, to_block: int) -> Set[int]:
+        """Return the token ids whose liquidity changed in ``[from_block, to_block]``.
+
+        Tick bounds are fixed per NFT, so ``IncreaseLiquidity`` and
+        ``DecreaseLiquidity`` (which precedes any burn) are the only events
+        that can invalidate a cached ``positions(tokenId)`` read.
+        """
+
+        ids = list(token_ids)
+        if not ids or from_block > to_block:
+            return set()
+        topics = [
+            [INCREASE_LIQUIDITY_TOPIC, DECREASE_LIQUIDITY_TOPIC],
+            ["0x" + t.to_bytes(32, "big").hex() for t in ids],
+        ]
+        try:
+            logs = self.request(
+                "eth_getLogs",
+                [
+                    {
+                        "address": NONFUNGIBLE_POSITION_MANAGER,
+                        "topics": topics,
+                        "fromBlock": hex(from_block),
+                        "toBlock": hex(to_block),
+                    }
+                ],
+            )
+        except RpcUnavailable:
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"Failed to fetch position events: {exc}") from exc
+        return {int(log["topics"][1], 16) for log in logs} & set(ids)
+
     # ------------------------------------------------------------------
     @staticmethod
     def _sqrt_price_to_tick(sqrt_price_x96: int) -> int:
-        price = (sqrt_price_x96 / (1 << 96)) ** 2
-        return int(math.log(price, 1.0001))
-
+        return get_tick_at_sqrt_ratio(sqrt_price_x96)